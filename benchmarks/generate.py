@@ -0,0 +1,124 @@
+import argparse
+import csv
+import datetime
+import io
+import pathlib
+import random
+import zipfile
+
+import yaml
+
+WRONG_ANSWERS = ['Paris', 'Berlin', 'Newton', 'Darwin', 'Mozart', 'Picasso', 'Nile', 'Everest', '1969', '42']
+
+
+def misspell(rng, answer):
+    variant = rng.randrange(4)
+    if variant == 0:
+        return answer.lower()
+    elif variant == 1:
+        return answer.upper()
+    elif variant == 2 and len(answer) > 3:
+        i = rng.randrange(len(answer) - 1)
+        return answer[:i] + answer[i + 1] + answer[i] + answer[i + 2:]
+    else:
+        return answer + ' '
+
+
+def answer_variants(rng, correct_answer, number_of_variants):
+    variants = [correct_answer]
+    while len(variants) < number_of_variants:
+        if rng.random() < 0.5:
+            variants.append(misspell(rng, correct_answer))
+        else:
+            variants.append(rng.choice(WRONG_ANSWERS) + ' ' + str(rng.randrange(100)))
+    return variants
+
+
+def format_timestamp(timestamp):
+    return '{:%Y/%m/%d} {}:{:%M:%S %p} GMT+1'.format(timestamp, timestamp.hour % 12 or 12, timestamp)
+
+
+def split_team_id(team_nr):
+    return 'team{:05d}b'.format(team_nr)
+
+
+def generate_quiz(directory, teams=100, sections=6, questions=10, variants=20, duplicate_rate=0.05,
+                  split_rate=0.02, zipped_sections=0, answered_sections=2, team_name_column=False, seed=0):
+    # Writes a Google Forms style export: one csv (or csv.zip) per section, a yaml answer key for the first
+    # answered_sections sections and a quiz.ini when a separate team name column is used. Duplicate submissions
+    # are extra rows for the same team; split teams use a second team id for the second half of the sections.
+    rng = random.Random(seed)
+    split_teams = {team_nr for team_nr in range(1, teams + 1) if rng.random() < split_rate}
+    directory = pathlib.Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    if team_name_column:
+        (directory / 'quiz.ini').write_text('[columns]\nteam_id = 1\nteam_name = 2\n')
+
+    start = datetime.datetime(2020, 10, 30, 20, 0, 0)
+    for section_nr in range(1, sections + 1):
+        section_name = 'round{:02d}'.format(section_nr)
+        correct_answers = ['Answer {}.{}'.format(section_nr, q) for q in range(1, questions + 1)]
+        question_variants = [answer_variants(rng, correct, variants) for correct in correct_answers]
+        weights = [1 / (rank + 1) for rank in range(variants)]
+
+        header = ['Timestamp', 'Team'] + (['Team name'] if team_name_column else [])
+        header += ['Question {}'.format(q) for q in range(1, questions + 1)]
+        rows = [header]
+        submissions = []
+        for team_nr in range(1, teams + 1):
+            submissions.append(team_nr)
+            if rng.random() < duplicate_rate:
+                submissions.append(team_nr)
+        rng.shuffle(submissions)
+
+        for i, team_nr in enumerate(submissions):
+            timestamp = start + datetime.timedelta(minutes=20 * section_nr, seconds=i)
+            if team_nr in split_teams and section_nr > sections // 2:
+                team_id = split_team_id(team_nr)
+            else:
+                team_id = 'team{:05d}'.format(team_nr)
+            row = [format_timestamp(timestamp), team_id]
+            if team_name_column:
+                row.append('Team {}'.format(team_nr))
+            row += [rng.choices(options, weights)[0] for options in question_variants]
+            rows.append(row)
+
+        buffer = io.StringIO()
+        csv.writer(buffer, quoting=csv.QUOTE_ALL).writerows(rows)
+        if section_nr <= zipped_sections:
+            with zipfile.ZipFile(directory / (section_name + '.csv.zip'), 'w', zipfile.ZIP_DEFLATED) as zipped_file:
+                zipped_file.writestr(section_name + '.csv', buffer.getvalue())
+        else:
+            (directory / (section_name + '.csv')).write_text(buffer.getvalue())
+
+        if section_nr <= answered_sections:
+            with (directory / (section_name + '.yaml')).open('w') as stream:
+                yaml.dump([[correct] for correct in correct_answers], stream, default_flow_style=False)
+
+    return directory
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic Google Forms pubquiz export')
+    parser.add_argument('directory')
+    parser.add_argument('--teams', type=int, default=100)
+    parser.add_argument('--sections', type=int, default=6)
+    parser.add_argument('--questions', type=int, default=10)
+    parser.add_argument('--variants', type=int, default=20)
+    parser.add_argument('--duplicate-rate', type=float, default=0.05)
+    parser.add_argument('--split-rate', type=float, default=0.02)
+    parser.add_argument('--zipped-sections', type=int, default=0)
+    parser.add_argument('--answered-sections', type=int, default=2)
+    parser.add_argument('--team-name-column', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    generate_quiz(args.directory, teams=args.teams, sections=args.sections, questions=args.questions,
+                  variants=args.variants, duplicate_rate=args.duplicate_rate, split_rate=args.split_rate,
+                  zipped_sections=args.zipped_sections,
+                  answered_sections=args.answered_sections, team_name_column=args.team_name_column, seed=args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+import argparse
+import gc
+import json
+import pathlib
+import shutil
+import sys
+import tempfile
+import tracemalloc
+
+repository_dir = pathlib.Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(repository_dir / 'googleformspubquiz'), str(repository_dir)]
+
+from generate import generate_quiz  # noqa: E402
+from quiz import Quiz  # noqa: E402
+
+
+def bytes_per_response(teams, sections, questions):
+    directory = pathlib.Path(tempfile.mkdtemp(prefix='pubquiz-memory-'))
+    try:
+        generate_quiz(directory, teams=teams, sections=sections, questions=questions)
+        gc.collect()
+        tracemalloc.start()
+        quiz = Quiz.load_dir_with_ini(directory)
+        gc.collect()
+        allocated, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        shutil.rmtree(directory)
+
+    responses = sum(len(section.responses) for section in quiz.sections)
+    return {
+        'teams': teams,
+        'sections': sections,
+        'questions': questions,
+        'responses': responses,
+        'allocated': allocated,
+        'bytes_per_response': allocated / responses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the memory used per response by a loaded quiz')
+    parser.add_argument('--teams', type=int, default=2000)
+    parser.add_argument('--sections', type=int, default=8)
+    parser.add_argument('--questions', type=int, default=10)
+    args = parser.parse_args()
+
+    json.dump(bytes_per_response(args.teams, args.sections, args.questions), sys.stdout, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main()
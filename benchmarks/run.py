@@ -0,0 +1,184 @@
+import argparse
+import json
+import os
+import pathlib
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+repository_dir = pathlib.Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(repository_dir / 'googleformspubquiz'), str(repository_dir)]
+
+from generate import generate_quiz  # noqa: E402
+from quiz import Quiz, MERGE_LOG_NAME  # noqa: E402
+import snapshot  # noqa: E402
+
+SIZES = {
+    'small': dict(teams=50, sections=4, questions=10),
+    'medium': dict(teams=500, sections=8, questions=10),
+    'large': dict(teams=2000, sections=10, questions=12),
+}
+
+
+def measure(name, params, func, setup=None, repeat=5):
+    times = []
+    for _ in range(repeat):
+        state = setup() if setup is not None else None
+        start = time.perf_counter()
+        func(state)
+        times.append(time.perf_counter() - start)
+    return {
+        'name': name,
+        'params': params,
+        'repeat': repeat,
+        'min': min(times),
+        'median': statistics.median(times),
+        'mean': statistics.mean(times),
+    }
+
+
+def split_pairs(quiz):
+    teams = {team.team_id: team for team in quiz.teams}
+    return [[teams[team_id[:-1]], team] for team_id, team in teams.items()
+            if team_id.endswith('b') and team_id[:-1] in teams]
+
+
+def scrub_times(quiz, steps=10):
+    times = [response.time for section in quiz.sections for response in section.responses
+             if response.time is not None]
+    start, end = min(times), max(times)
+    return [start + (end - start) * step // steps for step in range(1, steps + 1)]
+
+
+def core_benchmarks(directory, params, repeat):
+    def remove_snapshot():
+        (directory / snapshot.SNAPSHOT_NAME).unlink(missing_ok=True)
+
+    def loaded_quiz():
+        return Quiz.load_dir_with_ini(directory)
+
+    def scored_quiz():
+        quiz = loaded_quiz()
+        quiz.scores()
+        return quiz
+
+    def quiz_with_mergeable_pairs():
+        # Merges are appended to the quiz's merge log; start every repetition without them
+        (directory / MERGE_LOG_NAME).unlink(missing_ok=True)
+        quiz = loaded_quiz()
+        return quiz, [pair for pair in split_pairs(quiz) if quiz.can_merge_teams(pair)]
+
+    results = [
+        measure('load_dir_with_ini', params, lambda _: Quiz.load_dir_with_ini(directory), repeat=repeat),
+        measure('load_dir_with_ini.snapshot_write', params,
+                lambda _: Quiz.load_dir_with_ini(directory, use_snapshot=True), setup=remove_snapshot, repeat=repeat),
+        measure('load_dir_with_ini.snapshot_read', params,
+                lambda _: Quiz.load_dir_with_ini(directory, use_snapshot=True), repeat=repeat),
+        measure('load_dir_with_ini.parallel', params,
+                lambda _: Quiz.load_dir_with_ini(directory, workers=os.cpu_count()), repeat=repeat),
+        measure('update_from_dir.unchanged', params, lambda quiz: quiz.update_from_dir(directory),
+                setup=loaded_quiz, repeat=repeat),
+        measure('scores.cold', params, lambda quiz: quiz.scores(), setup=loaded_quiz, repeat=repeat),
+        measure('scores.cached', params, lambda quiz: quiz.scores(), setup=scored_quiz, repeat=repeat),
+        measure('leaderboard', params, lambda quiz: list(quiz.leaderboard()), setup=scored_quiz, repeat=repeat),
+        measure('leaderboard.as_of', params,
+                lambda quiz: [list(quiz.leaderboard(as_of=time)) for time in scrub_times(quiz)],
+                setup=scored_quiz, repeat=repeat),
+        measure('export_results.csv', params,
+                lambda quiz: quiz.export_results(directory / '.export.csv'), setup=loaded_quiz, repeat=repeat),
+        measure('answer_list', params,
+                lambda quiz: [q.answer_list() for s in quiz.sections for q in s.questions],
+                setup=loaded_quiz, repeat=repeat),
+        measure('mark_answer', params,
+                lambda quiz: quiz.sections[0].questions[0].add_correct_answer(
+                    quiz.sections[0].questions[0].distinct_answers[-1]),
+                setup=scored_quiz, repeat=repeat),
+        measure('can_merge_teams', params,
+                lambda quiz: [quiz.can_merge_teams(pair) for pair in split_pairs(quiz)],
+                setup=loaded_quiz, repeat=repeat),
+        measure('suggest_duplicate_teams', params, lambda quiz: quiz.suggest_duplicate_teams(),
+                setup=loaded_quiz, repeat=repeat),
+        measure('merge_teams', params,
+                lambda state: [state[0].merge_teams(pair) for pair in state[1]],
+                setup=quiz_with_mergeable_pairs, repeat=repeat),
+    ]
+    remove_snapshot()
+    (directory / MERGE_LOG_NAME).unlink(missing_ok=True)
+    (directory / '.export.csv').unlink(missing_ok=True)
+    return results
+
+
+def flask_benchmarks(pubquiz_dir, quiz_name, params, repeat):
+    os.environ['PUBQUIZ_DIR'] = str(pubquiz_dir)
+    try:
+        from ui_flask import app, util
+    except ImportError:
+        return []
+    from answersaver import answer_saver
+
+    client = app.test_client()
+    pages = {
+        'flask.start_page': '/',
+        'flask.pubquiz_page': '/{}/'.format(quiz_name),
+        'flask.section_page': '/{}/section/1'.format(quiz_name),
+        'flask.question_page': '/{}/section/1/question/1'.format(quiz_name),
+    }
+    results = [measure(name, params, lambda _, url=url: client.get(url), repeat=repeat)
+               for name, url in pages.items()]
+    # The answers that are already correct are posted, so every repeat saves the same key
+    with util.using_quiz(quiz_name) as quiz:
+        correct_answers = sorted(quiz.sections[0].questions[0].correct_answers)
+    results.append(measure('flask.question_page.save', params,
+                           lambda _: client.post(pages['flask.question_page'],
+                                                 data={'save': 'Save', 'chkbxs': correct_answers}),
+                           repeat=repeat))
+    # Answers are saved in the background; they are written now, before the quiz directory is removed
+    answer_saver.flush()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the pubquiz benchmarks and print the results as json')
+    parser.add_argument('--sizes', nargs='+', choices=sorted(SIZES), default=['small', 'medium'])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--zipped-sections', type=int, default=1)
+    parser.add_argument('--team-name-column', action='store_true')
+    parser.add_argument('--no-flask', action='store_true')
+    parser.add_argument('--output', help='write the results to this file instead of stdout')
+    args = parser.parse_args()
+
+    results = []
+    pubquiz_dir = pathlib.Path(tempfile.mkdtemp(prefix='pubquiz-bench-'))
+    try:
+        for size in args.sizes:
+            params = dict(SIZES[size], size=size, zipped_sections=args.zipped_sections,
+                          team_name_column=args.team_name_column)
+            directory = generate_quiz(pubquiz_dir / size, teams=params['teams'], sections=params['sections'],
+                                      questions=params['questions'], zipped_sections=args.zipped_sections,
+                                      team_name_column=args.team_name_column)
+            results.extend(core_benchmarks(directory, params, args.repeat))
+            if not args.no_flask:
+                results.extend(flask_benchmarks(pubquiz_dir, size, params, args.repeat))
+    finally:
+        shutil.rmtree(pubquiz_dir)
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as outfile:
+            json.dump(report, outfile, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
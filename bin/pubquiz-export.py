@@ -0,0 +1,13 @@
+import argparse
+
+import export
+
+parser = argparse.ArgumentParser(description='Export the results and leaderboard of a quiz, or of every quiz in a '
+                                             'directory, to one file each per quiz')
+parser.add_argument('directory', help='a quiz directory or a directory of quizzes')
+parser.add_argument('output', help='directory for the exported files')
+parser.add_argument('--format', choices=export.FORMATS, default='csv')
+args = parser.parse_args()
+
+for name in export.export_directory(args.directory, args.output, args.format):
+    print(name)
@@ -0,0 +1,3 @@
+CURRDIR=$(dirname $0)
+export PYTHONPATH=$CURRDIR/../googleformspubquiz
+$CURRDIR/../venv/bin/python $CURRDIR/pubquiz-export.py "$@"
@@ -1,9 +1,20 @@
 class Answer:
-    def __init__(self, question, answer):
-        self.question = question
-        self.answer = answer
-        if question:
-            question.answers.append(self)
+    __slots__ = ('question', 'answer', 'response', 'code')
+
+    def __init__(self, question, answer, response=None, code=None):
+        object.__setattr__(self, 'question', question)
+        object.__setattr__(self, 'answer', answer)
+        object.__setattr__(self, 'code', code)
+        object.__setattr__(self, 'response', None)
+        if question and code is None:
+            question.add_answer(self)
+        object.__setattr__(self, 'response', response)
+
+    def __setattr__(self, name, value):
+        # The answers of a response are views of the response's packed answer codes, so a change would be lost
+        if self.response is not None:
+            raise AttributeError('The answers of a response cannot be changed')
+        object.__setattr__(self, name, value)
 
     def is_correct(self):
         return self.answer in self.question.correct_answers
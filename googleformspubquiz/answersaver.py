@@ -0,0 +1,81 @@
+import atexit
+import logging
+import pathlib
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class AnswerSaver:
+    # Saves the correct answers of sections on a background thread. Saves of the same section within `delay`
+    # seconds are coalesced into one write. Until a save is written, and after it was written, the file holds
+    # nothing newer than the section in memory; `is_current` tells the quiz so it does not load it back.
+    def __init__(self, delay=0.5):
+        self.delay = delay
+        self._pending = {}
+        self._writing = set()
+        self._written = {}
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread = None
+
+    def save(self, section, directory):
+        path = pathlib.Path(directory) / (section.name + '.yaml')
+        with self._condition:
+            self._pending[path] = (section, time.monotonic() + self.delay)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def flush(self, path=None):
+        # Writes the pending saves, or only the one to the given file, and waits until they are written
+        with self._condition:
+            if path is None:
+                pending, self._pending = self._pending, {}
+            else:
+                pending = {path: self._pending.pop(path)} if path in self._pending else {}
+            self._writing.update(pending)
+        for pending_path, (section, _) in pending.items():
+            self._write(pending_path, section)
+        with self._condition:
+            while self._writing if path is None else path in self._writing:
+                self._condition.wait()
+
+    def is_current(self, path, fingerprint):
+        with self._condition:
+            return path in self._pending or path in self._writing or self._written.get(path) == fingerprint
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    now = time.monotonic()
+                    due = [path for path, (_, due_time) in self._pending.items() if due_time <= now]
+                    if due:
+                        break
+                    timeout = min((due_time for _, due_time in self._pending.values()), default=None)
+                    self._condition.wait(None if timeout is None else timeout - now)
+                pending = [(path, self._pending.pop(path)[0]) for path in due]
+                self._writing.update(path for path, _ in pending)
+            for path, section in pending:
+                self._write(path, section)
+
+    def _write(self, path, section):
+        with self._write_lock:
+            try:
+                section.save_answers(path)
+                stat = path.stat()
+                fingerprint = stat.st_size, stat.st_mtime_ns
+            except Exception:
+                logger.exception('Could not save the answers of section %s to %s', section.name, path)
+                fingerprint = None
+        with self._condition:
+            self._writing.discard(path)
+            self._written[path] = fingerprint
+            self._condition.notify_all()
+
+
+answer_saver = AnswerSaver()
+atexit.register(answer_saver.flush)
@@ -0,0 +1,24 @@
+import contextlib
+import os
+import stat
+import uuid
+
+
+@contextlib.contextmanager
+def atomic_write(path, mode='w'):
+    # Writes to a temporary file next to `path` that replaces it when the with block ends, so a crash never leaves a
+    # half-written file. The temporary file is created as open() would, so the kernel applies the umask (mkstemp
+    # would make it readable by its owner only); when it replaces a file it gets that file's mode.
+    temp_name = path.parent / '.{}.{}.tmp'.format(path.name, uuid.uuid4().hex)
+    fd = os.open(temp_name, os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        try:
+            os.chmod(temp_name, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            pass
+        with os.fdopen(fd, mode) as outfile:
+            yield outfile
+        os.replace(temp_name, path)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
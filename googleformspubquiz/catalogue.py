@@ -0,0 +1,136 @@
+import json
+import logging
+import pathlib
+import threading
+import time
+
+from atomicfile import atomic_write
+from quiz import Quiz
+
+logger = logging.getLogger(__name__)
+
+CATALOGUE_NAME = '.pubquiz-catalogue.json'
+CATALOGUE_VERSION = 1
+
+SORT_KEYS = ('name', 'sections', 'teams', 'responses', 'last_activity', 'leader', 'leader_score')
+
+
+def quiz_fingerprint(directory):
+    # Names, sizes and modification times of the files of a quiz; hidden files (snapshots, temporary files) are
+    # written by the program itself and left out
+    fingerprint = []
+    for path in sorted(directory.iterdir()):
+        if path.name.startswith('.') or not path.is_file():
+            continue
+        stat = path.stat()
+        fingerprint.append([path.name, stat.st_size, stat.st_mtime_ns])
+    return fingerprint
+
+
+def quiz_summary(quiz):
+    leader = quiz.standings().top(1)
+    return {
+        'sections': len(quiz.sections),
+        'teams': len(quiz.teams),
+        'responses': sum(len(section.responses) for section in quiz.sections),
+        'leader': leader[0][0].name if leader else None,
+        'leader_score': leader[0][1] if leader else None,
+    }
+
+
+class Catalogue:
+    # Summaries of all quizzes in a directory, kept in a json file in that directory. A quiz is only loaded again
+    # when its files changed; refresh() looks at the files at most once every `interval` seconds. The loader returns
+    # a context manager that gives the quiz, e.g. a Quiz, which closes its store at the end of the with block.
+    def __init__(self, directory, loader=Quiz.load_dir_with_ini, interval=5):
+        self.directory = pathlib.Path(directory)
+        self.loader = loader
+        self.interval = interval
+        self._entries = None
+        self._refreshed = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self):
+        return self.directory / CATALOGUE_NAME
+
+    def refresh(self, force=False):
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._refreshed is not None and now - self._refreshed < self.interval:
+                return False
+            self._refreshed = now
+            if self._entries is None:
+                self._entries = self._read()
+            entries = dict(self._entries)
+
+        # Quizzes are loaded without holding the lock, so entries() is not kept waiting
+        changed = False
+        names = set()
+        for directory in sorted(self.directory.iterdir()):
+            if directory.name.startswith('.') or not directory.is_dir():
+                continue
+            names.add(directory.name)
+            fingerprint = quiz_fingerprint(directory)
+            entry = entries.get(directory.name)
+            if entry is None or entry['fingerprint'] != fingerprint:
+                entries[directory.name] = self._summarize(directory, fingerprint)
+                changed = True
+        for name in set(entries) - names:
+            del entries[name]
+            changed = True
+
+        if changed:
+            with self._lock:
+                self._entries = entries
+                self._write()
+        return changed
+
+    def entries(self, sort='name', reverse=False, search=None):
+        if sort not in SORT_KEYS:
+            raise ValueError('Cannot sort quizzes by {}'.format(sort))
+        with self._lock:
+            entries = list((self._entries or {}).values())
+        if search:
+            search = search.casefold()
+            entries = [entry for entry in entries
+                       if search in entry['name'].casefold() or search in (entry['leader'] or '').casefold()]
+        # Quizzes without a value (e.g. that could not be loaded) come last in either direction
+        present = sorted([entry for entry in entries if entry[sort] is not None], key=lambda entry: entry[sort],
+                         reverse=reverse)
+        return present + [entry for entry in entries if entry[sort] is None]
+
+    def _summarize(self, directory, fingerprint):
+        entry = {
+            'name': directory.name,
+            'fingerprint': fingerprint,
+            'last_activity': max(mtime for _, _, mtime in fingerprint) / 1e9 if fingerprint else None,
+            'sections': None,
+            'teams': None,
+            'responses': None,
+            'leader': None,
+            'leader_score': None,
+            'error': None,
+        }
+        try:
+            with self.loader(directory) as quiz:
+                entry.update(quiz_summary(quiz))
+        except Exception as e:
+            logger.exception('Could not load quiz %s', directory)
+            entry['error'] = str(e)
+        return entry
+
+    def _read(self):
+        try:
+            with self.path.open() as infile:
+                catalogue = json.load(infile)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(catalogue, dict) or catalogue.get('version') != CATALOGUE_VERSION:
+            return {}
+        return {entry['name']: entry for entry in catalogue['quizzes']}
+
+    def _write(self):
+        catalogue = {'version': CATALOGUE_VERSION, 'quizzes': list(self._entries.values())}
+        with atomic_write(self.path) as outfile:
+            json.dump(catalogue, outfile)
@@ -0,0 +1,69 @@
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class SectionColumns:
+    # The responses of a section as a responses x questions matrix of the questions' answer codes, with a boolean
+    # lookup array per question telling which codes are correct. The last element of every lookup array is
+    # False, so the code -1 (no answer) is never correct.
+    def __init__(self, section):
+        self.section = section
+        self.questions = list(section.questions)
+        self._codes = numpy.empty((0, len(self.questions)), dtype=numpy.int32)
+        self._rows = {}
+        self._lookups = [None] * len(self.questions)
+        self._lookup_versions = [None] * len(self.questions)
+
+    def _sync(self):
+        new_responses = self.section.responses[len(self._rows):]
+        if not new_responses:
+            return
+
+        new_codes = numpy.full((len(new_responses), len(self.questions)), -1, dtype=numpy.int32)
+        for i, response in enumerate(new_responses):
+            self._rows[response] = len(self._rows)
+            codes = response.codes
+            new_codes[i, :len(codes)] = codes
+        self._codes = numpy.concatenate([self._codes, new_codes])
+
+    def _lookup(self, j):
+        question = self.questions[j]
+        distinct_answers = question.distinct_answers
+        lookup = self._lookups[j]
+        if lookup is None or self._lookup_versions[j] != question.version or len(lookup) != len(distinct_answers) + 1:
+            lookup = numpy.zeros(len(distinct_answers) + 1, dtype=bool)
+            correct_answers = question.correct_answers
+            for code, value in enumerate(distinct_answers):
+                lookup[code] = value in correct_answers
+            self._lookups[j] = lookup
+            self._lookup_versions[j] = question.version
+        return lookup
+
+    def correct(self):
+        self._sync()
+        if not self.questions:
+            return numpy.zeros(self._codes.shape, dtype=bool)
+        return numpy.stack([self._lookup(j)[self._codes[:, j]] for j in range(len(self.questions))], axis=1)
+
+    def response_scores(self):
+        return self.correct().sum(axis=1)
+
+    def scores(self):
+        response_scores = self.response_scores()
+        return {team: int(response_scores[self._rows[response]])
+                for team, response in self.section.chosen_responses().items()}
+
+    def fraction_of_correct_responses(self, question):
+        self._sync()
+        j = self.questions.index(question)
+        if len(self._codes) == 0:
+            return 0
+        return float(self._lookup(j)[self._codes[:, j]].mean())
+
+    def fractions_of_correct_responses(self):
+        correct = self.correct()
+        if len(correct) == 0:
+            return [0] * len(self.questions)
+        return [float(fraction) for fraction in correct.mean(axis=0)]
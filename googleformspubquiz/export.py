@@ -0,0 +1,119 @@
+import csv
+import itertools
+import json
+import pathlib
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+FORMATS = ('csv', 'jsonl', 'parquet')
+BATCH_SIZE = 1024
+
+# Column types: text, a mark (1 for a correct answer, 0 for a wrong one, empty when the team did not submit the
+# section) or a score
+TEXT, MARK, SCORE = 'text', 'mark', 'score'
+
+
+def results_columns(quiz):
+    columns = [('team_id', TEXT), ('team_name', TEXT)]
+    for section in quiz.sections:
+        columns.extend(('{}: {}'.format(section.name, question.name), MARK) for question in section.questions)
+    columns.extend((section.name, SCORE) for section in quiz.sections)
+    columns.append(('total', SCORE))
+    return columns
+
+
+def result_rows(quiz):
+    # One row per team with a mark for every question; the response that counts is the one chosen by the section
+    for team in quiz.teams:
+        marks = []
+        scores = []
+        for section in quiz.sections:
+            response = section.response_for_team(team)
+            if response is None:
+                marks.extend([None] * len(section.questions))
+                scores.append(None)
+            else:
+                response_marks = response.marks()
+                response_marks.extend([False] * (len(section.questions) - len(response_marks)))
+                marks.extend(int(mark) for mark in response_marks)
+                scores.append(sum(response_marks))
+        yield [team.team_id, team.name] + marks + scores + [sum(score for score in scores if score is not None)]
+
+
+def leaderboard_columns():
+    return [('rank', SCORE), ('team_id', TEXT), ('team_name', TEXT), ('score', SCORE)]
+
+
+def leaderboard_rows(quiz):
+    standings = quiz.standings()
+    for team, score in standings:
+        yield [standings.rank(team), team.team_id, team.name, score]
+
+
+def write_table(out_file, columns, rows, format='csv'):
+    if format not in FORMATS:
+        raise ValueError('Unknown export format: {}'.format(format))
+    if isinstance(out_file, (str, pathlib.Path)):
+        with open(out_file, 'wb' if format == 'parquet' else 'w', newline='' if format == 'csv' else None,
+                  encoding=None if format == 'parquet' else 'utf-8') as stream:
+            write_table(stream, columns, rows, format)
+        return
+
+    if format == 'csv':
+        writer = csv.writer(out_file)
+        writer.writerow([name for name, _ in columns])
+        for row in rows:
+            writer.writerow(['' if value is None else value for value in row])
+    elif format == 'jsonl':
+        names = [name for name, _ in columns]
+        for row in rows:
+            out_file.write(json.dumps(dict(zip(names, row)), ensure_ascii=False) + '\n')
+    else:
+        _write_parquet(out_file, columns, rows)
+
+
+def _write_parquet(out_file, columns, rows):
+    if pyarrow is None:
+        raise ImportError('pyarrow is needed to export to parquet')
+    types = {TEXT: pyarrow.string(), MARK: pyarrow.int8(), SCORE: pyarrow.int32()}
+    schema = pyarrow.schema([(name, types[kind]) for name, kind in columns])
+    with pyarrow.parquet.ParquetWriter(out_file, schema) as writer:
+        # Written in batches, so only BATCH_SIZE rows are held in memory at a time
+        rows = iter(rows)
+        while True:
+            batch = list(itertools.islice(rows, BATCH_SIZE))
+            if not batch:
+                break
+            writer.write_batch(pyarrow.record_batch([list(column) for column in zip(*batch)], schema=schema))
+
+
+def is_quiz_dir(directory):
+    return any(path.suffix in ('.csv', '.zip') or path.name == 'quiz.ini' for path in directory.iterdir())
+
+
+def export_quiz(quiz, out_dir, name, format='csv'):
+    out_dir = pathlib.Path(out_dir)
+    quiz.export_results(out_dir / '{}-results.{}'.format(name, format), format)
+    quiz.export_leaderboard(out_dir / '{}-leaderboard.{}'.format(name, format), format)
+
+
+def export_directory(directory, out_dir, format='csv', loader=None):
+    # Exports a quiz directory, or every quiz in a directory of quizzes. One quiz is loaded at a time.
+    if loader is None:
+        from quiz import Quiz
+        loader = Quiz.load_dir_with_ini
+    directory = pathlib.Path(directory)
+    if is_quiz_dir(directory):
+        quiz_dirs = [directory]
+    else:
+        quiz_dirs = [path for path in sorted(directory.iterdir())
+                     if path.is_dir() and not path.name.startswith('.') and is_quiz_dir(path)]
+
+    pathlib.Path(out_dir).mkdir(parents=True, exist_ok=True)
+    for quiz_dir in quiz_dirs:
+        export_quiz(loader(quiz_dir), out_dir, quiz_dir.name, format)
+    return [quiz_dir.name for quiz_dir in quiz_dirs]
@@ -0,0 +1,84 @@
+import bisect
+import itertools
+
+
+class Leaderboard:
+    # Teams ordered by descending score, then name. Three parallel sorted lists are kept: the sort keys (to find a
+    # team's entry), the negated scores (to search by score) and the teams themselves.
+    def __init__(self, scores=None):
+        self._sequence = itertools.count()
+        self._key_of_team = {}
+        self._scores = {}
+        entries = []
+        for team, score in (scores or {}).items():
+            key = self._key(team, score)
+            self._key_of_team[team] = key
+            self._scores[team] = score
+            entries.append((key, team))
+        entries.sort(key=lambda entry: entry[0])
+
+        self._keys = [key for key, _ in entries]
+        self._negated_scores = [key[0] for key in self._keys]
+        self._teams = [team for _, team in entries]
+
+    def _key(self, team, score):
+        key = self._key_of_team.get(team)
+        sequence = next(self._sequence) if key is None else key[2]
+        return -score, team.name, sequence
+
+    def __len__(self):
+        return len(self._teams)
+
+    def __iter__(self):
+        return iter(self.top(len(self)))
+
+    def __contains__(self, team):
+        return team in self._scores
+
+    def score(self, team):
+        return self._scores[team]
+
+    def set_score(self, team, score):
+        if team in self._scores:
+            if self._scores[team] == score:
+                return
+            self.remove(team)
+
+        key = self._key(team, score)
+        i = bisect.bisect_left(self._keys, key)
+        self._keys.insert(i, key)
+        self._negated_scores.insert(i, key[0])
+        self._teams.insert(i, team)
+        self._key_of_team[team] = key
+        self._scores[team] = score
+
+    def add(self, team, delta):
+        self.set_score(team, self._scores.get(team, 0) + delta)
+
+    def remove(self, team):
+        key = self._key_of_team[team]
+        i = bisect.bisect_left(self._keys, key)
+        del self._keys[i]
+        del self._negated_scores[i]
+        del self._teams[i]
+        del self._scores[team]
+
+    def top(self, n):
+        return [(team, -negated_score) for team, negated_score in zip(self._teams[:n], self._negated_scores[:n])]
+
+    def rank(self, team):
+        return bisect.bisect_left(self._negated_scores, -self._scores[team]) + 1
+
+    def within(self, team, points):
+        score = self._scores[team]
+        start = bisect.bisect_left(self._negated_scores, -(score + points))
+        end = bisect.bisect_right(self._negated_scores, -(score - points))
+        return [(other, -negated_score) for other, negated_score
+                in zip(self._teams[start:end], self._negated_scores[start:end])]
+
+    def rows(self):
+        previous_score = None
+        for i, (team, negated_score) in enumerate(zip(self._teams, self._negated_scores), start=1):
+            score = -negated_score
+            yield [str(i) if previous_score is None or previous_score != score else '', team.name, str(score)]
+            previous_score = score
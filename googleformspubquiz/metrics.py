@@ -0,0 +1,139 @@
+import bisect
+import functools
+import math
+import os
+import threading
+import time
+
+# Read once at import: when disabled, timed() returns the functions undecorated, so instrumentation costs nothing
+enabled = os.environ.get('PUBQUIZ_METRICS', '').lower() not in ('', '0', 'false', 'no')
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield self.name, labels, value
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][i] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self):
+        with self._lock:
+            values = sorted((labels, (list(counts), total, count))
+                            for labels, (counts, total, count) in self._values.items())
+        for labels, (counts, total, count) in values:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), counts):
+                cumulative += n
+                yield self.name + '_bucket', labels + (('le', _format_value(bound)),), cumulative
+            yield self.name + '_sum', labels, total
+            yield self.name + '_count', labels, count
+
+
+def _register(cls, name, *args):
+    with _metrics_lock:
+        metric = _metrics.get(name)
+        if metric is None:
+            metric = _metrics[name] = cls(name, *args)
+        elif not isinstance(metric, cls):
+            raise ValueError('Metric {} is already registered as a {}'.format(name, metric.kind))
+        return metric
+
+
+def counter(name, documentation):
+    return _register(Counter, name, documentation)
+
+
+def histogram(name, documentation, buckets=DEFAULT_BUCKETS):
+    return _register(Histogram, name, documentation, buckets)
+
+
+def timed(name, documentation):
+    # Observes the duration of every call; a call made while the function is already running on the same thread
+    # (e.g. Section.load_answers calling itself) is part of the outer call and not observed separately
+    def decorate(func):
+        if not enabled:
+            return func
+
+        metric = histogram(name, documentation)
+        running = threading.local()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if getattr(running, 'value', False):
+                return func(*args, **kwargs)
+            running.value = True
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metric.observe(time.perf_counter() - start)
+                running.value = False
+        return wrapper
+    return decorate
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = ('{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+               for key, value in labels)
+    return '{' + ','.join(escaped) + '}'
+
+
+def render():
+    # All metrics in the Prometheus text exposition format
+    with _metrics_lock:
+        metrics = sorted(_metrics.values(), key=lambda metric: metric.name)
+    lines = []
+    for metric in metrics:
+        lines.append('# HELP {} {}'.format(metric.name, metric.documentation))
+        lines.append('# TYPE {} {}'.format(metric.name, metric.kind))
+        for name, labels, value in metric.samples():
+            lines.append('{}{} {}'.format(name, _format_labels(labels), _format_value(value)))
+    return '\n'.join(lines) + '\n'
@@ -1,13 +1,31 @@
 import collections
 
 
+from answer import Answer
+from revision import next_revision
+from similarity import AnswerIndex, DEFAULT_THRESHOLD
+
+
 class Question:
+    __slots__ = ('section', 'name', 'version', 'revision', 'distinct_answers', 'answer_counts', 'number_of_answers',
+                 '_answer_codes', '_responses_by_code', '_loose_answers', '_correct_answers', '_correct_answer_set',
+                 '_answer_index')
+
     def __init__(self, name=None, correct_answers=None, section=None, number_in_section=None):
         self.section = None
         self.name = name
-        self._correct_answers = None
+        self.version = 0
+        self.revision = next_revision()
+        self.distinct_answers = []
+        self.answer_counts = []
+        self.number_of_answers = 0
+        self._answer_codes = {}
+        self._responses_by_code = []
+        self._loose_answers = {}
+        self._answer_index = None
+        self._correct_answers = {}
+        self._correct_answer_set = frozenset()
         self.correct_answers = correct_answers or {}
-        self.answers = []
 
         if section is not None:
             section.add_question(self)
@@ -21,23 +39,105 @@ class Question:
 
     @property
     def correct_answers(self):
-        return frozenset(self._correct_answers)
+        return self._correct_answer_set
 
     @correct_answers.setter
     def correct_answers(self, answers):
-        self._correct_answers = []
-        for answer in answers:
-            self.add_correct_answer(answer)
+        new_correct_answers = dict.fromkeys(answers)
+        added = [answer for answer in new_correct_answers if answer not in self._correct_answers]
+        removed = [answer for answer in self._correct_answers if answer not in new_correct_answers]
+        self._correct_answers = new_correct_answers
+        self._correct_answers_changed(added, removed)
 
     def add_correct_answer(self, answer):
-        self._correct_answers.append(answer)
+        if answer not in self._correct_answers:
+            self._correct_answers[answer] = None
+            self._correct_answers_changed([answer], [])
 
     def remove_correct_answer(self, answer):
-        self._correct_answers.remove(answer)
+        del self._correct_answers[answer]
+        self._correct_answers_changed([], [answer])
+
+    def _correct_answers_changed(self, added, removed):
+        if not added and not removed:
+            return
+
+        self._correct_answer_set = frozenset(self._correct_answers)
+        self.version += 1
+        self.revision = next_revision()
+        if self.section is not None:
+            if self.section.columnar:
+                self.section.invalidate_scores()
+            self.section.changed()
+        for answer in added:
+            self._rescore(answer, 1)
+        for answer in removed:
+            self._rescore(answer, -1)
+
+    def _rescore(self, answer, delta):
+        code = self._answer_codes.get(answer)
+        if code is None:
+            return
+        for response in self._responses_by_code[code]:
+            response.score_changed(delta)
+
+    def answer_code(self, answer):
+        code = self._answer_codes.get(answer)
+        if code is None:
+            code = len(self.distinct_answers)
+            self._answer_codes[answer] = code
+            self.distinct_answers.append(answer)
+            self.answer_counts.append(0)
+            self._responses_by_code.append([])
+        return code
+
+    @property
+    def answers(self):
+        # A read-only tuple; answers are added by creating them with this question
+        answers = list(self._loose_answers)
+        for code, responses in enumerate(self._responses_by_code):
+            answer = self.distinct_answers[code]
+            answers.extend(Answer(self, answer, response, code) for response in responses)
+        return tuple(answers)
+
+    def add_answer(self, answer):
+        code = self.answer_code(answer.answer)
+        answer.answer = self.distinct_answers[code]
+        answer.code = code
+        self.answer_counts[code] += 1
+        self.number_of_answers += 1
+        self.revision = next_revision()
+        if answer.response is None:
+            self._loose_answers[answer] = None
+        else:
+            self._responses_by_code[code].append(answer.response)
+
+    def attach_response(self, answer, response):
+        del self._loose_answers[answer]
+        answer.response = response
+        self._responses_by_code[answer.code].append(response)
+
+    def add_response_answer(self, answer, response):
+        code = self.answer_code(answer)
+        self.add_response_code(code, response)
+        return code
+
+    def add_response_code(self, code, response):
+        self.answer_counts[code] += 1
+        self.number_of_answers += 1
+        self.revision = next_revision()
+        self._responses_by_code[code].append(response)
+
+    def answer_count(self, answer):
+        code = self._answer_codes.get(answer)
+        return 0 if code is None else self.answer_counts[code]
 
     def fraction_of_correct_responses(self):
-        correct = sum(1 for answer in self.answers if answer.is_correct())
-        total = len(self.answers)
+        if self.section is not None and self.section.columnar:
+            return self.section.columns().fraction_of_correct_responses(self)
+
+        correct = sum(self.answer_count(answer) for answer in self._correct_answers)
+        total = self.number_of_answers
 
         if total > 0:
             return correct/total
@@ -45,11 +145,24 @@ class Question:
             return 0
 
     def answer_list(self):
-        counter = collections.Counter()
-        for correct in self.correct_answers:
-            counter[correct] = 0
+        counter = collections.Counter(dict.fromkeys(self.correct_answers, 0))
+        counter.update(dict(zip(self.distinct_answers, self.answer_counts)))
+        return counter
 
-        for answer in self.answers:
-            counter[answer.answer] += 1
+    @property
+    def answer_index(self):
+        if self._answer_index is None:
+            self._answer_index = AnswerIndex(self)
+        return self._answer_index
 
-        return counter
+    def similar_answers(self, answer, threshold=DEFAULT_THRESHOLD):
+        return self.answer_index.similar(answer, threshold)
+
+    def mark_cluster_correct(self, threshold=DEFAULT_THRESHOLD):
+        # Marks every given answer that is similar to an answer already marked correct; returns the new ones
+        added = [answer for answer in self.answer_index.cluster(list(self._correct_answers), threshold)
+                 if answer not in self._correct_answers]
+        for answer in added:
+            self._correct_answers[answer] = None
+        self._correct_answers_changed(added, [])
+        return added
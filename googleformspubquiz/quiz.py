@@ -1,21 +1,75 @@
 import collections
-import io
+import contextlib
+import json
+import multiprocessing
 import pathlib
-import zipfile
+import warnings
+from concurrent.futures import ProcessPoolExecutor
 from configparser import ConfigParser
 from typing import List
 
 from team import Team
-from section import Section
+import columnar
+import export
+import metrics
+import similarity
+import snapshot
+from leaderboard import Leaderboard
+from revision import next_revision
+from section import RESPONSE_POLICIES
+from timestamps import DATE_ORDERS, DAY_FIRST, parse_timestamp, parse_zone
+from source import SectionSource, file_fingerprint, parse_section_file
+from sqlstore import SQLiteStore
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+MERGE_LOG_NAME = 'merges.log'
+
+sections_updated = metrics.counter('pubquiz_sections_updated_total', 'Sections changed by Quiz.update_from_dir')
+
+
+def stored_fingerprint(record):
+    return record['size'], record['mtime'], record['answers_fingerprint']
 
 
 class Quiz:
-    def __init__(self, sections=None, teamid_column=None, teamname_column=None):
+    def __init__(self, sections=None, teamid_column=None, teamname_column=None, scoring=None, response_policy=None,
+                 section_response_policies=None, section_deadlines=None, date_order=None, zone=0):
         self.teamname_column = teamname_column
         self.teamid_column = teamid_column
+        self.scoring = scoring
+        if date_order is not None and date_order not in DATE_ORDERS:
+            raise ValueError('Unknown date order: {}'.format(date_order))
+        # None: found per section file
+        self.date_order = date_order
+        # The offset from UTC in seconds of timestamps and deadlines written without a time zone
+        self.zone = zone
+        if scoring == 'columnar' and columnar.numpy is None:
+            warnings.warn('numpy is not installed; falling back to the default scoring engine')
+        for policy in [response_policy, *(section_response_policies or {}).values()]:
+            if policy is not None and policy not in RESPONSE_POLICIES:
+                raise ValueError('Unknown response policy: {}'.format(policy))
+        self._response_policy = response_policy or 'first'
+        # Section names in quiz.ini are not case sensitive
+        self._section_response_policies = {name.casefold(): policy
+                                           for name, policy in (section_response_policies or {}).items()}
+        self._section_deadlines = {name.casefold(): deadline for name, deadline in (section_deadlines or {}).items()}
         self._sections = None
+        self._scores = None
+        self._standings = None
         self.sections = sections or []
+        self._teams = None
         self.teams = []
+        self.directory = None
+        self._merge_log_offset = 0
+        self._sources = {}
+        self._snapshot_records = {}
+        self.store = None
+        self._stored_fingerprints = {}
+        self.revision = next_revision()
 
         for section in self.sections:
             section.quiz = self
@@ -30,30 +84,216 @@ class Quiz:
         for section in new_sections:
             self.add_section(section)
 
+    @property
+    def teams(self):
+        return tuple(team for team in self._teams.values() if self.canonical_team(team) is team)
+
+    @teams.setter
+    def teams(self, new_teams):
+        self._teams = {}
+        self._reset_merges()
+        for team in new_teams:
+            self.add_team(team)
+
+    def add_team(self, team):
+        self._teams[team.team_id] = team
+
+    def _reset_merges(self):
+        # Merged teams form a union-find forest over team ids, with union by size and without path compression,
+        # so every merge can be undone. Only ids that were ever merged have an entry. For every root, the members
+        # of its set and the id of the team that represents the set are kept.
+        self._team_parent = {}
+        self._team_size = {}
+        self._team_members = {}
+        self._team_label = {}
+        self._merges = []
+
+    def _find(self, team_id):
+        parent = self._team_parent.get(team_id, team_id)
+        while parent != team_id:
+            team_id = parent
+            parent = self._team_parent[team_id]
+        return team_id
+
+    def canonical_team(self, team):
+        # The team that represents the merged teams that `team` belongs to
+        if team.team_id not in self._team_parent:
+            return team
+        root = self._find(team.team_id)
+        return self._teams.get(self._team_label.get(root, root), team)
+
+    def team_members(self, team):
+        # All teams merged with `team`, including itself
+        if team.team_id not in self._team_parent:
+            return [team]
+        return [self._teams[team_id] for team_id in self._team_members[self._find(team.team_id)]
+                if team_id in self._teams]
+
+    def _union(self, team_id, other_team_id):
+        root = self._find(team_id)
+        other_root = self._find(other_team_id)
+        if root == other_root:
+            return None
+        for r in (root, other_root):
+            if r not in self._team_parent:
+                self._team_parent[r] = r
+                self._team_size[r] = 1
+                self._team_members[r] = [r]
+
+        label = self._team_label.get(root, root)
+        if self._team_size[root] < self._team_size[other_root]:
+            root, other_root = other_root, root
+        undo = (root, other_root, len(self._team_members[root]), self._team_label.get(root))
+        self._team_parent[other_root] = root
+        self._team_size[root] += self._team_size[other_root]
+        self._team_members[root].extend(self._team_members[other_root])
+        self._team_label[root] = label
+        return undo
+
+    def _merge_ids(self, team_ids):
+        unions = [self._union(team_ids[0], team_id) for team_id in team_ids[1:]]
+        self._merges.append([union for union in unions if union is not None])
+        self._teams_changed()
+
+    def _undo_last_merge(self):
+        if not self._merges:
+            return False
+        for root, other_root, number_of_members, label in reversed(self._merges.pop()):
+            self._team_parent[other_root] = other_root
+            self._team_size[root] -= self._team_size[other_root]
+            del self._team_members[root][number_of_members:]
+            if label is None:
+                self._team_label.pop(root, None)
+            else:
+                self._team_label[root] = label
+        self._teams_changed()
+        return True
+
+    def _teams_changed(self):
+        for section in self.sections:
+            section.teams_changed()
+        self.invalidate_scores()
+        self.changed()
+
+    @property
+    def response_policy(self):
+        return self._response_policy
+
+    @response_policy.setter
+    def response_policy(self, policy):
+        if policy not in RESPONSE_POLICIES:
+            raise ValueError('Unknown response policy: {}'.format(policy))
+        self._response_policy = policy
+        self._teams_changed()
+
+    def response_policy_for(self, section):
+        if section.name is not None:
+            return self._section_response_policies.get(section.name.casefold(), self._response_policy)
+        return self._response_policy
+
+    def deadline_for(self, section):
+        if section.name is not None:
+            return self._section_deadlines.get(section.name.casefold())
+        return None
+
     def add_section(self, section):
         self._sections.append(section)
         section.quiz = self
+        self.invalidate_scores()
+        self.changed()
 
-    def scores(self):
-        scores_dict = collections.Counter()
-        for section in self.sections:
-            scores_dict.update(section.scores())
-        return scores_dict
+    def remove_section(self, section):
+        self._sections.remove(section)
+        section.quiz = None
+        self.invalidate_scores()
+        self.changed()
+
+    def _remove_source(self, source):
+        # The file of a section was deleted or renamed; a renamed file is read again as a new section
+        del self._sources[source.section_name]
+        if source.section in self._sections:
+            self.remove_section(source.section)
+
+    def changed(self):
+        self.revision = next_revision()
+
+    @metrics.timed('pubquiz_quiz_scores_seconds', 'Time spent in Quiz.scores')
+    def scores(self, as_of=None):
+        if as_of is not None:
+            scores_dict = collections.Counter()
+            for section in self.sections:
+                scores_dict.update(section.scores(as_of))
+            return scores_dict
+        if self._scores is None:
+            scores_dict = collections.Counter()
+            for section in self.sections:
+                scores_dict.update(section.scores())
+            self._scores = scores_dict
+        return collections.Counter(self._scores)
+
+    @metrics.timed('pubquiz_quiz_standings_seconds', 'Time spent in Quiz.standings, which sorts the leaderboard')
+    def standings(self):
+        if self._standings is None:
+            self._standings = Leaderboard(self.scores())
+        return self._standings
+
+    def invalidate_scores(self):
+        self._scores = None
+        self._standings = None
+
+    def team_score_changed(self, team, delta):
+        if self._scores is not None:
+            self._scores[team] += delta
+        if self._standings is not None:
+            self._standings.add(team, delta)
 
     @classmethod
-    def load_dir_with_ini(cls, directory):
+    def load_dir_with_ini(cls, directory, use_snapshot=False, workers=None):
+        directory = pathlib.Path(directory)
         ini_file = directory / 'quiz.ini'
         teamid_column = None
         teamname_column = None
+        scoring = None
+        backend = None
+        response_policy = None
+        section_response_policies = {}
+        section_deadlines = {}
+        date_order = None
+        zone = 0
         if ini_file.exists():
             config = ConfigParser()
             config.read(ini_file)
             if 'columns' in config:
                 teamid_column = config['columns'].getint('team_id', None)
                 teamname_column = config['columns'].getint('team_name', None)
+            if 'scoring' in config:
+                scoring = config['scoring'].get('engine', None)
+                response_policy = config['scoring'].get('response', None)
+            if 'responses' in config:
+                section_response_policies = dict(config['responses'])
+            if 'storage' in config:
+                backend = config['storage'].get('backend', None)
+            if 'timestamps' in config:
+                date_order = config['timestamps'].get('date_order', None)
+                if 'zone' in config['timestamps']:
+                    zone = parse_zone(config['timestamps']['zone'])
+                    if zone is None:
+                        raise ValueError('Invalid time zone: {}'.format(config['timestamps']['zone']))
+            if 'deadlines' in config:
+                for name, deadline in config['deadlines'].items():
+                    section_deadlines[name] = parse_timestamp(deadline, date_order or DAY_FIRST, zone)
+                    if section_deadlines[name] is None:
+                        raise ValueError('Invalid deadline for {}: {}'.format(name, deadline))
 
-        quiz = Quiz(teamid_column=teamid_column, teamname_column=teamname_column)
-        quiz.update_from_dir(directory)
+        quiz = Quiz(teamid_column=teamid_column, teamname_column=teamname_column, scoring=scoring,
+                    response_policy=response_policy, section_response_policies=section_response_policies,
+                    section_deadlines=section_deadlines, date_order=date_order, zone=zone)
+        if backend == 'sqlite':
+            quiz.update_from_store(directory, workers=workers)
+        elif use_snapshot:
+            quiz.update_from_snapshot(directory, workers=workers)
+        else:
+            quiz.update_from_dir(directory, workers=workers)
         return quiz
 
     @classmethod
@@ -62,51 +302,213 @@ class Quiz:
         quiz.update_from_dir(directory)
         return quiz
 
-    def update_from_dir(self, directory):
-        for p in sorted(pathlib.Path(directory).iterdir()):
+    @metrics.timed('pubquiz_update_from_dir_seconds', 'Time spent in Quiz.update_from_dir')
+    def update_from_dir(self, directory, workers=None):
+        directory = pathlib.Path(directory)
+        if self.directory is None:
+            self.directory = directory
+        sources = []
+        for p in sorted(directory.iterdir()):
             if p.is_file() and p.suffix == '.csv':
-                section_name = p.stem
-                if not self.get_section(section_name):
-                    with p.open() as infile:
-                        section = Section.read_csv(infile, name=section_name, quiz=self)
-
-                    yaml_name = p.with_suffix('.yaml')
-                    if yaml_name.exists():
-                        section.load_answers(yaml_name)
+                source = self._get_source(p, section_name=p.stem)
             elif p.is_file() and p.suffixes == ['.csv', '.zip']:
-                csv_name = p.stem
-                section_name = p.stem.split('.')[0]
-                if not self.get_section(section_name):
-                    with zipfile.ZipFile(p, 'r') as zipped_file:
-                        with io.TextIOWrapper(zipped_file.open(csv_name, 'r')) as infile:
-                            section = Section.read_csv(infile, name=section_name, quiz=self)
-                    yaml_name = p.parent / (section_name + '.yaml')
-                    if yaml_name.exists():
-                        section.load_answers(yaml_name)
-
-    def leaderboard(self):
-        previous_score = None
-        for i, (team, score) in enumerate(sorted(self.scores().items(), key=lambda x: (-x[1], x[0].name)), start=1):
-            yield [str(i) if previous_score is None or previous_score != score else '', team.name, str(score)]
-            previous_score = score
+                source = self._get_source(p, section_name=p.stem.split('.')[0], csv_name=p.stem)
+            else:
+                continue
+            if source is not None:
+                sources.append(source)
+
+        new_sources = [source for source in sources if source.section is None]
+        if workers is not None and workers > 1 and len(new_sources) > 1:
+            self._parse_in_parallel(new_sources, workers)
+        else:
+            new_sources = []
+
+        updated = []
+        for source in list(sources):
+            try:
+                if source.update(self) or source in new_sources:
+                    updated.append(source.section)
+            except FileNotFoundError:
+                # Removed after the directory was listed
+                sources.remove(source)
+        removed = [source for source in self._sources.values()
+                   if source.path.parent == directory and source not in sources]
+        for source in removed:
+            self._remove_source(source)
+        if updated or removed:
+            self._drop_teams_without_responses()
+        if directory == self.directory:
+            self._read_merge_log()
+            if self.store is not None:
+                self.save_to_store()
+        if metrics.enabled:
+            sections_updated.inc(len(updated))
+        return updated
+
+    def _parse_in_parallel(self, sources, workers):
+        # The callers run other threads (the Qt loader, Flask, the answer saver); a forked worker would inherit the
+        # locks those threads hold, so the workers are started from a clean process instead
+        start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        with ProcessPoolExecutor(max_workers=min(workers, len(sources)),
+                                 mp_context=multiprocessing.get_context(start_method)) as executor:
+            futures = [executor.submit(parse_section_file, source.path, source.section_name, source.csv_name,
+                                       self.teamid_column, self.teamname_column, self.date_order, self.zone)
+                       for source in sources]
+            for source, future in zip(sources, futures):
+                try:
+                    source.restore(future.result(), self)
+                except FileNotFoundError:
+                    # Left to update(), which finds it removed
+                    pass
+
+    def update_from_snapshot(self, directory, workers=None):
+        directory = pathlib.Path(directory)
+        ini_fingerprint = file_fingerprint(directory / 'quiz.ini')
+        quiz_snapshot = snapshot.read_snapshot(directory)
+        if quiz_snapshot is not None and quiz_snapshot['ini'] == ini_fingerprint:
+            self._snapshot_records = quiz_snapshot['sections']
+
+        try:
+            updated_sections = self.update_from_dir(directory, workers=workers)
+        finally:
+            records, self._snapshot_records = self._snapshot_records, {}
+
+        if updated_sections or set(records) != set(self._sources):
+            self.save_snapshot(directory)
+        return updated_sections
+
+    def save_snapshot(self, directory):
+        directory = pathlib.Path(directory)
+        snapshot.write_snapshot({
+            'ini': file_fingerprint(directory / 'quiz.ini'),
+            'sections': {name: source.record() for name, source in self._sources.items()},
+        }, directory)
+
+    def update_from_store(self, directory, workers=None):
+        # Like update_from_snapshot, but with the sections kept in a SQLite database that is updated per section,
+        # so several processes serving the same quiz only parse the files that changed
+        directory = pathlib.Path(directory)
+        if self.store is None:
+            self.store = SQLiteStore.for_directory(directory)
+            if self.store.ini_fingerprint == file_fingerprint(directory / 'quiz.ini'):
+                self._snapshot_records = self.store.records()
+                self._stored_fingerprints = {name: stored_fingerprint(record)
+                                             for name, record in self._snapshot_records.items()}
+        try:
+            return self.update_from_dir(directory, workers=workers)
+        finally:
+            self._snapshot_records = {}
+
+    def close(self):
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def save_to_store(self):
+        # Writes the sections whose files or answers changed since they were stored; merges are kept in the merge log
+        ini_fingerprint = file_fingerprint(self.directory / 'quiz.ini')
+        changed = {}
+        for name, source in self._sources.items():
+            fingerprint = source.size, source.mtime, source.answers_fingerprint
+            if self._stored_fingerprints.get(name) != fingerprint:
+                changed[name] = (self.sections.index(source.section), source.record())
+                self._stored_fingerprints[name] = fingerprint
+        if changed:
+            self.store.save_sections(changed, ini_fingerprint)
+
+        removed = set(self._stored_fingerprints) - set(self._sources)
+        if removed:
+            self.store.remove_sections(removed)
+            for name in removed:
+                del self._stored_fingerprints[name]
+
+    def _get_source(self, path, section_name, csv_name=None):
+        source = self._sources.get(section_name)
+        if source is None:
+            if self.get_section(section_name):
+                return None
+            source = SectionSource(path, section_name, csv_name)
+            self._sources[section_name] = source
+            record = self._snapshot_records.get(section_name)
+            if record is not None and source.is_fresh(record):
+                source.restore(record, self)
+        elif source.path != path:
+            return None
+        return source
+
+    def leaderboard(self, as_of=None):
+        # as_of replays the leaderboard as it was at that time, in seconds since the epoch
+        if as_of is not None:
+            yield from Leaderboard(self.scores(as_of)).rows()
+        else:
+            yield from self.standings().rows()
+
+    def export_results(self, out_file, format='csv'):
+        # Streams a row per team with a mark for every question, and the section and total scores
+        export.write_table(out_file, export.results_columns(self), export.result_rows(self), format)
+
+    def export_leaderboard(self, out_file, format='csv'):
+        export.write_table(out_file, export.leaderboard_columns(), export.leaderboard_rows(self), format)
 
     def get_section(self, name):
         for section in self.sections:
             if section.name == name:
                 return section
 
-    def number_of_responses_per_section_per_team(self):
+    def number_of_responses_per_section_per_team(self, teams=None):
         return {team: {
-            section: len(section.responses_for_team(team)) for section in self.sections
-        } for team in self.teams}
+            section: section.number_of_responses_for_team(team) for section in self.sections
+        } for team in (self.teams if teams is None else teams)}
+
+    def coverage(self, team):
+        # The row of the team x section matrix of response counts. The sections keep their responses indexed by
+        # team as they arrive, so this costs one lookup per section.
+        return [section.number_of_responses_for_team(team) for section in self.sections]
+
+    def suggest_duplicate_teams(self, threshold=0.6):
+        # Pairs of teams with similar names or ids that could be merged, most similar first
+        teams = self.teams
+        scores = {}
+        texts = [[team.name or '' for team in teams]]
+        if any(team.team_id != team.name for team in teams):
+            texts.append([str(team.team_id) for team in teams])
+        for team_texts in texts:
+            for i, j, score in similarity.similar_pairs(team_texts, threshold):
+                scores[i, j] = max(score, scores.get((i, j), 0))
+
+        coverage = [self.coverage(team) for team in teams]
+        suggestions = [(teams[i], teams[j], score) for (i, j), score in scores.items()
+                       if all(a + b <= 1 for a, b in zip(coverage[i], coverage[j]))]
+        suggestions.sort(key=lambda suggestion: -suggestion[2])
+        return suggestions
+
+    def _drop_teams_without_responses(self):
+        # A section that is read again forgets the teams of rows that were removed from its file. Teams merged with
+        # a team that still has responses are kept, as one of them may represent the merged teams.
+        used = {self._find(team.team_id) for section in self.sections for team in section.teams()}
+        unused = [team_id for team_id in self._teams if self._find(team_id) not in used]
+        for team_id in unused:
+            del self._teams[team_id]
+        if unused:
+            self._teams_changed()
+
+    def register_team(self, team_id, team_name):
+        # The team with this id as it appears in the responses, whether or not it was merged
+        team = self._teams.get(team_id)
+        if team is None:
+            team = Team(team_id, team_name)
+            self.add_team(team)
+        return team
 
     def get_team(self, team_id, team_name):
-        for team in self.teams:
-            if team.team_id == team_id:
-                return team
-        new_team = Team(team_id, team_name)
-        self.teams.append(new_team)
-        return new_team
+        return self.canonical_team(self.register_team(team_id, team_name))
 
     def merge_teams(self, teams_to_merge):
         try:
@@ -115,18 +517,75 @@ class Quiz:
         except ValueError:
             pass
 
-        remaining_team = teams_to_merge[0]
-        for team_to_replace in teams_to_merge[1:]:
-            for section in self.sections:
-                section.replace_team(team_to_replace, remaining_team)
-            self.teams.remove(team_to_replace)
+        team_ids = [team.team_id for team in teams_to_merge]
+        with self._merge_log() as log:
+            self._merge_ids(team_ids)
+            self._append_to_merge_log(log, {'merge': team_ids})
+
+    def undo_merge(self):
+        with self._merge_log() as log:
+            if not self._undo_last_merge():
+                return False
+            self._append_to_merge_log(log, {'undo': True})
+        return True
+
+    @contextlib.contextmanager
+    def _merge_log(self):
+        # Other processes serving the quiz append to the same log. Under the lock the log is read up to its end
+        # first, so an entry is applied after everything before it in the log, and the offset is where it ends.
+        if self.directory is None:
+            yield None
+            return
+        with (self.directory / MERGE_LOG_NAME).open('ab') as outfile:
+            if fcntl is not None:
+                fcntl.flock(outfile, fcntl.LOCK_EX)
+            self._read_merge_log()
+            yield outfile
+
+    def _read_merge_log(self):
+        # Applies the merges that were added to the log since it was last read. A log that became shorter was
+        # rewritten, and is replayed from the start.
+        if self.directory is None:
+            return False
+        path = self.directory / MERGE_LOG_NAME
+        size = path.stat().st_size if path.exists() else 0
+        if size == self._merge_log_offset:
+            return False
+        if size < self._merge_log_offset:
+            self._reset_merges()
+            self._merge_log_offset = 0
+            self._teams_changed()
+            if size == 0:
+                return True
+
+        with path.open('rb') as infile:
+            infile.seek(self._merge_log_offset)
+            for line in infile:
+                if not line.endswith(b'\n'):
+                    break
+                self._merge_log_offset += len(line)
+                entry = json.loads(line)
+                if 'merge' in entry:
+                    self._merge_ids(entry['merge'])
+                elif 'undo' in entry:
+                    self._undo_last_merge()
+        return True
+
+    def _append_to_merge_log(self, log, entry):
+        if log is None:
+            return
+        start = log.tell()
+        log.write((json.dumps(entry) + '\n').encode('utf-8'))
+        log.flush()
+        if start == self._merge_log_offset:
+            self._merge_log_offset = log.tell()
 
     def can_merge_teams(self, teams_to_merge: List[Team]):
         if len(teams_to_merge) <= 1:
             return False
 
         sections_answered = collections.Counter()
-        sections = self.number_of_responses_per_section_per_team()
+        sections = self.number_of_responses_per_section_per_team(teams_to_merge)
         for team in teams_to_merge:
             for section, responded in sections[team].items():
                 sections_answered[section] += int(responded)
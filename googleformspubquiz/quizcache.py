@@ -0,0 +1,83 @@
+import collections
+import contextlib
+import pathlib
+import threading
+
+from quiz import Quiz
+from source import file_fingerprint
+
+
+class QuizCache:
+    def __init__(self, max_quizzes=8, max_responses=None, loader=Quiz.load_dir_with_ini):
+        self.max_quizzes = max_quizzes
+        self.max_responses = max_responses
+        self._loader = loader
+        self._quizzes = collections.OrderedDict()
+        self._lock = threading.RLock()
+        # One lock per quiz directory, held while the quiz is loaded or updated and while it is being read; see
+        # using()
+        self._quiz_locks = {}
+
+    def __len__(self):
+        return len(self._quizzes)
+
+    def __contains__(self, directory):
+        return pathlib.Path(directory) in self._quizzes
+
+    def lock_for(self, directory):
+        # Only quizzes that exist get a lock, so requests for made up quiz names do not fill the cache
+        directory = pathlib.Path(directory)
+        with self._lock:
+            lock = self._quiz_locks.get(directory)
+            if lock is None:
+                if not directory.is_dir():
+                    raise FileNotFoundError('No quiz in {}'.format(directory))
+                lock = self._quiz_locks[directory] = threading.RLock()
+            return lock
+
+    @contextlib.contextmanager
+    def using(self, directory):
+        # The cached quiz is shared between threads and changed by every update, so it is only read or changed while
+        # its lock is held
+        with self.lock_for(directory):
+            yield self.get(directory)
+
+    def get(self, directory):
+        directory = pathlib.Path(directory)
+        with self.lock_for(directory):
+            ini_fingerprint = file_fingerprint(directory / 'quiz.ini')
+            with self._lock:
+                entry = self._quizzes.get(directory)
+            if entry is not None and entry[0] == ini_fingerprint:
+                quiz = entry[1]
+                quiz.update_from_dir(directory)
+            else:
+                quiz = self._loader(directory)
+
+            with self._lock:
+                self._quizzes[directory] = (ini_fingerprint, quiz)
+                self._quizzes.move_to_end(directory)
+                self._evict()
+            return quiz
+
+    def invalidate(self, directory=None):
+        with self._lock:
+            if directory is None:
+                self._quizzes.clear()
+            else:
+                self._quizzes.pop(pathlib.Path(directory), None)
+
+    def _evict(self):
+        while len(self._quizzes) > 1 and self._over_budget():
+            self._quizzes.popitem(last=False)
+
+    def _over_budget(self):
+        if self.max_quizzes is not None and len(self._quizzes) > self.max_quizzes:
+            return True
+        if self.max_responses is not None:
+            return sum(number_of_responses(quiz) for _, quiz in self._quizzes.values()) > self.max_responses
+        return False
+
+
+def number_of_responses(quiz):
+    return sum(len(section.responses) for section in quiz.sections)
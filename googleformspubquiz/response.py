@@ -1,8 +1,93 @@
+from array import array
+
+from answer import Answer
+from timestamps import DAY_FIRST, parse_timestamp
+
+
 class Response:
-    def __init__(self, timestamp=None, team=None, answers=None):
-        self.team = team
+    # The answers are stored packed: the questions (usually the section's shared list) and an array with the
+    # question's code for each answer. Answer objects are only created when the answers are read. The timestamp is
+    # kept as submitted for display; time is the parsed timestamp in seconds since the epoch, used for ordering.
+    __slots__ = ('submitted_team', 'timestamp', 'time', 'section', '_score', '_questions', '_codes')
+
+    def __init__(self, timestamp=None, team=None, answers=None, time=None, date_order=DAY_FIRST, zone=0):
+        self.submitted_team = team
         self.timestamp = timestamp
-        self.answers = answers
+        self.time = parse_timestamp(timestamp, date_order, zone) if time is None else time
+        self.section = None
+        self._score = None
+        self._questions = ()
+        self._codes = array('i')
+        if answers is not None:
+            self.answers = answers
+
+    @property
+    def team(self):
+        # The team that submitted the response, or the team it was merged into
+        if self.section is not None and self.section.quiz is not None:
+            return self.section.quiz.canonical_team(self.submitted_team)
+        return self.submitted_team
+
+    @team.setter
+    def team(self, team):
+        self.submitted_team = team
+
+    @property
+    def answers(self):
+        # A read-only tuple; the answers are stored in the questions' answer codes
+        return tuple(Answer(question, question.distinct_answers[code], self, code)
+                     for question, code in zip(self._questions, self._codes))
+
+    @answers.setter
+    def answers(self, answers):
+        answers = list(answers)
+        if self._codes:
+            raise ValueError('The answers of a response can only be set once')
+        if any(answer.question is None for answer in answers):
+            raise ValueError('The answers of a response need a question')
+
+        self._questions = [answer.question for answer in answers]
+        self._codes = array('i', [answer.code for answer in answers])
+        for answer in answers:
+            if answer.response is None:
+                answer.question.attach_response(answer, self)
+            else:
+                # The answer of another response, such as other.answers, is given again
+                answer.question.add_response_code(answer.code, self)
+        self._score = None
+
+    @property
+    def codes(self):
+        return self._codes
+
+    def set_answer_values(self, questions, values):
+        self._questions = questions
+        self._codes = array('i', [question.add_response_answer(value, self)
+                                  for question, value in zip(questions, values)])
+        self._score = None
+
+    def set_answer_codes(self, questions, codes):
+        self._questions = questions
+        self._codes = array('i', codes)
+        for question, code in zip(questions, codes):
+            question.add_response_code(code, self)
+        self._score = None
+
+    def marks(self):
+        # Whether each answer is correct, in the order of the questions
+        return [question.distinct_answers[code] in question.correct_answers
+                for question, code in zip(self._questions, self._codes)]
 
     def score(self):
-        return sum(answer.is_correct() for answer in self.answers)
+        if self._score is None:
+            self._score = sum(question.distinct_answers[code] in question.correct_answers
+                              for question, code in zip(self._questions, self._codes))
+        return self._score
+
+    def score_changed(self, delta):
+        if self._score is None:
+            return
+
+        self._score += delta
+        if self.section is not None:
+            self.section.response_score_changed(self, delta)
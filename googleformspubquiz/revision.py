@@ -0,0 +1,9 @@
+import itertools
+
+# Revisions are drawn from one process-wide counter, so a revision identifies the state of one particular
+# quiz, section or question object; a quiz that is loaded again never reuses the revisions of the old one.
+_revisions = itertools.count(1)
+
+
+def next_revision():
+    return next(_revisions)
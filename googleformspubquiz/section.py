@@ -1,22 +1,91 @@
+import bisect
 import csv
 import pathlib
+import warnings
 from types import SimpleNamespace
 from typing import List
 
 import yaml
 
-from answer import Answer
+import columnar
+from atomicfile import atomic_write
+import metrics
 from response import Response
 from question import Question
+from revision import next_revision
 from team import Team
+from timestamps import DAY_FIRST
+
+# Which of a team's responses counts when it submitted a section more than once
+RESPONSE_POLICIES = ('first', 'last', 'best')
+
+
+def _first_key(response):
+    # Responses with a timestamp that could not be parsed come after all others
+    return response.time is None, response.time or 0
+
+
+def _last_key(response):
+    return response.time is not None, response.time or 0
+
+
+def _best_key(response):
+    return (-response.score(),) + _first_key(response)
+
+
+class RowDecoder:
+    def __init__(self, teamid_column=None, teamname_column=None):
+        if teamid_column is None:
+            teamid_column = 1
+        self.teamid_column = teamid_column
+        self.teamname_column = teamname_column if teamname_column is not None else teamid_column
+
+        self.field_slices = []
+        start = 0
+        for column in sorted({0, teamid_column, self.teamname_column}):
+            if start < column:
+                self.field_slices.append(slice(start, column))
+            start = column + 1
+        self.field_slices.append(slice(start, None))
+
+    def fields(self, csv_line):
+        if len(self.field_slices) == 1:
+            return csv_line[self.field_slices[0]]
+
+        fields = []
+        for field_slice in self.field_slices:
+            fields.extend(csv_line[field_slice])
+        return fields
+
+    def team_id(self, csv_line):
+        return csv_line[self.teamid_column]
+
+    def team_name(self, csv_line):
+        return csv_line[self.teamname_column]
+
+    def read_line(self, csv_line):
+        return SimpleNamespace(timestamp=csv_line[0], team_id=self.team_id(csv_line),
+                               team_name=self.team_name(csv_line), fields=self.fields(csv_line))
 
 
 class Section(object):
     def __init__(self, questions: List[Question] = None, name=None, quiz=None):
         self.name = name
         self.responses = []
+        self._responses_by_team = {}
+        self._chosen_responses = None
+        self._response_policy = None
+        self._deadline = None
+        self._date_order = None
+        # The responses with a known time, sorted by time, and their times for binary search
+        self._timeline = []
+        self._times = []
+        self._scores = None
+        self._columns = None
+        self._row_decoder = None
         self.questions = questions or []
         self.quiz=None
+        self.revision = next_revision()
 
         if quiz is not None:
             quiz.add_section(self)
@@ -31,31 +100,203 @@ class Section(object):
     def add_question(self, question):
         self.questions.append(question)
         question.section = self
+        self.changed()
+
+    def changed(self):
+        self.revision = next_revision()
+        if self.quiz is not None:
+            self.quiz.changed()
+
+    @property
+    def row_decoder(self):
+        if self._row_decoder is None:
+            if self.quiz:
+                self._row_decoder = RowDecoder(self.quiz.teamid_column, self.quiz.teamname_column)
+            else:
+                self._row_decoder = RowDecoder()
+        return self._row_decoder
 
     def set_header(self, header: List[str]):
-        parsed_header = self.read_line(header)
-        for question in parsed_header.fields:
+        self._row_decoder = None
+        for question in self.row_decoder.fields(header):
             Question(question, section=self)
 
     def add_response_from_line(self, response: List[str]):
-        parsed_line = self.read_line(response)
-        answers = [Answer(question=self.questions[i], answer=a) for i, a in enumerate(parsed_line.fields)]
-        team = self.get_team(parsed_line.team_id, parsed_line.team_name)
-        response = Response(timestamp=parsed_line.timestamp, team=team, answers=answers)
+        row_decoder = self.row_decoder
+        team = self.get_team(row_decoder.team_id(response), row_decoder.team_name(response))
+        new_response = Response(timestamp=response[0], team=team, date_order=self.date_order, zone=self.zone)
+        new_response.set_answer_values(self.questions, row_decoder.fields(response))
+        self.add_response(new_response)
+
+    def add_response_from_codes(self, timestamp, team_id, team_name, codes: List[int], time=None):
+        response = Response(timestamp=timestamp, team=self.get_team(team_id, team_name), time=time,
+                            date_order=self.date_order, zone=self.zone)
+        response.set_answer_codes(self.questions, codes)
         self.add_response(response)
 
     def add_response(self, response: Response):
+        response.section = self
         self.responses.append(response)
+        self._responses_by_team.setdefault(response.submitted_team, []).append(response)
+        if response.time is not None:
+            i = bisect.bisect_right(self._times, response.time)
+            self._times.insert(i, response.time)
+            self._timeline.insert(i, response)
+        self.changed()
+
+        if response.time is None and self.deadline is not None:
+            self._warn_without_time([response])
+        if self._chosen_responses is None or not self._in_time(response):
+            return
+        team = response.team
+        chosen = self._chosen_responses.get(team)
+        if chosen is None or self._prefers(response, chosen):
+            self._chosen_responses[team] = response
+            if self._scores is not None:
+                self._set_team_score(team, response.score())
+
+    @property
+    def response_policy(self):
+        if self._response_policy is not None:
+            return self._response_policy
+        if self.quiz is not None:
+            return self.quiz.response_policy_for(self)
+        return 'first'
+
+    @response_policy.setter
+    def response_policy(self, policy):
+        if policy is not None and policy not in RESPONSE_POLICIES:
+            raise ValueError('Unknown response policy: {}'.format(policy))
+        self._response_policy = policy
+        self.teams_changed()
+
+    @property
+    def date_order(self):
+        # Whether the day or the month comes first in timestamps with the year last: as set in quiz.ini, or as found
+        # in the section's file by SectionSource
+        if self._date_order is not None:
+            return self._date_order
+        if self.quiz is not None and self.quiz.date_order is not None:
+            return self.quiz.date_order
+        return DAY_FIRST
+
+    @date_order.setter
+    def date_order(self, date_order):
+        self._date_order = date_order
+
+    @property
+    def zone(self):
+        # The offset from UTC in seconds of timestamps without a time zone
+        return self.quiz.zone if self.quiz is not None else 0
+
+    @property
+    def deadline(self):
+        # Seconds since the epoch; responses submitted later do not count
+        if self._deadline is not None:
+            return self._deadline
+        if self.quiz is not None:
+            return self.quiz.deadline_for(self)
+        return None
+
+    @deadline.setter
+    def deadline(self, deadline):
+        self._deadline = deadline
+        self.teams_changed()
+
+    def _in_time(self, response):
+        deadline = self.deadline
+        return deadline is None or (response.time is not None and response.time <= deadline)
+
+    def _warn_without_time(self, responses):
+        # Whether a response without a time was in time cannot be told, so it does not count when there is a deadline
+        count = sum(response.time is None for response in responses)
+        if count:
+            warnings.warn('{}: {} response(s) with a timestamp that could not be read do not count because of the '
+                          'deadline'.format(self.name, count))
+
+    def responses_until(self, time):
+        # The responses submitted at or before the given time, in order of time
+        return self._timeline[:bisect.bisect_right(self._times, time)]
+
+    def _prefers(self, response, chosen):
+        # Ties go to the response that was added first, or for 'last' to the one added last
+        policy = self.response_policy
+        if policy == 'last':
+            return _last_key(response) >= _last_key(chosen)
+        if policy == 'best':
+            return _best_key(response) < _best_key(chosen)
+        return _first_key(response) < _first_key(chosen)
+
+    def _choose(self, responses):
+        if self.deadline is not None:
+            responses = [response for response in responses if self._in_time(response)]
+        if not responses:
+            return None
+        policy = self.response_policy
+        if policy == 'last':
+            return max(reversed(responses), key=_last_key)
+        if policy == 'best':
+            return min(responses, key=_best_key)
+        return min(responses, key=_first_key)
+
+    def chosen_responses(self):
+        # The response that counts for each team; teams without a response before the deadline are left out
+        if self._chosen_responses is None:
+            if self.deadline is not None:
+                self._warn_without_time(self.responses)
+            self._chosen_responses = {}
+            for team in self.teams():
+                response = self._choose(self._team_responses(team))
+                if response is not None:
+                    self._chosen_responses[team] = response
+        return self._chosen_responses
+
+    def chosen_responses_as_of(self, time):
+        deadline = self.deadline
+        if deadline is not None:
+            time = min(time, deadline)
+        chosen = {}
+        for response in self.responses_until(time):
+            team = response.team
+            if team not in chosen or self._prefers(response, chosen[team]):
+                chosen[team] = response
+        return chosen
+
+    def teams_changed(self):
+        # The teams were merged or the policy changed, so the chosen responses have to be chosen again
+        self._chosen_responses = None
+        self.invalidate_scores()
+        self.changed()
+
+    def add_row(self, row: List[str]):
+        if row[1] == 'Correct answers':
+            self.set_correct_answers_from_line(row)
+        else:
+            self.add_response_from_line(row)
+
+    def clear(self):
+        for question in self.questions:
+            question.section = None
+        self.questions = []
+        self.responses = []
+        self._responses_by_team = {}
+        self._chosen_responses = None
+        self._timeline = []
+        self._times = []
+        self._columns = None
+        self._row_decoder = None
+        self.invalidate_scores()
+        self.changed()
 
     def set_correct_answers(self, correct_answers):
         for question, correct_answer in zip(self.questions, correct_answers):
             question.add_correct_answer(correct_answer)
 
     def set_correct_answers_from_line(self, row: List[str]):
-        parsed_answers = self.read_line(row)
-        self.set_correct_answers(parsed_answers.fields)
+        self.set_correct_answers(self.row_decoder.fields(row))
 
     @classmethod
+    @metrics.timed('pubquiz_read_csv_seconds', 'Time spent in Section.read_csv')
     def read_csv(cls, infile, name=None, quiz=None, teamid_column=None, teamname_column=None):
         section = Section(name=name, quiz=quiz)
         csv_reader = csv.reader(infile)
@@ -63,15 +304,50 @@ class Section(object):
         section.set_header(header)
 
         for row in csv_reader:
-            if row[1] == 'Correct answers':
-                section.set_correct_answers_from_line(row)
-            else:
-                section.add_response_from_line(row)
+            section.add_row(row)
 
         return section
 
-    def scores(self):
-        return {team: self.response_for_team(team).score() for team in self.teams()}
+    @property
+    def columnar(self):
+        return self.quiz is not None and self.quiz.scoring == 'columnar' and columnar.numpy is not None
+
+    def columns(self):
+        if self._columns is None or self._columns.questions != self.questions:
+            self._columns = columnar.SectionColumns(self)
+        return self._columns
+
+    def scores(self, as_of=None):
+        if as_of is not None:
+            return {team: response.score() for team, response in self.chosen_responses_as_of(as_of).items()}
+        if self._scores is None:
+            if self.columnar:
+                self._scores = self.columns().scores()
+            else:
+                self._scores = {team: response.score() for team, response in self.chosen_responses().items()}
+        return dict(self._scores)
+
+    def invalidate_scores(self):
+        self._scores = None
+        if self.quiz is not None:
+            self.quiz.invalidate_scores()
+
+    def response_score_changed(self, response, delta):
+        team = response.team
+        if self._chosen_responses is not None and self.response_policy == 'best' and self._in_time(response):
+            # Another of the team's responses may now score best
+            chosen = self._choose(self._team_responses(team))
+            self._chosen_responses[team] = chosen
+            if self._scores is not None:
+                self._set_team_score(team, chosen.score())
+        elif self._scores is not None and self.response_for_team(team) is response:
+            self._set_team_score(team, self._scores[team] + delta)
+
+    def _set_team_score(self, team, score):
+        delta = score - self._scores.get(team, 0)
+        self._scores[team] = score
+        if self.quiz is not None:
+            self.quiz.team_score_changed(team, delta)
 
     def fraction_of_correct_answers(self):
         correct_answers = sum(self.scores().values())
@@ -82,23 +358,38 @@ class Section(object):
         else:
             return 0
 
+    def _team_responses(self, team):
+        # Responses are indexed by the team that submitted them; a merged team has the responses of all its members
+        if self.quiz is None:
+            return self._responses_by_team.get(team, ())
+        members = self.quiz.team_members(team)
+        if len(members) == 1:
+            return self._responses_by_team.get(members[0], ())
+        return [response for member in members for response in self._responses_by_team.get(member, ())]
+
     def response_for_team(self, team):
-        responses = sorted(self.responses_for_team(team), key=lambda x: x.timestamp)
-        if responses:
-            return responses[0]
-        else:
-            return None
+        if self.quiz is not None:
+            team = self.quiz.canonical_team(team)
+        return self.chosen_responses().get(team)
 
     def responses_for_team(self, team):
-        return {response for response in self.responses if response.team == team}
+        return set(self._team_responses(team))
+
+    def number_of_responses_for_team(self, team):
+        return len(self._team_responses(team))
 
     def teams(self):
-        return {response.team for response in self.responses}
+        if self.quiz is None:
+            return set(self._responses_by_team)
+        return {self.quiz.canonical_team(team) for team in self._responses_by_team}
 
     def replace_team(self, team_to_replace, new_team):
-        for response in self.responses:
-            if response.team == team_to_replace:
-                response.team = new_team
+        responses = self._responses_by_team.pop(team_to_replace, [])
+        for response in responses:
+            response.team = new_team
+        if responses:
+            self._responses_by_team.setdefault(new_team, []).extend(responses)
+            self.teams_changed()
 
     def save_answers(self, out_file):
         if isinstance(out_file, str):
@@ -108,13 +399,14 @@ class Section(object):
         elif isinstance(out_file, pathlib.Path):
             if out_file.is_dir():
                 out_file = out_file / (self.name + '.yaml')
-            with out_file.open('w') as stream:
+            with atomic_write(out_file) as stream:
                 self.save_answers(stream)
             return
 
         data = [list(question.correct_answers) for question in self.questions]
         yaml.dump(data, out_file, default_flow_style=False, allow_unicode=True)
 
+    @metrics.timed('pubquiz_load_answers_seconds', 'Time spent in Section.load_answers')
     def load_answers(self, in_file):
         if isinstance(in_file, str):
             path = pathlib.Path(in_file)
@@ -134,7 +426,7 @@ class Section(object):
 
     def get_team(self, team_id, team_name):
         if self.quiz:
-            return self.quiz.get_team(team_id, team_name)
+            return self.quiz.register_team(team_id, team_name)
         else:
             return Team(team_id, team_name)
 
@@ -146,13 +438,4 @@ class Section(object):
 
     @staticmethod
     def _read_line(csv_line, teamid_column=None, teamname_column=None):
-        timestamp = csv_line[0]
-        if teamid_column is None:
-            teamid_column = 1
-        team_id = csv_line[teamid_column]
-
-        team_name = csv_line[teamname_column] if teamname_column is not None else team_id
-
-        fields = [elt for i, elt in enumerate(csv_line) if i not in [0, teamid_column, teamname_column]]
-
-        return SimpleNamespace(timestamp=timestamp, team_id=team_id, team_name=team_name, fields=fields)
+        return RowDecoder(teamid_column, teamname_column).read_line(csv_line)
@@ -0,0 +1,87 @@
+import collections
+import math
+import re
+import unicodedata
+
+DEFAULT_THRESHOLD = 0.5
+
+_separators = re.compile(r'[\W_]+')
+
+
+def normalize(answer):
+    # Case, accents, punctuation and spacing do not make answers different
+    decomposed = unicodedata.normalize('NFKD', answer.casefold())
+    without_accents = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return _separators.sub(' ', without_accents).strip()
+
+
+def trigrams(text):
+    padded = '  ' + text + ' '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def dice(grams1, grams2):
+    return 2 * len(grams1 & grams2) / (len(grams1) + len(grams2))
+
+
+def similar_pairs(texts, threshold=DEFAULT_THRESHOLD):
+    # Yields (i, j, similarity) for the pairs of similar texts, i < j. Trigrams that occur in very many texts (such
+    # as "tea" when every team is called "Team ...") say nothing about two texts being alike; they are left out, so
+    # "Team 12" and "Team 13" are not similar, and candidates are found through the remaining trigrams without
+    # comparing all pairs.
+    all_grams = [trigrams(normalize(text)) for text in texts]
+    frequency = collections.Counter(gram for text_grams in all_grams for gram in text_grams)
+    max_frequency = max(32, 4 * int(math.sqrt(len(texts))))
+    grams = [{gram for gram in text_grams if frequency[gram] <= max_frequency} or text_grams
+             for text_grams in all_grams]
+
+    postings = collections.defaultdict(list)
+    for i, text_grams in enumerate(grams):
+        for gram in text_grams:
+            postings[gram].append(i)
+
+    for i, text_grams in enumerate(grams):
+        candidates = set()
+        for gram in text_grams:
+            candidates.update(postings[gram])
+        for j in sorted(candidates):
+            if j > i:
+                score = dice(text_grams, grams[j])
+                if score >= threshold:
+                    yield i, j, score
+
+
+class AnswerIndex:
+    # Trigram index over the distinct answers of a question. Two answers are similar when the Dice coefficient of
+    # their trigram sets reaches the threshold. A lookup only visits the answers that share a trigram with the
+    # query, so clustering all answers of a question does not compare every pair.
+    def __init__(self, question):
+        self.question = question
+        self._trigrams = []
+        self._postings = collections.defaultdict(list)
+
+    def _sync(self):
+        distinct_answers = self.question.distinct_answers
+        for code in range(len(self._trigrams), len(distinct_answers)):
+            grams = trigrams(normalize(distinct_answers[code]))
+            self._trigrams.append(grams)
+            for gram in grams:
+                self._postings[gram].append(code)
+
+    def similar(self, answer, threshold=DEFAULT_THRESHOLD):
+        self._sync()
+        grams = trigrams(normalize(answer))
+        shared = collections.Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+
+        distinct_answers = self.question.distinct_answers
+        return [distinct_answers[code] for code, n in shared.items()
+                if 2 * n / (len(grams) + len(self._trigrams[code])) >= threshold]
+
+    def cluster(self, answers, threshold=DEFAULT_THRESHOLD):
+        # The given answers and every answer similar to one of them
+        cluster = dict.fromkeys(answers)
+        for answer in answers:
+            cluster.update(dict.fromkeys(self.similar(answer, threshold)))
+        return list(cluster)
@@ -0,0 +1,40 @@
+import hashlib
+import json
+
+from atomicfile import atomic_write
+
+SNAPSHOT_NAME = '.pubquiz-snapshot'
+SNAPSHOT_VERSION = 5
+
+# The snapshot is plain json, so reading one cannot run code. The first line holds the version and a sha256 of the
+# rest of the file; a snapshot that was cut short or edited is ignored and the quiz is loaded from its files.
+
+
+def _fingerprint(value):
+    return None if value is None else tuple(value)
+
+
+def read_snapshot(directory):
+    try:
+        with (directory / SNAPSHOT_NAME).open('rb') as infile:
+            header = infile.readline().split()
+            body = infile.read()
+        if header != [str(SNAPSHOT_VERSION).encode(), hashlib.sha256(body).hexdigest().encode()]:
+            return None
+        snapshot = json.loads(body.decode('utf-8'))
+        snapshot['ini'] = _fingerprint(snapshot['ini'])
+        for record in snapshot['sections'].values():
+            record['answers_fingerprint'] = _fingerprint(record['answers_fingerprint'])
+            record['check'] = bytes.fromhex(record['check'])
+    except Exception:
+        return None
+    return snapshot
+
+
+def write_snapshot(snapshot, directory):
+    snapshot = dict(snapshot, sections={name: dict(record, check=record['check'].hex())
+                                        for name, record in snapshot['sections'].items()})
+    body = json.dumps(snapshot, separators=(',', ':')).encode('utf-8')
+    with atomic_write(directory / SNAPSHOT_NAME, 'wb') as outfile:
+        outfile.write('{} {}\n'.format(SNAPSHOT_VERSION, hashlib.sha256(body).hexdigest()).encode())
+        outfile.write(body)
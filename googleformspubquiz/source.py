@@ -0,0 +1,206 @@
+import csv
+import io
+import zipfile
+
+import metrics
+from answersaver import answer_saver
+from question import Question
+from section import Section
+from timestamps import detect_date_order
+
+
+def parse_section_file(path, section_name, csv_name=None, teamid_column=None, teamname_column=None, date_order=None,
+                       zone=0):
+    # Runs in a worker process when loading in parallel; the record is restored into the real quiz by the parent.
+    from quiz import Quiz
+    source = SectionSource(path, section_name, csv_name)
+    source.update(Quiz(teamid_column=teamid_column, teamname_column=teamname_column, date_order=date_order,
+                       zone=zone))
+    return source.record()
+
+
+def file_fingerprint(path):
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class SectionSource:
+    # Plain csv files are read incrementally from the offset of the last complete row. Zipped files, and files
+    # that were truncated or rewritten, are parsed again from the start.
+    check_length = 64
+
+    def __init__(self, path, section_name, csv_name=None):
+        self.path = path
+        self.section_name = section_name
+        self.csv_name = csv_name
+        self.section = None
+        self.size = None
+        self.mtime = None
+        self.answers_fingerprint = None
+        self.offset = 0
+        self.columns = 0
+        self._check = b''
+        self._record_end = 0
+
+    @property
+    def zipped(self):
+        return self.csv_name is not None
+
+    @property
+    def answers_path(self):
+        return self.path.parent / (self.section_name + '.yaml')
+
+    @metrics.timed('pubquiz_section_source_update_seconds',
+                   'Time spent reading csv and zip files in SectionSource.update')
+    def update(self, quiz):
+        stat = self.path.stat()
+        if self.section is not None and (stat.st_size, stat.st_mtime_ns) == (self.size, self.mtime):
+            return self._update_answers()
+
+        if (self.section is not None and not self.zipped and self._is_appended(stat.st_size)
+                and not self._date_order_changed(quiz)):
+            self._read_from(self.offset)
+            self._update_answers()
+        else:
+            # The section is read again from scratch, so the answers that are still to be saved are written first
+            # and then read back
+            answer_saver.flush(self.answers_path)
+            self._load(quiz)
+            self._update_answers(force=True)
+
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime_ns
+        return True
+
+    def _update_answers(self, force=False):
+        fingerprint = file_fingerprint(self.answers_path)
+        if fingerprint is None:
+            self.answers_fingerprint = None
+            return False
+        if fingerprint == self.answers_fingerprint and not force:
+            return False
+        if not force and answer_saver.is_current(self.answers_path, fingerprint):
+            self.answers_fingerprint = fingerprint
+            return False
+        self.section.load_answers(self.answers_path)
+        self.answers_fingerprint = fingerprint
+        return True
+
+    def record(self):
+        questions = self.section.questions
+        return {
+            'path': self.path.name,
+            'csv_name': self.csv_name,
+            'size': self.size,
+            'mtime': self.mtime,
+            'answers_fingerprint': self.answers_fingerprint,
+            'offset': self.offset,
+            'columns': self.columns,
+            'check': self._check,
+            'date_order': self.section._date_order,
+            'questions': [question.name for question in questions],
+            'distinct_answers': [question.distinct_answers for question in questions],
+            'correct_answers': [list(question.correct_answers) for question in questions],
+            'responses': [(response.timestamp, response.time, response.submitted_team.team_id,
+                           response.submitted_team.name, list(response.codes)) for response in self.section.responses],
+        }
+
+    def is_fresh(self, record):
+        return (record['path'] == self.path.name and record['csv_name'] == self.csv_name
+                and (record['size'], record['mtime']) == file_fingerprint(self.path)
+                and record['answers_fingerprint'] == file_fingerprint(self.answers_path))
+
+    def restore(self, record, quiz):
+        self.section = Section(name=self.section_name, quiz=quiz)
+        self.section.date_order = record['date_order']
+        for name, distinct_answers in zip(record['questions'], record['distinct_answers']):
+            question = Question(name, section=self.section)
+            for answer in distinct_answers:
+                question.answer_code(answer)
+        for timestamp, time, team_id, team_name, codes in record['responses']:
+            self.section.add_response_from_codes(timestamp, team_id, team_name, codes, time=time)
+        for question, correct_answers in zip(self.section.questions, record['correct_answers']):
+            question.correct_answers = correct_answers
+
+        self.size = record['size']
+        self.mtime = record['mtime']
+        self.answers_fingerprint = record['answers_fingerprint']
+        self.offset = record['offset']
+        self.columns = record['columns']
+        self._check = record['check']
+
+    def _load(self, quiz):
+        if self.section is None:
+            self.section = Section(name=self.section_name, quiz=quiz)
+        else:
+            self.section.clear()
+
+        if self.zipped:
+            with zipfile.ZipFile(self.path, 'r') as zipped_file:
+                with io.TextIOWrapper(zipped_file.open(self.csv_name, 'r')) as infile:
+                    text = infile.read()
+            self._set_date_order(quiz, text)
+            csv_reader = csv.reader(io.StringIO(text))
+            self.section.set_header(next(csv_reader))
+            for row in csv_reader:
+                if row:
+                    self.section.add_row(row)
+        else:
+            self._set_date_order(quiz, self.path.read_bytes().decode('utf-8', errors='replace'))
+            self.offset = 0
+            self.columns = 0
+            self._check = b''
+            self._read_from(0)
+
+    def _set_date_order(self, quiz, text):
+        # Unless quiz.ini says otherwise, the order of day and month is taken from the whole file, never per row
+        if quiz.date_order is None:
+            self.section.date_order = detect_date_order(text)
+
+    def _date_order_changed(self, quiz):
+        # Appended rows can show that the order guessed for the file so far was wrong; the file is then read again
+        if quiz.date_order is not None:
+            return False
+        with self.path.open('rb') as infile:
+            infile.seek(self.offset)
+            date_order = detect_date_order(infile.read().decode('utf-8', errors='replace'))
+        return date_order is not None and date_order != self.section.date_order
+
+    def _is_appended(self, size):
+        if size < self.offset:
+            return False
+        with self.path.open('rb') as infile:
+            infile.seek(self.offset - len(self._check))
+            return infile.read(len(self._check)) == self._check
+
+    def _read_from(self, offset):
+        with self.path.open('rb') as infile:
+            infile.seek(offset)
+            self._record_end = offset
+            for row in csv.reader(self._records(infile)):
+                self.offset = self._record_end
+                if not row:
+                    continue
+                if self.columns == 0:
+                    self.section.set_header(row)
+                    self.columns = len(row)
+                else:
+                    self.section.add_row(row)
+
+            infile.seek(max(self.offset - self.check_length, 0))
+            self._check = infile.read(self.offset - infile.tell())
+
+    def _records(self, infile):
+        # Yields complete csv records; a record is complete when its quotes are balanced and it ends with a newline,
+        # so quoted fields containing newlines are kept together and a half-written record at the end of the file,
+        # even one that already has all its columns, is left for the next read.
+        record = b''
+        for line in infile:
+            record += line
+            if record.endswith(b'\n') and record.count(b'"') % 2 == 0:
+                self._record_end += len(record)
+                yield record.decode('utf-8')
+                record = b''
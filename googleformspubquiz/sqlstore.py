@@ -0,0 +1,167 @@
+import sqlite3
+import threading
+from array import array
+
+STORE_NAME = '.pubquiz.sqlite'
+STORE_VERSION = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+CREATE TABLE IF NOT EXISTS sections (
+    name TEXT PRIMARY KEY, position INTEGER, path TEXT, csv_name TEXT, size INTEGER, mtime INTEGER,
+    answers_size INTEGER, answers_mtime INTEGER, offset INTEGER, columns INTEGER, check_bytes BLOB,
+    date_order TEXT);
+CREATE TABLE IF NOT EXISTS questions (
+    section TEXT, position INTEGER, name TEXT, PRIMARY KEY (section, position)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS answers (
+    section TEXT, question INTEGER, code INTEGER, value TEXT, PRIMARY KEY (section, question, code)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS correct_answers (
+    section TEXT, question INTEGER, value TEXT, PRIMARY KEY (section, question, value)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS responses (
+    section TEXT, seq INTEGER, timestamp TEXT, time INTEGER, team_id TEXT, team_name TEXT, codes BLOB,
+    PRIMARY KEY (section, seq)) WITHOUT ROWID;
+"""
+
+SECTION_TABLES = ('questions', 'answers', 'correct_answers', 'responses')
+
+
+class SQLiteStore:
+    # The sections, responses and answer keys of a quiz in a SQLite database in the quiz directory. Sections
+    # are kept in the same form as SectionSource.record(), so a process can restore a quiz without parsing its files.
+    # Scores are not computed here: the quiz keeps them up to date in memory, which is faster than aggregating them
+    # in SQL. Connections are shared between threads behind a lock; other processes use the same file, which sqlite
+    # locks for writing.
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(path), timeout=30, check_same_thread=False, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        with self._lock, self._transaction():
+            if self._get_meta('version') != STORE_VERSION:
+                # A store written by another version is rebuilt from the quiz files
+                for (table,) in self._connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'"
+                                                         ).fetchall():
+                    self._connection.execute('DROP TABLE {}'.format(table))
+                for statement in SCHEMA.split(';'):
+                    if statement.strip():
+                        self._connection.execute(statement)
+                self._set_meta('version', STORE_VERSION)
+
+    @classmethod
+    def for_directory(cls, directory):
+        return cls(directory / STORE_NAME)
+
+    def close(self):
+        self._connection.close()
+
+    def _transaction(self, mode='IMMEDIATE'):
+        return _Transaction(self._connection, mode)
+
+    def _get_meta(self, key):
+        try:
+            row = self._connection.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return None if row is None else row[0]
+
+    def _set_meta(self, key, value):
+        self._connection.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    @property
+    def ini_fingerprint(self):
+        with self._lock:
+            value = self._get_meta('ini')
+        return None if value is None else tuple(int(part) for part in value.split(','))
+
+    def save_sections(self, records, ini_fingerprint):
+        # records: section name -> (position, record)
+        with self._lock, self._transaction():
+            self._set_meta('ini', None if ini_fingerprint is None else '{},{}'.format(*ini_fingerprint))
+            for name, (position, record) in records.items():
+                self._save_section(name, position, record)
+
+    def _save_section(self, name, position, record):
+        self._delete_section(name)
+        answers_size, answers_mtime = record['answers_fingerprint'] or (None, None)
+        self._connection.execute(
+            'INSERT INTO sections VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (name, position, record['path'], record['csv_name'], record['size'], record['mtime'], answers_size,
+             answers_mtime, record['offset'], record['columns'], record['check'], record['date_order']))
+        self._connection.executemany('INSERT INTO questions VALUES (?, ?, ?)',
+                                     ((name, i, question) for i, question in enumerate(record['questions'])))
+        self._connection.executemany(
+            'INSERT INTO answers VALUES (?, ?, ?, ?)',
+            ((name, i, code, value) for i, values in enumerate(record['distinct_answers'])
+             for code, value in enumerate(values)))
+        self._connection.executemany(
+            'INSERT OR IGNORE INTO correct_answers VALUES (?, ?, ?)',
+            ((name, i, value) for i, values in enumerate(record['correct_answers']) for value in values))
+        self._connection.executemany(
+            'INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+            ((name, seq, timestamp, time, team_id, team_name, array('i', codes).tobytes())
+             for seq, (timestamp, time, team_id, team_name, codes) in enumerate(record['responses'])))
+
+    def _delete_section(self, name):
+        self._connection.execute('DELETE FROM sections WHERE name = ?', (name,))
+        for table in SECTION_TABLES:
+            self._connection.execute('DELETE FROM {} WHERE section = ?'.format(table), (name,))
+
+    def remove_sections(self, names):
+        with self._lock, self._transaction():
+            for name in names:
+                self._delete_section(name)
+
+    def records(self):
+        # Section name -> record, in the form of SectionSource.record()
+        with self._lock, self._transaction('DEFERRED'):
+            return {name: self._record(name, row) for name, *row
+                    in self._connection.execute('SELECT * FROM sections ORDER BY position').fetchall()}
+
+    def _record(self, name, row):
+        position, path, csv_name, size, mtime, answers_size, answers_mtime, offset, columns, check, date_order = row
+        execute = self._connection.execute
+        questions = [question for (question,) in execute(
+            'SELECT name FROM questions WHERE section = ? ORDER BY position', (name,))]
+        distinct_answers = [[] for _ in questions]
+        for question, value in execute('SELECT question, value FROM answers WHERE section = ? ORDER BY question, code',
+                                       (name,)):
+            distinct_answers[question].append(value)
+        correct_answers = [[] for _ in questions]
+        for question, value in execute('SELECT question, value FROM correct_answers WHERE section = ?', (name,)):
+            correct_answers[question].append(value)
+
+        # The codes of a response are kept packed, so restoring does not read them per answer
+        responses = [(timestamp, time, team_id, team_name, array('i', codes))
+                     for timestamp, time, team_id, team_name, codes
+                     in execute('SELECT timestamp, time, team_id, team_name, codes FROM responses WHERE section = ? '
+                                'ORDER BY seq', (name,))]
+        return {
+            'path': path,
+            'csv_name': csv_name,
+            'size': size,
+            'mtime': mtime,
+            'answers_fingerprint': None if answers_size is None else (answers_size, answers_mtime),
+            'offset': offset,
+            'columns': columns,
+            'check': check,
+            'date_order': date_order,
+            'questions': questions,
+            'distinct_answers': distinct_answers,
+            'correct_answers': correct_answers,
+            'responses': responses,
+        }
+
+
+class _Transaction:
+    # The connection is in autocommit mode; IMMEDIATE takes the write lock at the start, so two processes saving
+    # sections at the same time wait for each other instead of failing halfway
+    def __init__(self, connection, mode):
+        self.connection = connection
+        self.mode = mode
+
+    def __enter__(self):
+        self.connection.execute('BEGIN ' + self.mode)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.connection.execute('COMMIT' if exc_type is None else 'ROLLBACK')
@@ -1,4 +1,6 @@
 class Team:
+    __slots__ = ('team_id', 'name')
+
     def __init__(self, team_id=None, name=None):
         self.team_id = team_id
         self.name = name
@@ -0,0 +1,86 @@
+import calendar
+import re
+
+_time = r'(\d{1,2}):(\d{2})(?::(\d{2}))?(?:\.\d+)?\s*([AaPp][Mm])?'
+_zone = r'(?:\s*(GMT|UTC|Z)?\s*(?:([+-])(\d{1,2})(?::?(\d{2}))?)?)?'
+
+DAY_FIRST, MONTH_FIRST = 'day_first', 'month_first'
+DATE_ORDERS = (DAY_FIRST, MONTH_FIRST)
+
+# Google Forms exports "2020/10/30 3:08:44 PM GMT+1"; sheets exports follow the locale of the sheet, with the year
+# last and the day ("30/10/2020 15:08:44") or the month ("10/30/2020 15:08:44") first. Which of the two a file uses
+# can only be told from the file as a whole, see detect_date_order().
+_year_first = re.compile(r'^\s*(\d{4})[/.-](\d{1,2})[/.-](\d{1,2})[ T]+' + _time + _zone + r'\s*$')
+_year_last = re.compile(r'^\s*(\d{1,2})([/.-])(\d{1,2})\2(\d{4})[ T]+' + _time + _zone + r'\s*$')
+_year_last_in_csv = re.compile(r'^\s*"?\s*(\d{1,2})([/.-])(\d{1,2})\2\d{4}\b', re.MULTILINE)
+_zone_only = re.compile(r'^\s*(?:GMT|UTC|Z)?\s*(?:([+-])(\d{1,2})(?::?(\d{2}))?)?\s*$')
+
+
+def _offset(sign, hours, minutes):
+    offset = (int(hours) * 60 + int(minutes or 0)) * 60
+    return -offset if sign == '-' else offset
+
+
+def parse_zone(zone):
+    # The offset from UTC in seconds of a zone written as in a timestamp ("GMT+1", "+02:00", "UTC"), or None when
+    # it is not understood
+    match = _zone_only.match(zone)
+    if not match:
+        return None
+    sign, hours, minutes = match.groups()
+    return _offset(sign, hours, minutes) if sign else 0
+
+
+def detect_date_order(csv_text):
+    # The date order of the timestamps in the first column of a csv file: day first when some timestamp starts with
+    # a number above 12, month first when some has one in second place, None when the file does not tell
+    day_first = month_first = False
+    for match in _year_last_in_csv.finditer(csv_text):
+        day_first = day_first or int(match[1]) > 12
+        month_first = month_first or int(match[3]) > 12
+        if day_first and month_first:
+            return None
+    if day_first:
+        return DAY_FIRST
+    if month_first:
+        return MONTH_FIRST
+    return None
+
+
+def parse_timestamp(timestamp, date_order=DAY_FIRST, zone=0):
+    # Seconds since the epoch (UTC), or None when the timestamp is missing or not understood. A timestamp without
+    # a time zone is taken to be in zone, the offset from UTC in seconds ([timestamps] zone in quiz.ini, UTC if not
+    # set). date_order applies to dates with the year last.
+    if not timestamp:
+        return None
+
+    match = _year_first.match(timestamp)
+    if match:
+        year, month, day = int(match[1]), int(match[2]), int(match[3])
+        time_groups = match.groups()[3:]
+    else:
+        match = _year_last.match(timestamp)
+        if not match:
+            return None
+        if date_order == MONTH_FIRST:
+            month, day = int(match[1]), int(match[3])
+        else:
+            day, month = int(match[1]), int(match[3])
+        year = int(match[4])
+        time_groups = match.groups()[4:]
+
+    hour, minute, second, am_pm, zone_name, sign, zone_hours, zone_minutes = time_groups
+    hour, minute, second = int(hour), int(minute), int(second or 0)
+    if am_pm:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if am_pm.lower() == 'pm' else 0)
+    if not (1 <= month <= 12 and 1 <= day <= calendar.monthrange(year, month)[1]
+            and hour < 24 and minute < 60 and second < 61):
+        return None
+
+    if sign:
+        offset = _offset(sign, zone_hours, zone_minutes)
+    else:
+        offset = 0 if zone_name else zone
+    return calendar.timegm((year, month, day, hour, minute, second)) - offset
@@ -0,0 +1,146 @@
+import json
+import logging
+import os
+import queue
+import threading
+
+from flask import Blueprint, Response, abort
+
+from ui_flask.util import pubquiz_dir, using_quiz
+
+event_stream = Blueprint('event_stream', __name__)
+
+logger = logging.getLogger(__name__)
+
+feed_interval = float(os.environ.get('PUBQUIZ_FEED_INTERVAL', 2))
+keepalive_interval = 15
+
+
+def quiz_view(quiz):
+    return {
+        'revision': quiz.revision,
+        'sections': ['{:.0f}'.format(s.fraction_of_correct_answers()*100) for s in quiz.sections],
+        'leaderboard': [list(row) for row in quiz.leaderboard()],
+    }
+
+
+def view_diff(old_view, new_view):
+    # The rows of new_view that differ from old_view, with their row numbers
+    old_sections = old_view['sections'] if old_view else []
+    old_leaderboard = old_view['leaderboard'] if old_view else []
+    return {
+        'revision': new_view['revision'],
+        'sections': [[i, pct] for i, pct in enumerate(new_view['sections'])
+                     if i >= len(old_sections) or old_sections[i] != pct],
+        'sections_length': len(new_view['sections']),
+        'leaderboard': [[i] + row for i, row in enumerate(new_view['leaderboard'])
+                        if i >= len(old_leaderboard) or old_leaderboard[i] != row],
+        'leaderboard_length': len(new_view['leaderboard']),
+    }
+
+
+class QuizFeed:
+    # One background thread per quiz with listeners: it updates the quiz from its directory and sends the rows
+    # that changed to every listener. The thread stops when the last listener disconnects.
+    def __init__(self, quiz_name, interval=feed_interval):
+        self.quiz_name = quiz_name
+        self.interval = interval
+        self.view = None
+        self._listeners = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def subscribe(self):
+        listener = queue.Queue()
+        with self._lock:
+            if self.view is not None:
+                listener.put(view_diff(None, self.view))
+            self._listeners.add(listener)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        return listener
+
+    def unsubscribe(self, listener):
+        with self._lock:
+            self._listeners.discard(listener)
+
+    def notify(self):
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._listeners:
+                    self._thread = None
+                    return
+            try:
+                self._refresh()
+            except Exception:
+                logger.exception('Could not update quiz %s', self.quiz_name)
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def _refresh(self):
+        # The quiz is shared with the request threads, so it is updated and read under its lock
+        with using_quiz(self.quiz_name) as quiz:
+            if self.view is not None and self.view['revision'] == quiz.revision:
+                return
+            view = quiz_view(quiz)
+
+        with self._lock:
+            diff = view_diff(self.view, view)
+            unchanged = (self.view is not None and not diff['sections'] and not diff['leaderboard']
+                         and diff['sections_length'] == len(self.view['sections'])
+                         and diff['leaderboard_length'] == len(self.view['leaderboard']))
+            self.view = view
+            if unchanged:
+                return
+            for listener in self._listeners:
+                listener.put(diff)
+
+
+_feeds = {}
+_feeds_lock = threading.Lock()
+
+
+def get_feed(quiz_name):
+    # None for a quiz that does not exist, so made up quiz names do not each start a feed
+    with _feeds_lock:
+        feed = _feeds.get(quiz_name)
+        if feed is None:
+            if not (pubquiz_dir / quiz_name).is_dir():
+                return None
+            feed = _feeds[quiz_name] = QuizFeed(quiz_name)
+        return feed
+
+
+def notify(quiz_name):
+    with _feeds_lock:
+        feed = _feeds.get(quiz_name)
+    if feed is not None:
+        feed.notify()
+
+
+def events(feed, listener):
+    try:
+        while True:
+            try:
+                diff = listener.get(timeout=keepalive_interval)
+            except queue.Empty:
+                yield ': keepalive\n\n'
+                continue
+            yield 'event: update\ndata: {}\n\n'.format(json.dumps(diff))
+    finally:
+        feed.unsubscribe(listener)
+
+
+@event_stream.route('/<quiz_name>/events')
+def show(quiz_name):
+    feed = get_feed(quiz_name)
+    if feed is None:
+        abort(404)
+    listener = feed.subscribe()
+    return Response(events(feed, listener), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
@@ -0,0 +1,33 @@
+import time
+
+from flask import Blueprint, Response, abort, g, request
+
+import metrics
+
+metrics_page = Blueprint('metrics_page', __name__)
+
+view_seconds = metrics.histogram('pubquiz_flask_view_seconds', 'Time spent handling a request, per view')
+
+
+def instrument(app):
+    if not metrics.enabled:
+        return
+
+    @app.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def observe_view(response):
+        start = g.pop('metrics_start', None)
+        if start is not None:
+            view_seconds.observe(time.perf_counter() - start, view=request.endpoint or 'none',
+                                 status=response.status_code)
+        return response
+
+
+@metrics_page.route('/metrics')
+def show():
+    if not metrics.enabled:
+        abort(404)
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
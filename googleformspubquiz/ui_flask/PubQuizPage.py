@@ -2,12 +2,14 @@ import flask_table
 from flask import Blueprint, render_template, url_for
 from flask_table import Col, Table, LinkCol
 
-from ui_flask.util import get_quiz
+from ui_flask import util
+from ui_flask.util import using_quiz
 
 pubquiz_page = Blueprint('pubquiz_page', __name__)
 
 
 class SectionTable(Table):
+    table_id = 'sections'
     section_nr = Col('NR', show=False)
     quiz_name = Col('QUIZ', show=False)
     section_name = Col('NAME', show=False)
@@ -16,6 +18,8 @@ class SectionTable(Table):
 
 
 class LeaderboardTable(Table):
+    table_id = 'leaderboard'
+    allow_empty = True
     position = Col('')
     team_name = Col('Team')
     points = Col('Points')
@@ -23,7 +27,28 @@ class LeaderboardTable(Table):
 
 @pubquiz_page.route('/<quiz_name>/')
 def show(quiz_name):
-    quiz = get_quiz(quiz_name)
+    with using_quiz(quiz_name) as quiz:
+        return show_quiz(quiz_name, quiz)
+
+
+def show_quiz(quiz_name, quiz):
+    tag = util.etag(quiz.revision)
+    response = util.not_modified(tag)
+    if response is not None:
+        return response
+
+    section_table = util.cached_fragment(('sections', quiz_name), quiz.revision,
+                                         lambda: section_table_html(quiz_name, quiz))
+    team_table = util.cached_fragment(('leaderboard', quiz_name), quiz.revision,
+                                      lambda: leaderboard_table_html(quiz))
+
+    return util.tagged_response(tag, render_template('pubquizpage.html',
+                                                     quiz_name=quiz_name,
+                                                     section_table=section_table,
+                                                     team_table=team_table))
+
+
+def section_table_html(quiz_name, quiz):
     sections = [
         {
             'section_nr': i,
@@ -31,16 +56,13 @@ def show(quiz_name):
             'section_name': s.name,
             'correct_pct': '{:.0f}'.format(s.fraction_of_correct_answers()*100)
         } for i, s in enumerate(quiz.sections, start=1)]
-    section_table = SectionTable(sections)
+    return SectionTable(sections).__html__()
 
+
+def leaderboard_table_html(quiz):
     teams = [{
         'position': position,
         'team_name': name,
         'points': score
     } for position, name, score in quiz.leaderboard()]
-    team_table = LeaderboardTable(teams)
-
-    return render_template('pubquizpage.html',
-                           quiz_name=quiz_name,
-                           section_table=section_table,
-                           team_table=team_table)
+    return LeaderboardTable(teams).__html__()
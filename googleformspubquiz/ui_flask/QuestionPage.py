@@ -1,8 +1,9 @@
 from flask import Blueprint, redirect, render_template, request, url_for
 import flask_table
 
-from ui_flask import util
-from ui_flask.util import get_quiz
+from answersaver import answer_saver
+from ui_flask import util, EventStream
+from ui_flask.util import using_quiz
 
 question_page = Blueprint('question_page', __name__)
 
@@ -27,14 +28,14 @@ class AnswerTable(flask_table.Table):
 
 @question_page.route('/<quiz_name>/section/<int:section_nr>/question/<int:question_nr>', methods=['GET', 'POST'])
 def show(quiz_name, section_nr, question_nr):
-    quiz = get_quiz(quiz_name)
-    section = quiz.sections[section_nr-1]
-    question = section.questions[question_nr-1]
+    with using_quiz(quiz_name) as quiz:
+        section = quiz.sections[section_nr-1]
+        question = section.questions[question_nr-1]
 
-    if request.method == 'POST':
-        return handle_post_method(quiz_name, section, question, request.form)
-    else:
-        return show_question(quiz_name=quiz_name, section=section, question=question)
+        if request.method == 'POST':
+            return handle_post_method(quiz_name, section, question, request.form)
+        else:
+            return show_question(quiz_name=quiz_name, section=section, question=question)
 
 
 def handle_post_method(quiz_name, section, question, request_form):
@@ -43,7 +44,8 @@ def handle_post_method(quiz_name, section, question, request_form):
     new_correct_answers = request_form.getlist('chkbxs')
     if set(new_correct_answers) != question.correct_answers:
         question.correct_answers = request_form.getlist('chkbxs')
-        section.save_answers(util.pubquiz_dir / quiz_name)
+        answer_saver.save(section, util.pubquiz_dir / quiz_name)
+        EventStream.notify(quiz_name)
     if 'previous' in request_form:
         return redirect(url_for('question_page.show', quiz_name=quiz_name, section_nr=section_nr, question_nr=question_nr-1))
     elif 'next' in request_form:
@@ -52,23 +54,37 @@ def handle_post_method(quiz_name, section, question, request_form):
         return redirect(url_for('section_page.show', quiz_name=quiz_name, section_nr=section_nr))
     elif 'save' in request_form:
         return show_question(quiz_name=quiz_name, section=section, question=question)
+    elif 'cluster' in request_form:
+        if question.mark_cluster_correct():
+            answer_saver.save(section, util.pubquiz_dir / quiz_name)
+            EventStream.notify(quiz_name)
+        return show_question(quiz_name=quiz_name, section=section, question=question)
 
 
 def show_question(quiz_name, section, question):
     question_nr = question.number_in_section
-
+    tag = util.etag(section.revision, question.revision)
+    if request.method == 'GET':
+        response = util.not_modified(tag)
+        if response is not None:
+            return response
+
+    answer_table = util.cached_fragment(('answers', quiz_name, section.number_in_quiz, question_nr),
+                                        question.revision, lambda: answer_table_html(question))
+    return util.tagged_response(tag, render_template('questionpage.html',
+                                                     quiz=quiz_name,
+                                                     section=section.name,
+                                                     question_nr=question_nr,
+                                                     last_question = (question == section.questions[-1]),
+                                                     question_text=question.name,
+                                                     answer_table=answer_table,
+                                                     correct='{:.0f}'.format(question.fraction_of_correct_responses()*100)))
+
+
+def answer_table_html(question):
     answers = sorted([{'answer': a,
                        'correct': a in question.correct_answers,
                        'count': ct}
                       for a, ct in question.answer_list().items()],
                      key=lambda x: (-x['count'], x['answer']))
-
-    answer_table = AnswerTable(answers)
-    return render_template('questionpage.html',
-                           quiz=quiz_name,
-                           section=section.name,
-                           question_nr=question_nr,
-                           last_question = (question == section.questions[-1]),
-                           question_text=question.name,
-                           answer_table=answer_table,
-                           correct='{:.0f}'.format(question.fraction_of_correct_responses()*100))
+    return AnswerTable(answers).__html__()
@@ -2,7 +2,8 @@ import flask_table
 from flask import Blueprint, render_template, request, redirect, url_for
 from flask_table import Col, LinkCol
 
-from ui_flask.util import get_quiz
+from ui_flask import util
+from ui_flask.util import using_quiz
 
 section_page = Blueprint('section_page', __name__)
 
@@ -18,12 +19,29 @@ class QuestionTable(flask_table.Table):
 
 @section_page.route('/<quiz_name>/section/<int:section_nr>', methods=['GET', 'POST'])
 def show(quiz_name, section_nr):
-    quiz = get_quiz(quiz_name)
-    section = quiz.sections[section_nr - 1]
+    with using_quiz(quiz_name) as quiz:
+        return show_section(quiz_name, section_nr, quiz.sections[section_nr - 1])
 
+
+def show_section(quiz_name, section_nr, section):
     if request.method == 'POST':
         return redirect(url_for('pubquiz_page.show', quiz_name=quiz_name))
 
+    tag = util.etag(section.revision)
+    response = util.not_modified(tag)
+    if response is not None:
+        return response
+
+    question_table = util.cached_fragment(('questions', quiz_name, section_nr), section.revision,
+                                          lambda: question_table_html(quiz_name, section_nr, section))
+
+    return util.tagged_response(tag, render_template('sectionpage.html',
+                                                     quiz=quiz_name,
+                                                     section=section.name,
+                                                     question_table=question_table))
+
+
+def question_table_html(quiz_name, section_nr, section):
     questions = [
         {
             'quiz_name': quiz_name,
@@ -32,12 +50,7 @@ def show(quiz_name, section_nr):
             'question_text': shortened_section_name(q.name, int(j)),
             'correct_pct': '{:.0f}'.format(q.fraction_of_correct_responses()*100)
         } for j, q in enumerate(section.questions, start=1)]
-    question_table = QuestionTable(questions)
-
-    return render_template('sectionpage.html',
-                           quiz=quiz_name,
-                           section=section.name,
-                           question_table=question_table)
+    return QuestionTable(questions).__html__()
 
 
 def shortened_section_name(name, number):
@@ -1,13 +1,55 @@
-from flask import Blueprint, url_for, render_template
+import time
 
-from ui_flask.util import pubquiz_dir
+import flask_table
+from flask import Blueprint, url_for, render_template, request
+from flask_table import Col, LinkCol
+
+from catalogue import SORT_KEYS
+from ui_flask.util import catalogue
 
 main_page = Blueprint('main_page', __name__)
 
 
+class TimeCol(Col):
+    def td_format(self, content):
+        if content is None:
+            return ''
+        return time.strftime('%Y-%m-%d %H:%M', time.localtime(content))
+
+
+class QuizTable(flask_table.Table):
+    table_id = 'quizzes'
+    allow_sort = True
+
+    name = LinkCol('Quiz', 'pubquiz_page.show', url_kwargs=dict(quiz_name='name'), attr='name')
+    sections = Col('Sections')
+    teams = Col('Teams')
+    responses = Col('Responses')
+    last_activity = TimeCol('Last activity')
+    leader = Col('Leader')
+    leader_score = Col('Points')
+
+    def __init__(self, items, search=None, **kwargs):
+        super().__init__(items, **kwargs)
+        self.search = search
+
+    def sort_url(self, col_key, reverse=False):
+        return url_for('main_page.show', sort=col_key, direction='desc' if reverse else 'asc', q=self.search or None)
+
+
 @main_page.route('/')
 def show():
-    quizzes = [(q.name, url_for('pubquiz_page.show', quiz_name=q.name))
-               for q in pubquiz_dir.iterdir()]
+    sort = request.args.get('sort', 'name')
+    if sort not in SORT_KEYS:
+        sort = 'name'
+    reverse = request.args.get('direction') == 'desc'
+    search = request.args.get('q', '')
+
+    catalogue.refresh()
+    quizzes = catalogue.entries(sort=sort, reverse=reverse, search=search)
+    quiz_table = QuizTable(quizzes, search=search, sort_by=sort, sort_reverse=reverse)
     return render_template('startpage.html',
-                           quizzes=quizzes)
+                           quiz_table=quiz_table,
+                           search=search,
+                           sort=sort,
+                           direction='desc' if reverse else 'asc')
@@ -4,11 +4,16 @@ from ui_flask.StartPage import main_page
 from ui_flask.PubQuizPage import pubquiz_page
 from ui_flask.SectionPage import section_page
 from ui_flask.QuestionPage import question_page
+from ui_flask.EventStream import event_stream
+from ui_flask.Metrics import metrics_page, instrument
 
 app = Flask(__name__)
 app.register_blueprint(main_page)
 app.register_blueprint(pubquiz_page)
 app.register_blueprint(section_page)
 app.register_blueprint(question_page)
+app.register_blueprint(event_stream)
+app.register_blueprint(metrics_page)
+instrument(app)
 
 
@@ -1,11 +1,86 @@
+import collections
+import contextlib
+import functools
 import os
 import pathlib
+import threading
+import uuid
+
+from flask import make_response, request
+from markupsafe import Markup
 
 from googleformspubquiz import Quiz
+from catalogue import Catalogue
+from quizcache import QuizCache
 
 default_dir = pathlib.Path(os.environ['HOME']) / 'pubquiz'
 pubquiz_dir = pathlib.Path(os.environ.get('PUBQUIZ_DIR', default_dir))
 
+max_cached_quizzes = int(os.environ.get('PUBQUIZ_CACHE_QUIZZES', 8))
+max_cached_responses = int(os.environ['PUBQUIZ_CACHE_RESPONSES']) if 'PUBQUIZ_CACHE_RESPONSES' in os.environ else None
+load_workers = int(os.environ['PUBQUIZ_LOAD_WORKERS']) if 'PUBQUIZ_LOAD_WORKERS' in os.environ else None
+quiz_cache = QuizCache(max_quizzes=max_cached_quizzes, max_responses=max_cached_responses,
+                       loader=functools.partial(Quiz.load_dir_with_ini, use_snapshot=True, workers=load_workers))
+
+
+@contextlib.contextmanager
+def _catalogue_quiz(directory):
+    # A quiz that is being served is summarized from the cache instead of being loaded a second time
+    if directory in quiz_cache:
+        with quiz_cache.using(directory) as quiz:
+            yield quiz
+    else:
+        with Quiz.load_dir_with_ini(directory, use_snapshot=True) as quiz:
+            yield quiz
+
+
+catalogue = Catalogue(pubquiz_dir, loader=_catalogue_quiz,
+                      interval=float(os.environ.get('PUBQUIZ_CATALOGUE_INTERVAL', 5)))
+
+max_cached_fragments = int(os.environ.get('PUBQUIZ_CACHE_FRAGMENTS', 256))
+_fragments = collections.OrderedDict()
+_fragments_lock = threading.Lock()
+
+# Part of every etag, so a restarted server does not answer 304 for a page rendered by an earlier process
+_instance = uuid.uuid4().hex[:8]
+
+
+def using_quiz(quiz_name):
+    # Updates the quiz and keeps other threads from updating it until the with block ends:
+    #     with using_quiz(quiz_name) as quiz:
+    return quiz_cache.using(pubquiz_dir / quiz_name)
+
+
+def etag(*revisions):
+    return '-'.join([_instance] + [str(revision) for revision in revisions])
+
+
+def not_modified(tag):
+    if request.if_none_match.contains(tag):
+        response = make_response('', 304)
+        response.set_etag(tag)
+        return response
+    return None
+
+
+def tagged_response(tag, html):
+    response = make_response(html)
+    response.set_etag(tag)
+    return response
+
+
+def cached_fragment(key, revision, render):
+    # Rendered html, reused for as long as the revision of the object it shows does not change
+    with _fragments_lock:
+        entry = _fragments.get(key)
+        if entry is not None and entry[0] == revision:
+            _fragments.move_to_end(key)
+            return entry[1]
 
-def get_quiz(quiz_name):
-    return Quiz.load_dir_with_ini(pubquiz_dir / quiz_name)
+    html = Markup(render())
+    with _fragments_lock:
+        _fragments[key] = (revision, html)
+        _fragments.move_to_end(key)
+        while len(_fragments) > max_cached_fragments:
+            _fragments.popitem(last=False)
+    return html
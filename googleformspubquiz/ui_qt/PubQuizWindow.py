@@ -1,12 +1,12 @@
-import collections
 import pathlib
 from typing import Optional
 
 from PyQt5 import uic
-from PyQt5.QtCore import QTimer, Qt
+from PyQt5.QtCore import QFileSystemWatcher, QThread, QTimer, Qt, pyqtSignal
 from PyQt5.QtWidgets import QMainWindow, QTableWidgetItem, QHeaderView, QFileDialog
 
 from quiz import Quiz
+from ui_qt.QuizLoader import QuizLoader, QuizView, quiz_view
 from ui_qt.SectionWindow import SectionWindow
 from ui_qt.TeamsWindow import TeamsWindow
 
@@ -14,75 +14,141 @@ uidir = pathlib.Path(__file__).parent
 
 
 class PubQuizWindow(QMainWindow):
+    load_requested = pyqtSignal(str)
+
+    # Changes to the directory are collected for this many milliseconds before the quiz is reloaded
+    reload_delay = 300
+
     def __init__(self):
         super().__init__()
         uic.loadUi(uidir/'PubQuizWindow.ui', self)
 
         self.pubquiz = None     # type: Optional[Quiz]
         self.directory = None
+        self.view = QuizView([], [], None)
+        self.loading = False
+        self.reload_pending = False
+
+        self.loader_thread = QThread()
+        self.loader = QuizLoader()
+        self.loader.moveToThread(self.loader_thread)
+        self.load_requested.connect(self.loader.load)
+        self.loader.loaded.connect(self.quiz_loaded)
+        self.loader_thread.start()
+
+        self.watcher = QFileSystemWatcher()
+        self.watcher.directoryChanged.connect(self.directory_changed)
+        self.watcher.fileChanged.connect(self.directory_changed)
         self.timer = QTimer()
-        self.timer.timeout.connect(self.check_directory)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.reload)
 
         self.widget_sectiontable.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
         self.widget_leaderboard.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
         self.widget_leaderboard.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
 
     def select_dir(self):
+        directory = str(QFileDialog.getExistingDirectory(self, "Select Directory"))
+        if not directory:
+            return
+
         self.timer.stop()
-        self.directory = str(QFileDialog.getExistingDirectory(self, "Select Directory"))
+        if self.watcher.files() or self.watcher.directories():
+            self.watcher.removePaths(self.watcher.files() + self.watcher.directories())
+        self.directory = directory
+        self.pubquiz = None
         self.widget_pubquiz_dir.setText(self.directory)
-
-        self.pubquiz = Quiz.load_dir_with_ini(self.directory)
-        self.refresh()
-        self.timer.start(3000)
-
-    def fill_section_list(self):
-        self.widget_sectiontable.setRowCount(len(self.pubquiz.sections))
-        for row, section in enumerate(self.pubquiz.sections):
-            self.widget_sectiontable.setItem(row, 0, QTableWidgetItem(section.name))
-            score_item = QTableWidgetItem('{:.0f}'.format(section.fraction_of_correct_answers()*100))
-            self.widget_sectiontable.setItem(row, 1, score_item)
-            score_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        self.watch_directory()
+        self.reload()
+
+    def watch_directory(self):
+        # Files that are replaced instead of modified in place drop out of the watcher, so they are added again
+        # after every change
+        paths = [self.directory] + [str(path) for path in pathlib.Path(self.directory).iterdir() if path.is_file()]
+        watched = set(self.watcher.files() + self.watcher.directories())
+        new_paths = [path for path in paths if path not in watched]
+        if new_paths:
+            self.watcher.addPaths(new_paths)
+
+    def directory_changed(self, _path):
+        self.timer.start(self.reload_delay)
+
+    def reload(self):
+        if self.loading:
+            self.reload_pending = True
+            return
+        self.loading = True
+        self.load_requested.emit(self.directory)
+
+    def quiz_loaded(self, directory, quiz, view):
+        self.loading = False
+        if directory != self.directory:
+            self.reload()
+            return
+
+        self.pubquiz = quiz
+        self.show_view(view)
+        self.watch_directory()
+        if self.reload_pending:
+            self.reload_pending = False
+            self.reload()
 
     def open_section(self, row, _column):
-        section = self.pubquiz.sections[row]
-        section_window = SectionWindow(section=section, directory=self.directory)
-        section_window.exec_()
-        self.refresh()
-
-    def fill_leaderboard(self):
-        leaderboard = list(self.pubquiz.leaderboard())
-        self.widget_leaderboard.setRowCount(len(leaderboard))
-        for row, (i, team, points) in enumerate(leaderboard):
-            self.widget_leaderboard.setItem(row, 0, QTableWidgetItem(i))
-            self.widget_leaderboard.setItem(row, 1, QTableWidgetItem(team))
-            points_item = QTableWidgetItem(points)
-            self.widget_leaderboard.setItem(row, 2, points_item)
-            points_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        if self.pubquiz is None or not self.acquire_quiz():
+            return
+        try:
+            section = self.pubquiz.sections[row]
+            section_window = SectionWindow(section=section, directory=self.directory)
+            section_window.exec_()
+            self.refresh()
+        finally:
+            self.loader.lock.release()
+
+    def acquire_quiz(self):
+        # The loader holds the lock while it updates the quiz, which can take a while; the window does not wait for
+        # it but asks to try again. The loader waits while a dialog is open, and reloads when it is closed.
+        if self.loader.lock.acquire(blocking=False):
+            return True
+        self.statusBar().showMessage('The quiz is being loaded, try again in a moment', 3000)
+        return False
+
+    def show_view(self, view):
+        self.update_table(self.widget_sectiontable, self.view.sections, view.sections, aligned_columns={1})
+        self.update_table(self.widget_leaderboard, self.view.leaderboard, view.leaderboard, aligned_columns={2})
+        if view.incomplete_teams != self.view.incomplete_teams:
+            self.label_team_problems.setText('{} teams have not answered all sections'.format(view.incomplete_teams))
+        self.view = view
+
+    @staticmethod
+    def update_table(table, old_rows, new_rows, aligned_columns):
+        # Only the cells whose text changed are replaced
+        table.setRowCount(len(new_rows))
+        for row, values in enumerate(new_rows):
+            old_values = old_rows[row] if row < len(old_rows) else ()
+            if values == old_values:
+                continue
+            for column, value in enumerate(values):
+                if column < len(old_values) and old_values[column] == value:
+                    continue
+                item = QTableWidgetItem(value)
+                if column in aligned_columns:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                table.setItem(row, column, item)
 
     def refresh(self):
-        self.fill_section_list()
-        self.fill_leaderboard()
-        self.refresh_teams_label()
-
-    def check_directory(self):
-        self.pubquiz.update_from_dir(self.directory)
-        self.refresh()
-
-    def refresh_teams_label(self):
-        counter = collections.Counter()
-        for section in self.pubquiz.sections:
-            for response in section.responses:
-                counter[response.team] += 1
-
-        incomplete = 0
-        for team, count in counter.items():
-            if count != len(self.pubquiz.sections):
-                incomplete += 1
-
-        self.label_team_problems.setText('{} teams have not answered all sections'.format(incomplete))
+        self.show_view(quiz_view(self.pubquiz))
 
     def check_teams(self):
-        teams_window = TeamsWindow(self.pubquiz)
-        teams_window.exec_()
-        self.refresh()
+        if self.pubquiz is None or not self.acquire_quiz():
+            return
+        try:
+            teams_window = TeamsWindow(self.pubquiz)
+            teams_window.exec_()
+            self.refresh()
+        finally:
+            self.loader.lock.release()
+
+    def closeEvent(self, event):
+        self.loader_thread.quit()
+        self.loader_thread.wait()
+        super().closeEvent(event)
@@ -0,0 +1,47 @@
+import collections
+import os
+import threading
+
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+
+from quiz import Quiz
+
+QuizView = collections.namedtuple('QuizView', ['sections', 'leaderboard', 'incomplete_teams'])
+
+
+def quiz_view(quiz):
+    # The rows shown in the main window, as plain strings so they can be compared with the rows on screen
+    sections = [(section.name, '{:.0f}'.format(section.fraction_of_correct_answers()*100))
+                for section in quiz.sections]
+    leaderboard = [tuple(row) for row in quiz.leaderboard()]
+
+    counter = collections.Counter()
+    for section in quiz.sections:
+        for response in section.responses:
+            counter[response.team] += 1
+    incomplete_teams = sum(1 for count in counter.values() if count != len(quiz.sections))
+
+    return QuizView(sections, leaderboard, incomplete_teams)
+
+
+class QuizLoader(QObject):
+    # Lives on a worker thread: loads or updates the quiz and computes its view, so the window does not freeze
+    # while files are parsed and scored. The lock must be held by anyone else using the quiz.
+    loaded = pyqtSignal(str, object, object)
+
+    def __init__(self):
+        super().__init__()
+        self.lock = threading.Lock()
+        self.directory = None
+        self.quiz = None
+
+    @pyqtSlot(str)
+    def load(self, directory):
+        with self.lock:
+            if self.quiz is None or directory != self.directory:
+                self.quiz = Quiz.load_dir_with_ini(directory, use_snapshot=True, workers=os.cpu_count())
+                self.directory = directory
+            else:
+                self.quiz.update_from_dir(directory)
+            view = quiz_view(self.quiz)
+        self.loaded.emit(directory, self.quiz, view)
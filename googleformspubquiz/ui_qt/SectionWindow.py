@@ -3,6 +3,8 @@ import pathlib
 from PyQt5 import uic, QtCore, QtGui
 from PyQt5.QtWidgets import QDialog, QTableWidgetItem, QHeaderView
 
+from answersaver import answer_saver
+
 uidir = pathlib.Path(__file__).parent
 
 
@@ -81,6 +83,10 @@ class SectionWindow(QDialog):
             question.remove_correct_answer(answer)
         self.go_to_question(self.current_question)
 
+    def mark_cluster_correct(self):
+        self.section.questions[self.current_question].mark_cluster_correct()
+        self.go_to_question(self.current_question)
+
     def close_window(self):
-        self.section.save_answers(self.directory)
+        answer_saver.save(self.section, self.directory)
         self.accept()
@@ -2,8 +2,8 @@ import collections
 import pathlib
 
 from PyQt5 import uic, QtGui
-from PyQt5.QtCore import Qt
-from PyQt5.QtWidgets import QDialog, QTableWidgetItem
+from PyQt5.QtCore import Qt, QItemSelectionModel
+from PyQt5.QtWidgets import QDialog, QTableWidgetItem, QListWidgetItem
 
 uidir = pathlib.Path(__file__).parent
 
@@ -51,8 +51,26 @@ class TeamsWindow(QDialog):
                 item.setBackground(color)
                 self.table_teams.setItem(row, col, item)
 
+        self.show_suggestions()
         self.selection_changed()
 
+    def show_suggestions(self):
+        self.list_suggestions.clear()
+        for team1, team2, score in self.pubquiz.suggest_duplicate_teams():
+            item = QListWidgetItem('{} ({}) and {} ({}): {:.0f}% similar'.format(
+                team1.name, team1.team_id, team2.name, team2.team_id, score * 100))
+            item.setData(Qt.UserRole, [team1, team2])
+            self.list_suggestions.addItem(item)
+
+    def select_suggestion(self, item):
+        teams = item.data(Qt.UserRole)
+        selection_model = self.table_teams.selectionModel()
+        selection_model.clearSelection()
+        for row in range(self.table_teams.rowCount()):
+            if self.table_teams.item(row, 0).data(Qt.UserRole) in teams:
+                selection_model.select(self.table_teams.model().index(row, 0),
+                                       QItemSelectionModel.Select | QItemSelectionModel.Rows)
+
     def selection_changed(self):
         can_merge = self.pubquiz.can_merge_teams(list(self.selected_teams()))
         self.button_merge_teams.setEnabled(can_merge)
@@ -62,6 +80,10 @@ class TeamsWindow(QDialog):
         self.pubquiz.merge_teams(teams_to_merge)
         self.show_teams()
 
+    def undo_merge(self):
+        if self.pubquiz.undo_merge():
+            self.show_teams()
+
     def selected_teams(self):
         selection_model = self.table_teams.selectionModel()
         for row in selection_model.selectedRows():
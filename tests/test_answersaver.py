@@ -0,0 +1,124 @@
+import os
+import pathlib
+import textwrap
+import time
+import unittest
+from unittest import mock
+
+import yaml
+
+from answersaver import AnswerSaver
+from googleformspubquiz import Quiz
+
+
+class TestAnswerSaver(unittest.TestCase):
+    def setUp(self):
+        self.testdir = pathlib.Path(__file__).parent / 'testdata' / 'test_answersaver'
+        os.makedirs(self.testdir, exist_ok=True)
+        for file in self.testdir.iterdir():
+            file.unlink()
+
+        (self.testdir / 'round1.csv').write_text(textwrap.dedent("""\
+            "Timestamp","Team","Vraag 1"
+            "2020/10/30 3:08:45 PM GMT+1","team1","Antwoord 1"
+            "2020/10/30 3:08:46 PM GMT+1","team2","Antwoord 2"
+        """))
+        self.quiz = Quiz.load_dir(self.testdir)
+        self.section = self.quiz.sections[0]
+        self.saver = AnswerSaver(delay=0.05)
+
+    def test_when_saved_twice_expect_last_answers_written(self):
+        # ARRANGE
+        question = self.section.questions[0]
+        question.add_correct_answer('Antwoord 1')
+        self.saver.save(self.section, self.testdir)
+        question.add_correct_answer('Antwoord 2')
+
+        # ACT
+        self.saver.save(self.section, self.testdir)
+        self.saver.flush()
+
+        # ASSERT
+        answers = yaml.safe_load((self.testdir / 'round1.yaml').read_text())
+        self.assertEqual(sorted(answers[0]), ['Antwoord 1', 'Antwoord 2'])
+        self.assertEqual(sorted(file.name for file in self.testdir.iterdir()), ['round1.csv', 'round1.yaml'])
+
+    def test_when_delay_has_passed_expect_answers_written(self):
+        # ARRANGE
+        self.section.questions[0].add_correct_answer('Antwoord 2')
+
+        # ACT
+        self.saver.save(self.section, self.testdir)
+        for _ in range(100):
+            if (self.testdir / 'round1.yaml').exists():
+                break
+            time.sleep(0.01)
+
+        # ASSERT
+        self.assertEqual((self.testdir / 'round1.yaml').read_text(), '- - Antwoord 2\n')
+
+    def test_own_writes_are_current(self):
+        # ARRANGE
+        path = self.testdir / 'round1.yaml'
+        self.saver.save(self.section, self.testdir)
+        pending = self.saver.is_current(path, None)
+
+        # ACT
+        self.saver.flush()
+
+        # ASSERT
+        stat = path.stat()
+        self.assertTrue(pending)
+        self.assertTrue(self.saver.is_current(path, (stat.st_size, stat.st_mtime_ns)))
+        self.assertFalse(self.saver.is_current(path, (0, 0)))
+
+    def test_when_section_is_reloaded_expect_pending_save_written_first(self):
+        # ARRANGE
+        saver = AnswerSaver(delay=60)
+        self.section.questions[0].add_correct_answer('Antwoord 2')
+        saver.save(self.section, self.testdir)
+        (self.testdir / 'round1.csv').write_text(textwrap.dedent("""\
+            "Timestamp","Team","Vraag 1"
+            "2020/10/30 3:08:47 PM GMT+1","team3","Antwoord 2"
+        """))
+
+        # ACT
+        with mock.patch('source.answer_saver', saver):
+            self.quiz.update_from_dir(self.testdir)
+
+        # ASSERT
+        self.assertEqual(list(self.quiz.sections[0].questions[0].correct_answers), ['Antwoord 2'])
+        self.assertFalse(saver.is_current(self.testdir / 'round1.yaml', (0, 0)))
+
+    @unittest.skipIf(os.name != 'posix', 'file modes are posix only')
+    def test_when_answers_saved_expect_file_mode_kept(self):
+        # ARRANGE
+        path = self.testdir / 'round1.yaml'
+        path.write_text('- []\n')
+        os.chmod(path, 0o644)
+
+        # ACT
+        self.section.save_answers(path)
+
+        # ASSERT
+        self.assertEqual(path.stat().st_mode & 0o777, 0o644)
+
+    @unittest.skipIf(os.name != 'posix', 'file modes are posix only')
+    def test_when_answers_saved_to_new_file_expect_umask_applied(self):
+        # ARRANGE
+        path = self.testdir / 'round1.yaml'
+        umask = os.umask(0o027)
+
+        # ACT
+        try:
+            self.section.save_answers(path)
+        finally:
+            os.umask(umask)
+
+        # ASSERT
+        self.assertEqual(path.stat().st_mode & 0o777, 0o640)
+        self.assertEqual(sorted(file.name for file in self.testdir.iterdir()), ['round1.csv', 'round1.yaml'])
+
+
+if __name__ == '__main__':
+    unittest.main()
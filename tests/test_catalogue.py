@@ -0,0 +1,131 @@
+import os
+import pathlib
+import shutil
+import textwrap
+import unittest
+from unittest import mock
+
+from catalogue import Catalogue
+from googleformspubquiz import Quiz
+from quizcache import QuizCache
+
+
+class TestCatalogue(unittest.TestCase):
+    def setUp(self):
+        self.testdir = pathlib.Path(__file__).parent / 'testdata' / 'test_catalogue'
+        shutil.rmtree(self.testdir, ignore_errors=True)
+        os.makedirs(self.testdir / 'quiz1')
+        os.makedirs(self.testdir / 'quiz2')
+
+        (self.testdir / 'quiz1' / 'round1.csv').write_text(textwrap.dedent("""\
+            "Timestamp","Team","Vraag 1"
+            "2020/10/30 3:08:44 PM GMT+1","Correct answers","Antwoord 1"
+            "2020/10/30 3:08:45 PM GMT+1","team1","Antwoord 1"
+            "2020/10/30 3:08:46 PM GMT+1","team2","Antwoord 2"
+        """))
+        (self.testdir / 'quiz2' / 'round1.csv').write_text(textwrap.dedent("""\
+            "Timestamp","Team","Vraag 1"
+            "2020/10/30 3:08:45 PM GMT+1","team3","Antwoord 1"
+        """))
+        self.loader = mock.Mock(side_effect=Quiz.load_dir_with_ini)
+
+    def test_summaries(self):
+        # ARRANGE
+        catalogue = Catalogue(self.testdir, loader=self.loader)
+
+        # ACT
+        catalogue.refresh()
+
+        # ASSERT
+        quiz1, quiz2 = catalogue.entries()
+        self.assertEqual((quiz1['name'], quiz1['sections'], quiz1['teams'], quiz1['responses']), ('quiz1', 1, 2, 2))
+        self.assertEqual((quiz1['leader'], quiz1['leader_score']), ('team1', 1))
+        self.assertEqual(quiz2['teams'], 1)
+
+    def test_when_catalogue_read_again_expect_unchanged_quizzes_not_loaded(self):
+        # ARRANGE
+        Catalogue(self.testdir, loader=self.loader).refresh()
+        self.loader.reset_mock()
+
+        # ACT
+        catalogue = Catalogue(self.testdir, loader=self.loader)
+        catalogue.refresh()
+
+        # ASSERT
+        self.loader.assert_not_called()
+        self.assertEqual(len(catalogue.entries()), 2)
+
+    def test_when_quiz_changed_expect_only_that_quiz_loaded(self):
+        # ARRANGE
+        catalogue = Catalogue(self.testdir, loader=self.loader)
+        catalogue.refresh()
+        self.loader.reset_mock()
+        with (self.testdir / 'quiz2' / 'round1.csv').open('a') as outfile:
+            outfile.write('"2020/10/30 3:08:46 PM GMT+1","team4","Antwoord 1"\n')
+            outfile.write('"2020/10/30 3:08:47 PM GMT+1","team5","Antwoord 1"\n')
+
+        # ACT
+        catalogue.refresh(force=True)
+
+        # ASSERT
+        self.loader.assert_called_once_with(self.testdir / 'quiz2')
+        self.assertEqual(catalogue.entries(sort='teams', reverse=True)[0]['name'], 'quiz2')
+
+    def test_when_quiz_removed_expect_entry_removed(self):
+        # ARRANGE
+        catalogue = Catalogue(self.testdir, loader=self.loader)
+        catalogue.refresh()
+        shutil.rmtree(self.testdir / 'quiz1')
+
+        # ACT
+        catalogue.refresh(force=True)
+
+        # ASSERT
+        self.assertEqual([entry['name'] for entry in catalogue.entries()], ['quiz2'])
+
+    def test_when_quiz_stored_in_sqlite_expect_store_closed(self):
+        # ARRANGE
+        (self.testdir / 'quiz1' / 'quiz.ini').write_text('[storage]\nbackend = sqlite\n')
+        quizzes = []
+
+        def loader(directory):
+            quizzes.append(Quiz.load_dir_with_ini(directory))
+            return quizzes[-1]
+
+        catalogue = Catalogue(self.testdir, loader=loader)
+
+        # ACT
+        catalogue.refresh()
+
+        # ASSERT
+        self.assertEqual(catalogue.entries()[0]['teams'], 2)
+        self.assertEqual([quiz.store for quiz in quizzes], [None, None])
+
+    def test_when_quiz_in_quiz_cache_expect_cached_quiz_summarized(self):
+        # ARRANGE
+        quiz_cache = QuizCache(loader=self.loader)
+        quiz_cache.get(self.testdir / 'quiz1')
+        self.loader.reset_mock()
+        catalogue = Catalogue(self.testdir, loader=quiz_cache.using)
+
+        # ACT
+        catalogue.refresh()
+
+        # ASSERT
+        self.loader.assert_called_once_with(self.testdir / 'quiz2')
+        self.assertEqual(catalogue.entries()[0]['teams'], 2)
+
+    def test_search(self):
+        # ARRANGE
+        catalogue = Catalogue(self.testdir, loader=self.loader)
+        catalogue.refresh()
+
+        # ACT
+        result = catalogue.entries(search='TEAM3')
+
+        # ASSERT
+        self.assertEqual([entry['name'] for entry in result], ['quiz2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
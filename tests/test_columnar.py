@@ -0,0 +1,90 @@
+import io
+import textwrap
+import unittest
+
+import columnar
+from googleformspubquiz import Quiz, Section, Response
+
+TEST_FILE = textwrap.dedent("""\
+    "Timestamp","Teamnaam","Vraag 1","Vraag 2","Vraag 3"
+    "2020/10/30 3:08:44 PM GMT+1","Correct answers","Antwoord 1","Antwoord 2","Antwoord 3"
+    "2020/10/30 3:08:45 PM GMT+1","team1","Antwoord 1","Antwoord 2","Antwoord 1"
+    "2020/10/30 3:08:46 PM GMT+1","team2","Antwoord 5","Antwoord 2","Antwoord 3"
+    "2020/10/30 3:08:47 PM GMT+1","team3","Antwoord 1","Antwoord 2","Antwoord 3"
+    "2020/10/30 3:08:48 PM GMT+1","team1","Antwoord 1","Antwoord 2","Antwoord 3"
+""")
+
+
+def make_section(scoring):
+    quiz = Quiz(scoring=scoring)
+    section = Section.read_csv(io.StringIO(TEST_FILE), quiz=quiz)
+    return quiz, section
+
+
+@unittest.skipIf(columnar.numpy is None, 'numpy is not installed')
+class TestColumnarScoring(unittest.TestCase):
+    def test_scores_equal_default_engine(self):
+        # ARRANGE
+        _, expected_section = make_section(scoring=None)
+        quiz, section = make_section(scoring='columnar')
+
+        # ACT
+        result = section.scores()
+
+        # ASSERT
+        self.assertTrue(section.columnar)
+        self.assertEqual({team.team_id: score for team, score in result.items()},
+                         {team.team_id: score for team, score in expected_section.scores().items()})
+
+    def test_fractions_equal_default_engine(self):
+        # ARRANGE
+        _, expected_section = make_section(scoring=None)
+        quiz, section = make_section(scoring='columnar')
+
+        # ACT
+        result = [question.fraction_of_correct_responses() for question in section.questions]
+
+        # ASSERT
+        self.assertEqual(result, [question.fraction_of_correct_responses() for question in expected_section.questions])
+        self.assertEqual(section.columns().fractions_of_correct_responses(), result)
+        self.assertEqual(section.fraction_of_correct_answers(), expected_section.fraction_of_correct_answers())
+
+    def test_when_answer_marked_correct_expect_scores_updated(self):
+        # ARRANGE
+        quiz, section = make_section(scoring='columnar')
+        quiz.scores()
+
+        # ACT
+        section.questions[0].add_correct_answer('Antwoord 5')
+
+        # ASSERT
+        self.assertEqual({team.team_id: score for team, score in quiz.scores().items()},
+                         {'team1': 2, 'team2': 3, 'team3': 3})
+
+    def test_when_response_added_expect_new_row(self):
+        # ARRANGE
+        quiz, section = make_section(scoring='columnar')
+        section.scores()
+
+        # ACT
+        section.add_response_from_line(["2020/10/30 3:08:49 PM GMT+1", "team4", "Antwoord 1", "", "Antwoord 3"])
+
+        # ASSERT
+        self.assertEqual(section.scores()[quiz.get_team('team4', 'team4')], 2)
+        self.assertEqual(section.questions[1].fraction_of_correct_responses(), 0.8)
+
+    def test_response_without_answers(self):
+        # ARRANGE
+        quiz, section = make_section(scoring='columnar')
+        team = quiz.get_team('team5', 'team5')
+        section.add_response(Response(team=team))
+
+        # ACT
+        result = section.scores()
+
+        # ASSERT
+        self.assertEqual(result[team], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
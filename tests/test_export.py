@@ -0,0 +1,108 @@
+import io
+import json
+import os
+import pathlib
+import shutil
+import textwrap
+import unittest
+
+import export
+from googleformspubquiz import Quiz
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        self.testdir = pathlib.Path(__file__).parent / 'testdata' / 'test_export'
+        shutil.rmtree(self.testdir, ignore_errors=True)
+        os.makedirs(self.testdir / 'quizzes' / 'quiz1')
+        os.makedirs(self.testdir / 'quizzes' / 'quiz2')
+
+        (self.testdir / 'quizzes' / 'quiz1' / 'round1.csv').write_text(textwrap.dedent("""\
+            "Timestamp","Team","Vraag 1","Vraag 2"
+            "2020/10/30 3:08:44 PM GMT+1","Correct answers","Antwoord 1","Antwoord 2"
+            "2020/10/30 3:08:45 PM GMT+1","team1","Antwoord 1","Antwoord 2"
+            "2020/10/30 3:08:46 PM GMT+1","team2","Antwoord 1","Antwoord 3"
+        """))
+        (self.testdir / 'quizzes' / 'quiz1' / 'round2.csv').write_text(textwrap.dedent("""\
+            "Timestamp","Team","Vraag 1"
+            "2020/10/30 3:08:44 PM GMT+1","Correct answers","Antwoord 1"
+            "2020/10/30 3:08:47 PM GMT+1","team2","Antwoord 1"
+        """))
+        (self.testdir / 'quizzes' / 'quiz2' / 'round1.csv').write_text(textwrap.dedent("""\
+            "Timestamp","Team","Vraag 1"
+            "2020/10/30 3:08:45 PM GMT+1","team3","Antwoord 1"
+        """))
+        self.quiz = Quiz.load_dir_with_ini(self.testdir / 'quizzes' / 'quiz1')
+
+    def test_results_csv(self):
+        # ARRANGE
+        out_file = io.StringIO()
+
+        # ACT
+        self.quiz.export_results(out_file)
+
+        # ASSERT
+        self.assertEqual(out_file.getvalue().splitlines(), [
+            'team_id,team_name,round1: Vraag 1,round1: Vraag 2,round2: Vraag 1,round1,round2,total',
+            'team1,team1,1,1,,2,,2',
+            'team2,team2,1,0,1,1,1,2',
+        ])
+
+    def test_leaderboard_jsonl(self):
+        # ARRANGE
+        out_file = io.StringIO()
+
+        # ACT
+        self.quiz.export_leaderboard(out_file, format='jsonl')
+
+        # ASSERT
+        self.assertEqual([json.loads(line) for line in out_file.getvalue().splitlines()], [
+            {'rank': 1, 'team_id': 'team1', 'team_name': 'team1', 'score': 2},
+            {'rank': 1, 'team_id': 'team2', 'team_name': 'team2', 'score': 2},
+        ])
+
+    def test_rows_are_generated(self):
+        # ACT
+        rows = export.result_rows(self.quiz)
+
+        # ASSERT
+        self.assertEqual(next(rows)[:2], ['team1', 'team1'])
+
+    def test_unknown_format(self):
+        # ACT
+        with self.assertRaises(ValueError):
+            self.quiz.export_results(io.StringIO(), format='xlsx')
+
+    @unittest.skipIf(export.pyarrow is None, 'pyarrow is not installed')
+    def test_results_parquet(self):
+        # ARRANGE
+        out_file = self.testdir / 'results.parquet'
+
+        # ACT
+        self.quiz.export_results(out_file, format='parquet')
+
+        # ASSERT
+        table = export.pyarrow.parquet.read_table(out_file)
+        self.assertEqual(table.column('total').to_pylist(), [2, 2])
+        self.assertEqual(table.column('round2: Vraag 1').to_pylist(), [None, 1])
+
+    def test_export_directory_of_quizzes(self):
+        # ARRANGE
+        out_dir = self.testdir / 'export'
+
+        # ACT
+        result = export.export_directory(self.testdir / 'quizzes', out_dir)
+
+        # ASSERT
+        self.assertEqual(result, ['quiz1', 'quiz2'])
+        self.assertEqual(sorted(path.name for path in out_dir.iterdir()), [
+            'quiz1-leaderboard.csv', 'quiz1-results.csv', 'quiz2-leaderboard.csv', 'quiz2-results.csv'])
+        self.assertEqual((out_dir / 'quiz2-leaderboard.csv').read_text().splitlines(),
+                         ['rank,team_id,team_name,score', '1,team3,team3,0'])
+
+    def test_export_single_quiz_directory(self):
+        # ACT
+        result = export.export_directory(self.testdir / 'quizzes' / 'quiz2', self.testdir / 'export')
+
+        # ASSERT
+        self.assertEqual(result, ['quiz2'])
@@ -0,0 +1,77 @@
+import unittest
+
+from googleformspubquiz import Team
+from leaderboard import Leaderboard
+
+
+def make_leaderboard(scores):
+    teams = [Team(i, 'team {}'.format(i)) for i in range(1, len(scores) + 1)]
+    return teams, Leaderboard(dict(zip(teams, scores)))
+
+
+class TestLeaderboard(unittest.TestCase):
+    def test_teams_ordered_by_score_then_name(self):
+        # ARRANGE
+        teams, leaderboard = make_leaderboard([3, 5, 3])
+
+        # ACT
+        result = list(leaderboard)
+
+        # ASSERT
+        self.assertEqual(result, [(teams[1], 5), (teams[0], 3), (teams[2], 3)])
+
+    def test_rows_share_rank_on_equal_score(self):
+        # ARRANGE
+        _, leaderboard = make_leaderboard([3, 5, 3])
+
+        # ACT
+        result = list(leaderboard.rows())
+
+        # ASSERT
+        self.assertEqual(result, [['1', 'team 2', '5'], ['2', 'team 1', '3'], ['', 'team 3', '3']])
+
+    def test_when_score_changes_expect_team_moves(self):
+        # ARRANGE
+        teams, leaderboard = make_leaderboard([3, 5, 3])
+
+        # ACT
+        leaderboard.add(teams[2], 3)
+
+        # ASSERT
+        self.assertEqual(leaderboard.top(2), [(teams[2], 6), (teams[1], 5)])
+        self.assertEqual(leaderboard.score(teams[2]), 6)
+
+    def test_when_new_team_added_expect_team_inserted(self):
+        # ARRANGE
+        teams, leaderboard = make_leaderboard([3, 5])
+        new_team = Team(3, 'team 3')
+
+        # ACT
+        leaderboard.add(new_team, 4)
+
+        # ASSERT
+        self.assertEqual(list(leaderboard), [(teams[1], 5), (new_team, 4), (teams[0], 3)])
+
+    def test_rank(self):
+        # ARRANGE
+        teams, leaderboard = make_leaderboard([3, 5, 3, 1])
+
+        # ACT
+        result = [leaderboard.rank(team) for team in teams]
+
+        # ASSERT
+        self.assertEqual(result, [2, 1, 2, 4])
+
+    def test_within(self):
+        # ARRANGE
+        teams, leaderboard = make_leaderboard([3, 5, 3, 1, 7])
+
+        # ACT
+        result = leaderboard.within(teams[0], 2)
+
+        # ASSERT
+        self.assertEqual(result, [(teams[1], 5), (teams[0], 3), (teams[2], 3), (teams[3], 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from unittest import mock
+
+import metrics
+
+
+class TestHistogram(unittest.TestCase):
+    def test_render(self):
+        # ARRANGE
+        histogram = metrics.Histogram('test_seconds', 'Test', buckets=(0.1, 1))
+        histogram.observe(0.05, view='a')
+        histogram.observe(0.5, view='a')
+        histogram.observe(5, view='a')
+
+        # ACT
+        result = list(histogram.samples())
+
+        # ASSERT
+        self.assertEqual(result, [
+            ('test_seconds_bucket', (('view', 'a'), ('le', '0.1')), 1),
+            ('test_seconds_bucket', (('view', 'a'), ('le', '1')), 2),
+            ('test_seconds_bucket', (('view', 'a'), ('le', '+Inf')), 3),
+            ('test_seconds_sum', (('view', 'a'),), 5.55),
+            ('test_seconds_count', (('view', 'a'),), 3),
+        ])
+
+
+class TestTimed(unittest.TestCase):
+    def test_when_disabled_expect_function_unchanged(self):
+        # ARRANGE
+        def func():
+            pass
+
+        # ACT
+        with mock.patch.object(metrics, 'enabled', False):
+            result = metrics.timed('test_disabled_seconds', 'Test')(func)
+
+        # ASSERT
+        self.assertIs(result, func)
+
+    def test_when_function_calls_itself_expect_one_observation(self):
+        # ARRANGE
+        with mock.patch.object(metrics, 'enabled', True):
+            @metrics.timed('test_recursive_seconds', 'Test')
+            def countdown(n):
+                return countdown(n - 1) if n else 0
+
+        # ACT
+        countdown(3)
+
+        # ASSERT
+        self.assertIn('test_recursive_seconds_count 1\n', metrics.render())
+
+
+if __name__ == '__main__':
+    unittest.main()
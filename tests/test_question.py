@@ -1,6 +1,6 @@
 import unittest
 
-from googleformspubquiz import Question, Answer, Section
+from googleformspubquiz import Question, Answer, Section, Response
 
 
 class TestCreateQuestion(unittest.TestCase):
@@ -91,6 +91,29 @@ class TestCorrectAnswers(unittest.TestCase):
         # ASSERT
         self.assertEqual(question.correct_answers, {'2'})
 
+    def test_when_correct_answers_change_expect_new_version(self):
+        # ARRANGE
+        question = Question(correct_answers=['1'])
+        version = question.version
+
+        # ACT
+        question.add_correct_answer('2')
+
+        # ASSERT
+        self.assertEqual(question.version, version + 1)
+
+    def test_when_correct_answers_unchanged_expect_same_version(self):
+        # ARRANGE
+        question = Question(correct_answers=['1', '2'])
+        version = question.version
+
+        # ACT
+        question.correct_answers = ['2', '1']
+        question.add_correct_answer('1')
+
+        # ASSERT
+        self.assertEqual(question.version, version)
+
 
 class TestAnswers(unittest.TestCase):
     def test_number_of_correct_responses(self):
@@ -120,6 +143,91 @@ class TestAnswers(unittest.TestCase):
         self.assertEqual(result['3'], 1)
         self.assertEqual(result['6'], 0)
 
+    def test_answer_list_counts_repeated_answers(self):
+        # ARRANGE
+        question = Question(correct_answers=['3'])
+        for answer_string in ('1', '3', '1', '1'):
+            Answer(question=question, answer=answer_string)
+
+        # ACT
+        result = question.answer_list()
+
+        # ASSERT
+        self.assertEqual(result, {'1': 3, '3': 1})
+
+    def test_repeated_answers_share_one_string(self):
+        # ARRANGE
+        question = Question()
+        answer1 = Answer(question=question, answer=''.join(['Ein', 'stein']))
+
+        # ACT
+        answer2 = Answer(question=question, answer=''.join(['Einst', 'ein']))
+
+        # ASSERT
+        self.assertIs(answer1.answer, answer2.answer)
+        self.assertEqual(answer1.code, answer2.code)
+        self.assertEqual(question.distinct_answers, ['Einstein'])
+
+    def test_answers_given_to_response_are_counted_once(self):
+        # ARRANGE
+        question = Question()
+        answer = Answer(question=question, answer='Einstein')
+
+        # ACT
+        response = Response(answers=[answer])
+
+        # ASSERT
+        self.assertEqual(len(question.answers), 1)
+        self.assertIs(question.answers[0].response, response)
+        self.assertEqual([a.answer for a in response.answers], ['Einstein'])
+
+    def test_answers_of_another_response_are_copied(self):
+        # ARRANGE
+        question = Question(correct_answers=['Einstein'])
+        response = Response(answers=[Answer(question=question, answer='Einstein')])
+
+        # ACT
+        copy = Response(answers=response.answers)
+
+        # ASSERT
+        self.assertEqual(question.answer_list(), {'Einstein': 2})
+        self.assertEqual(copy.score(), 1)
+
+    def test_answers_of_response_are_read_only(self):
+        # ARRANGE
+        question = Question()
+        response = Response(answers=[Answer(question=question, answer='Einstein')])
+
+        # ACT
+        with self.assertRaises(AttributeError):
+            response.answers[0].answer = 'Bohr'
+        with self.assertRaises(AttributeError):
+            response.answers.append(Answer(question=question, answer='Bohr'))
+
+        # ASSERT
+        self.assertEqual([a.answer for a in response.answers], ['Einstein'])
+
+    def test_answer_without_question_is_rejected(self):
+        # ACT
+        with self.assertRaises(ValueError):
+            Response(answers=[Answer(None, 'Einstein')])
+
+        # ASSERT
+        self.assertEqual(Answer(None, 'Einstein').answer, 'Einstein')
+
+    def test_mark_cluster_correct(self):
+        # ARRANGE
+        question = Question(correct_answers=['Einstein'])
+        for answer in ('einstien', 'Albert Einstein', 'Newton'):
+            Answer(question=question, answer=answer)
+
+        # ACT
+        added = question.mark_cluster_correct()
+
+        # ASSERT
+        self.assertEqual(sorted(added), ['Albert Einstein', 'einstien'])
+        self.assertEqual(question.correct_answers, {'Einstein', 'einstien', 'Albert Einstein'})
+
 
 if __name__ == '__main__':
     unittest.main()
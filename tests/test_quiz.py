@@ -2,8 +2,10 @@ import os
 import pathlib
 import textwrap
 import unittest
+from unittest import mock
 
 from googleformspubquiz import Quiz, Section, Team, Response
+from source import SectionSource
 
 
 class TestQuiz(unittest.TestCase):
@@ -45,6 +47,19 @@ class TestTeams(unittest.TestCase):
         self.assertEqual(result, team)
         self.assertEqual(len(quiz.teams), 1)
 
+    def test_get_merged_team_with_quiz(self):
+        quiz = Quiz()
+        team1 = quiz.get_team('1', 'test team')
+        team2 = quiz.get_team('2', 'test team 2')
+        quiz.merge_teams([team1, team2])
+
+        # ACT
+        result = quiz.get_team('2', 'test team 2')
+
+        # ASSERT
+        self.assertEqual(result, team1)
+        self.assertEqual(quiz.teams, (team1,))
+
 
 class TestMergeTeams(unittest.TestCase):
     def test_when_sections_of_teams_dont_overlap_expect_can_be_merged(self):
@@ -134,22 +149,20 @@ class TestMergeTeams(unittest.TestCase):
         quiz = Quiz()
         section1 = Section(quiz=quiz)
         team1 = quiz.get_team(1, 'test_1')
-        response1 = Response(team=team1)
-        response1.score = lambda: 4
-        section1.add_response(response1)
+        section1.add_response(Response(team=team1))
 
         section2 = Section(quiz=quiz)
         team2 = quiz.get_team(2, 'test_2')
-        response2 = Response(team=team2)
-        response2.score = lambda: 5
-        section2.add_response(response2)
+        section2.add_response(Response(team=team2))
+        scores = {team1: 4, team2: 5}
 
-        # ACT
-        quiz.merge_teams([team1, team2])
+        with mock.patch.object(Response, 'score', lambda response: scores[response.submitted_team]):
+            # ACT
+            quiz.merge_teams([team1, team2])
 
-        # ASSERT
-        self.assertEqual(section2.scores(), {team1: 5})
-        self.assertEqual(quiz.scores(), {team1: 9})
+            # ASSERT
+            self.assertEqual(section2.scores(), {team1: 5})
+            self.assertEqual(quiz.scores(), {team1: 9})
 
     def test_when_merging_teams_and_both_in_section_expect_failure(self):
         # ARRANGE
@@ -168,6 +181,99 @@ class TestMergeTeams(unittest.TestCase):
         pass
 
 
+class TestUndoMerge(unittest.TestCase):
+    def setUp(self):
+        self.quiz = Quiz()
+        section1 = Section(quiz=self.quiz)
+        section2 = Section(quiz=self.quiz)
+        self.team1 = self.quiz.get_team('1', 'test_1')
+        self.team2 = self.quiz.get_team('2', 'test_2')
+        self.team3 = self.quiz.get_team('3', 'test_3')
+        self.response2 = Response(team=self.team2)
+        section1.add_response(Response(team=self.team1))
+        section2.add_response(self.response2)
+
+    def test_when_merge_undone_expect_teams_separate(self):
+        # ARRANGE
+        self.quiz.merge_teams([self.team1, self.team2])
+
+        # ACT
+        result = self.quiz.undo_merge()
+
+        # ASSERT
+        self.assertTrue(result)
+        self.assertEqual(self.quiz.teams, (self.team1, self.team2, self.team3))
+        self.assertIs(self.response2.team, self.team2)
+
+    def test_when_merged_teams_merged_again_expect_first_team_remains(self):
+        # ARRANGE
+        self.quiz.merge_teams([self.team2, self.team3])
+
+        # ACT
+        self.quiz.merge_teams([self.team1, self.team2])
+
+        # ASSERT
+        self.assertEqual(self.quiz.teams, (self.team1,))
+        self.assertIs(self.response2.team, self.team1)
+        self.assertIs(self.quiz.get_team('3', 'test_3'), self.team1)
+
+    def test_when_second_merge_undone_expect_first_merge_kept(self):
+        # ARRANGE
+        self.quiz.merge_teams([self.team2, self.team3])
+        self.quiz.merge_teams([self.team1, self.team2])
+
+        # ACT
+        self.quiz.undo_merge()
+
+        # ASSERT
+        self.assertEqual(self.quiz.teams, (self.team1, self.team2))
+        self.assertIs(self.quiz.get_team('3', 'test_3'), self.team2)
+
+    def test_when_nothing_merged_expect_no_undo(self):
+        # ACT
+        result = self.quiz.undo_merge()
+
+        # ASSERT
+        self.assertFalse(result)
+
+
+class TestDuplicateTeams(unittest.TestCase):
+    def setUp(self):
+        self.quiz = Quiz()
+        self.section1 = Section(quiz=self.quiz)
+        self.section2 = Section(quiz=self.quiz)
+        self.team1 = self.quiz.get_team('1', 'The Einsteins')
+        self.team2 = self.quiz.get_team('2', 'the einstiens')
+        self.team3 = self.quiz.get_team('3', 'Quizzly Bears')
+        self.section1.add_response(Response(team=self.team1))
+        self.section2.add_response(Response(team=self.team2))
+        self.section2.add_response(Response(team=self.team3))
+
+    def test_coverage(self):
+        # ACT
+        result = self.quiz.coverage(self.team2)
+
+        # ASSERT
+        self.assertEqual(result, [0, 1])
+
+    def test_when_names_similar_and_sections_disjoint_expect_suggestion(self):
+        # ACT
+        result = self.quiz.suggest_duplicate_teams()
+
+        # ASSERT
+        self.assertEqual([(team1, team2) for team1, team2, _ in result], [(self.team1, self.team2)])
+
+    def test_when_sections_overlap_expect_no_suggestion(self):
+        # ARRANGE
+        self.section1.add_response(Response(team=self.team2))
+
+        # ACT
+        result = self.quiz.suggest_duplicate_teams()
+
+        # ASSERT
+        self.assertEqual(result, [])
+
+
 class TestLoadFromDirectory(unittest.TestCase):
     def test_load_from_csv(self):
         # ARRANGE
@@ -228,6 +334,378 @@ class TestLoadFromDirectory(unittest.TestCase):
         self.assertEqual(result.teamid_column, 1)
         self.assertEqual(result.teamname_column, 2)
 
+    def test_load_with_ini_response_policies_and_deadlines(self):
+        # ARRANGE
+        testdir = pathlib.Path(__file__).parent / 'testdata' / 'test_load_csv_with_deadlines'
+        os.makedirs(testdir, exist_ok=True)
+        for file in testdir.iterdir():
+            if file.suffix in ['.csv', '.zip']:
+                file.unlink()
+
+        for name in ['round1', 'round2']:
+            (testdir / (name + '.csv')).write_text(textwrap.dedent("""\
+                "Timestamp","Team","Vraag 1"
+                "2020/10/30 9:00:00 PM GMT+1","Correct answers","Antwoord 1"
+                "2020/10/30 9:20:00 PM GMT+1","test","Antwoord 2"
+                "2020/10/30 9:40:00 PM GMT+1","test","Antwoord 1"
+            """))
+
+        (testdir / 'quiz.ini').write_text(textwrap.dedent("""\
+            [scoring]
+            # response: which response counts when a team submits a section more than once: first, last or best
+            response = last
+
+            [responses]
+            Round2 = first
+
+            [deadlines]
+            # Responses submitted after the deadline of their section do not count
+            Round1 = 2020/10/30 9:30:00 PM GMT+1
+        """))
+
+        # ACT
+        result = Quiz.load_dir_with_ini(testdir)
+
+        # ASSERT
+        round1, round2 = result.get_section('round1'), result.get_section('round2')
+        self.assertEqual((round1.response_policy, round2.response_policy), ('last', 'first'))
+        self.assertEqual(round1.deadline, 1604089800)
+        self.assertIsNone(round2.deadline)
+        self.assertEqual(round1.response_for_team(result.teams[0]).timestamp, '2020/10/30 9:20:00 PM GMT+1')
+
+    def test_load_with_ini_time_zone(self):
+        # ARRANGE
+        testdir = pathlib.Path(__file__).parent / 'testdata' / 'test_load_csv_with_time_zone'
+        os.makedirs(testdir, exist_ok=True)
+        for file in testdir.iterdir():
+            file.unlink()
+
+        (testdir / 'round1.csv').write_text(textwrap.dedent("""\
+            "Timestamp","Team","Vraag 1"
+            "30/10/2020 21:20:00","test","Antwoord 1"
+            "30/10/2020 21:40:00","test","Antwoord 2"
+        """))
+        (testdir / 'quiz.ini').write_text(textwrap.dedent("""\
+            [timestamps]
+            # zone: the time zone of timestamps and deadlines written without one, e.g. GMT+1; UTC if not set
+            zone = GMT+1
+
+            [scoring]
+            response = last
+
+            [deadlines]
+            Round1 = 30/10/2020 21:30:00
+        """))
+
+        # ACT
+        result = Quiz.load_dir_with_ini(testdir)
+
+        # ASSERT
+        round1 = result.get_section('round1')
+        self.assertEqual(round1.deadline, 1604089800)
+        self.assertEqual([response.time for response in round1.responses], [1604089200, 1604090400])
+        self.assertEqual(round1.response_for_team(result.teams[0]).timestamp, '30/10/2020 21:20:00')
+
+
+class TestUpdateFromDirectory(unittest.TestCase):
+    def setUp(self):
+        self.testdir = pathlib.Path(__file__).parent / 'testdata' / 'test_update_from_dir'
+        os.makedirs(self.testdir, exist_ok=True)
+        for file in self.testdir.iterdir():
+            file.unlink()
+
+        self.csv_file = self.testdir / 'round1.csv'
+        self.csv_file.write_text(textwrap.dedent("""\
+            "Timestamp","Team","Vraag 1","Vraag 2"
+            "2020/10/30 3:08:44 PM GMT+1","team1","Antwoord 1","Antwoord 2"
+        """))
+
+    def test_when_rows_are_appended_expect_only_new_rows_added(self):
+        # ARRANGE
+        quiz = Quiz.load_dir(self.testdir)
+        section = quiz.sections[0]
+        first_response = section.responses[0]
+        with self.csv_file.open('a') as outfile:
+            outfile.write('"2020/10/30 3:09:44 PM GMT+1","team2","Antwoord 3","Antwoord 4"\n')
+
+        # ACT
+        result = quiz.update_from_dir(self.testdir)
+
+        # ASSERT
+        self.assertEqual(result, [section])
+        self.assertEqual(quiz.sections, (section,))
+        self.assertEqual(len(section.responses), 2)
+        self.assertIs(section.responses[0], first_response)
+        self.assertEqual(section.responses[1].team.team_id, 'team2')
+        self.assertEqual(len(quiz.teams), 2)
+
+    def test_when_file_unchanged_expect_nothing_updated(self):
+        # ARRANGE
+        quiz = Quiz.load_dir(self.testdir)
+
+        # ACT
+        result = quiz.update_from_dir(self.testdir)
+
+        # ASSERT
+        self.assertEqual(result, [])
+        self.assertEqual(len(quiz.sections[0].responses), 1)
+
+    def test_when_last_row_is_incomplete_expect_it_is_read_later(self):
+        # ARRANGE
+        quiz = Quiz.load_dir(self.testdir)
+        with self.csv_file.open('a') as outfile:
+            outfile.write('"2020/10/30 3:09:44 PM GMT+1","team2","Antwoord\n')
+
+        # ACT
+        quiz.update_from_dir(self.testdir)
+        with self.csv_file.open('a') as outfile:
+            outfile.write('3","Antwoord 4"\n')
+        quiz.update_from_dir(self.testdir)
+
+        # ASSERT
+        responses = quiz.sections[0].responses
+        self.assertEqual(len(responses), 2)
+        self.assertEqual(responses[1].answers[0].answer, 'Antwoord\n3')
+
+    def test_when_full_row_is_split_across_appends_expect_it_is_read_whole(self):
+        # ARRANGE
+        quiz = Quiz.load_dir(self.testdir)
+        with self.csv_file.open('a') as outfile:
+            outfile.write('2020/10/30 3:09:44 PM GMT+1,team2,Rome,Lon')
+
+        # ACT
+        quiz.update_from_dir(self.testdir)
+        with self.csv_file.open('a') as outfile:
+            outfile.write('don\n')
+        quiz.update_from_dir(self.testdir)
+
+        # ASSERT
+        responses = quiz.sections[0].responses
+        self.assertEqual(len(responses), 2)
+        self.assertEqual([answer.answer for answer in responses[1].answers], ['Rome', 'London'])
+
+    def test_when_header_is_split_across_writes_expect_it_is_read_whole(self):
+        # ARRANGE
+        self.csv_file.write_text('"Timestamp","Team","Vraag 1","Vra')
+        quiz = Quiz.load_dir(self.testdir)
+        with self.csv_file.open('a') as outfile:
+            outfile.write('ag 2"\n"2020/10/30 3:08:44 PM GMT+1","team1","Antwoord 1","Antwoord 2"\n')
+
+        # ACT
+        quiz.update_from_dir(self.testdir)
+
+        # ASSERT
+        section = quiz.sections[0]
+        self.assertEqual([question.name for question in section.questions], ['Vraag 1', 'Vraag 2'])
+        self.assertEqual(len(section.responses), 1)
+
+    def test_when_file_is_rewritten_expect_section_is_reloaded(self):
+        # ARRANGE
+        quiz = Quiz.load_dir(self.testdir)
+        section = quiz.sections[0]
+        self.csv_file.write_text(textwrap.dedent("""\
+            "Timestamp","Team","Vraag 1","Vraag 2"
+            "2020/10/30 3:10:44 PM GMT+1","team3","Antwoord 1","Antwoord 2"
+            "2020/10/30 3:11:44 PM GMT+1","team4","Antwoord 1","Antwoord 2"
+        """))
+
+        # ACT
+        quiz.update_from_dir(self.testdir)
+
+        # ASSERT
+        self.assertEqual(quiz.sections, (section,))
+        self.assertEqual([r.team.team_id for r in section.responses], ['team3', 'team4'])
+        self.assertEqual(len(section.questions), 2)
+
+    def test_when_file_removed_expect_section_and_its_teams_dropped(self):
+        # ARRANGE
+        (self.testdir / 'round2.csv').write_text(textwrap.dedent("""\
+            "Timestamp","Team","Vraag 1"
+            "2020/10/30 3:10:44 PM GMT+1","team2","Antwoord 1"
+        """))
+        quiz = Quiz.load_dir(self.testdir)
+        self.csv_file.unlink()
+
+        # ACT
+        quiz.update_from_dir(self.testdir)
+
+        # ASSERT
+        self.assertEqual([section.name for section in quiz.sections], ['round2'])
+        self.assertEqual([team.team_id for team in quiz.teams], ['team2'])
+
+    def test_when_file_removed_while_updating_expect_section_dropped(self):
+        # ARRANGE
+        quiz = Quiz.load_dir(self.testdir)
+        with self.csv_file.open('a') as outfile:
+            outfile.write('"2020/10/30 3:09:44 PM GMT+1","team2","Antwoord 3","Antwoord 4"\n')
+
+        # ACT
+        with mock.patch.object(SectionSource, 'update', side_effect=FileNotFoundError):
+            result = quiz.update_from_dir(self.testdir)
+
+        # ASSERT
+        self.assertEqual(result, [])
+        self.assertEqual(quiz.sections, ())
+
+    def test_when_file_is_rewritten_expect_teams_without_responses_dropped(self):
+        # ARRANGE
+        (self.testdir / 'round2.csv').write_text(textwrap.dedent("""\
+            "Timestamp","Team","Vraag 1"
+            "2020/10/30 3:10:44 PM GMT+1","team2","Antwoord 1"
+            "2020/10/30 3:10:45 PM GMT+1","team3","Antwoord 1"
+        """))
+        with self.csv_file.open('a') as outfile:
+            outfile.write('"2020/10/30 3:09:44 PM GMT+1","team5","Antwoord 1","Antwoord 2"\n')
+        quiz = Quiz.load_dir(self.testdir)
+        quiz.merge_teams([quiz.get_team('team1', 'team1'), quiz.get_team('team3', 'team3')])
+        self.csv_file.write_text(textwrap.dedent("""\
+            "Timestamp","Team","Vraag 1","Vraag 2"
+            "2020/10/30 3:11:44 PM GMT+1","team4","Antwoord 1","Antwoord 2"
+        """))
+
+        # ACT
+        quiz.update_from_dir(self.testdir)
+
+        # ASSERT
+        self.assertEqual([team.team_id for team in quiz.teams], ['team1', 'team2', 'team4'])
+        self.assertEqual(set(quiz.scores()), set(quiz.teams))
+
+    def test_when_appended_rows_show_month_first_dates_expect_section_is_reloaded(self):
+        # ARRANGE
+        self.csv_file.write_text(textwrap.dedent("""\
+            "Timestamp","Team","Vraag 1","Vraag 2"
+            "05/10/2020 20:00:00","team1","Antwoord 1","Antwoord 2"
+        """))
+        quiz = Quiz.load_dir(self.testdir)
+        day_first_time = quiz.sections[0].responses[0].time
+        with self.csv_file.open('a') as outfile:
+            outfile.write('"05/13/2020 20:00:00","team2","Antwoord 3","Antwoord 4"\n')
+
+        # ACT
+        quiz.update_from_dir(self.testdir)
+
+        # ASSERT
+        responses = quiz.sections[0].responses
+        self.assertEqual(day_first_time, 1601928000)
+        self.assertEqual([response.time for response in responses], [1589140800, 1589400000])
+
+
+class TestMergeLog(unittest.TestCase):
+    def setUp(self):
+        self.testdir = pathlib.Path(__file__).parent / 'testdata' / 'test_merge_log'
+        os.makedirs(self.testdir, exist_ok=True)
+        for file in self.testdir.iterdir():
+            file.unlink()
+
+        (self.testdir / 'round1.csv').write_text(textwrap.dedent("""\
+            "Timestamp","Team","Vraag 1"
+            "2020/10/30 3:08:44 PM GMT+1","team1","Antwoord 1"
+        """))
+        (self.testdir / 'round2.csv').write_text(textwrap.dedent("""\
+            "Timestamp","Team","Vraag 1"
+            "2020/10/30 3:18:44 PM GMT+1","team2","Antwoord 1"
+        """))
+
+    def test_when_quiz_loaded_again_expect_merge_replayed(self):
+        # ARRANGE
+        quiz = Quiz.load_dir(self.testdir)
+        quiz.merge_teams(list(quiz.teams))
+
+        # ACT
+        result = Quiz.load_dir(self.testdir)
+
+        # ASSERT
+        self.assertEqual([team.team_id for team in result.teams], ['team1'])
+        self.assertEqual([response.team.team_id for response in result.sections[1].responses], ['team1'])
+
+    def test_when_merge_undone_expect_undo_replayed(self):
+        # ARRANGE
+        quiz = Quiz.load_dir(self.testdir)
+        quiz.merge_teams(list(quiz.teams))
+        quiz.undo_merge()
+
+        # ACT
+        result = Quiz.load_dir(self.testdir)
+
+        # ASSERT
+        self.assertEqual([team.team_id for team in result.teams], ['team1', 'team2'])
+
+    def test_when_other_quiz_merges_expect_merge_read_on_update(self):
+        # ARRANGE
+        quiz = Quiz.load_dir(self.testdir)
+        other_quiz = Quiz.load_dir(self.testdir)
+        other_quiz.merge_teams(list(other_quiz.teams))
+
+        # ACT
+        quiz.update_from_dir(self.testdir)
+
+        # ASSERT
+        self.assertEqual([team.team_id for team in quiz.teams], ['team1'])
+        self.assertEqual({team.team_id: score for team, score in quiz.scores().items()}, {'team1': 0})
+
+    def test_when_log_removed_expect_merges_forgotten(self):
+        # ARRANGE
+        quiz = Quiz.load_dir(self.testdir)
+        quiz.merge_teams(list(quiz.teams))
+        (self.testdir / 'merges.log').unlink()
+
+        # ACT
+        quiz.update_from_dir(self.testdir)
+
+        # ASSERT
+        self.assertEqual([team.team_id for team in quiz.teams], ['team1', 'team2'])
+
+    def test_when_other_quiz_merged_expect_log_read_before_own_entry(self):
+        # ARRANGE
+        (self.testdir / 'round3.csv').write_text(textwrap.dedent("""\
+            "Timestamp","Team","Vraag 1"
+            "2020/10/30 3:28:44 PM GMT+1","team3","Antwoord 1"
+        """))
+        quiz = Quiz.load_dir(self.testdir)
+        other_quiz = Quiz.load_dir(self.testdir)
+        other_quiz.merge_teams([other_quiz.get_team('team1', 'team1'), other_quiz.get_team('team2', 'team2')])
+
+        # ACT
+        quiz.merge_teams([quiz.get_team('team1', 'team1'), quiz.get_team('team3', 'team3')])
+        quiz.undo_merge()
+
+        # ASSERT
+        self.assertEqual(quiz._merge_log_offset, (self.testdir / 'merges.log').stat().st_size)
+        self.assertEqual([team.team_id for team in quiz.teams], ['team1', 'team3'])
+        self.assertEqual([team.team_id for team in Quiz.load_dir(self.testdir).teams], ['team1', 'team3'])
+
+
+class TestParallelLoad(unittest.TestCase):
+    def test_parallel_load_equals_serial_load(self):
+        # ARRANGE
+        testdir = pathlib.Path(__file__).parent / 'testdata' / 'test_parallel_load'
+        os.makedirs(testdir, exist_ok=True)
+        for file in testdir.iterdir():
+            file.unlink()
+
+        for section_nr in range(1, 4):
+            (testdir / 'round{}.csv'.format(section_nr)).write_text(textwrap.dedent("""\
+                "Timestamp","Team","Vraag 1","Vraag 2"
+                "2020/10/30 3:08:44 PM GMT+1","Correct answers","Antwoord 1","Antwoord 2"
+                "2020/10/30 3:08:45 PM GMT+1","team{0}","Antwoord 1","Antwoord 3"
+                "2020/10/30 3:08:46 PM GMT+1","team{1}","Antwoord 1","Antwoord 2"
+            """.format(section_nr, section_nr + 1)))
+        (testdir / 'round2.yaml').write_text('- - Antwoord 3\n- - Antwoord 3\n')
+        expected = Quiz.load_dir(testdir)
+
+        # ACT
+        result = Quiz.load_dir_with_ini(testdir, workers=2)
+
+        # ASSERT
+        self.assertEqual([s.name for s in result.sections], [s.name for s in expected.sections])
+        self.assertEqual([t.team_id for t in result.teams], [t.team_id for t in expected.teams])
+        self.assertEqual({t.team_id: s for t, s in result.scores().items()},
+                         {t.team_id: s for t, s in expected.scores().items()})
+        for section in result.sections:
+            self.assertIs(section.quiz, result)
+            for response in section.responses:
+                self.assertIs(result.get_team(response.team.team_id, None), response.team)
+
 
 def make_teams(teamscores):
     quiz = Quiz()
@@ -271,6 +749,23 @@ class TestLeaderboard(unittest.TestCase):
         # ASSERT
         self.assertEqual(result, [['1', 'team 1', '9'], ['', 'team 2', '9']])
 
+    def test_leaderboard_follows_marking(self):
+        # ARRANGE
+        quiz = Quiz()
+        section = Section(quiz=quiz)
+        section.set_header(['Timestamp', 'Team', 'Q1'])
+        section.add_response_from_line(['2020/11/01 20:00:00', 'team 1', 'a'])
+        section.add_response_from_line(['2020/11/01 20:00:01', 'team 2', 'b'])
+        section.questions[0].correct_answers = ['a']
+        list(quiz.leaderboard())
+
+        # ACT
+        section.questions[0].correct_answers = ['b']
+
+        # ASSERT
+        self.assertEqual(list(quiz.leaderboard()), [['1', 'team 2', '1'], ['2', 'team 1', '0']])
+        self.assertEqual(quiz.standings().rank(quiz.get_team('team 1', None)), 2)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,177 @@
+import os
+import pathlib
+import textwrap
+import threading
+import unittest
+
+from googleformspubquiz import Quiz
+from quizcache import QuizCache
+
+
+def make_quiz_dir(name):
+    testdir = pathlib.Path(__file__).parent / 'testdata' / name
+    os.makedirs(testdir, exist_ok=True)
+    for file in testdir.iterdir():
+        file.unlink()
+
+    (testdir / 'round1.csv').write_text(textwrap.dedent("""\
+        "Timestamp","Team","Vraag 1","Vraag 2"
+        "2020/10/30 3:08:44 PM GMT+1","team1","Antwoord 1","Antwoord 2"
+    """))
+    return testdir
+
+
+class CountingLoader:
+    def __init__(self):
+        self.loaded = []
+
+    def __call__(self, directory):
+        self.loaded.append(directory)
+        return Quiz.load_dir_with_ini(directory)
+
+
+class TestQuizCache(unittest.TestCase):
+    def test_when_quiz_requested_twice_expect_same_quiz(self):
+        # ARRANGE
+        testdir = make_quiz_dir('test_cache_same')
+        loader = CountingLoader()
+        cache = QuizCache(loader=loader)
+
+        # ACT
+        quiz1 = cache.get(testdir)
+        quiz2 = cache.get(testdir)
+
+        # ASSERT
+        self.assertIs(quiz1, quiz2)
+        self.assertEqual(len(loader.loaded), 1)
+
+    def test_when_csv_grows_expect_cached_quiz_updated(self):
+        # ARRANGE
+        testdir = make_quiz_dir('test_cache_grows')
+        cache = QuizCache()
+        quiz = cache.get(testdir)
+        with (testdir / 'round1.csv').open('a') as outfile:
+            outfile.write('"2020/10/30 3:09:44 PM GMT+1","team2","Antwoord 3","Antwoord 4"\n')
+
+        # ACT
+        result = cache.get(testdir)
+
+        # ASSERT
+        self.assertIs(result, quiz)
+        self.assertEqual(len(result.sections[0].responses), 2)
+
+    def test_when_answers_change_expect_answers_reloaded(self):
+        # ARRANGE
+        testdir = make_quiz_dir('test_cache_answers')
+        cache = QuizCache()
+        cache.get(testdir)
+        (testdir / 'round1.yaml').write_text(textwrap.dedent("""\
+            - - Antwoord 1
+            - - Antwoord 3
+        """))
+
+        # ACT
+        result = cache.get(testdir)
+
+        # ASSERT
+        self.assertEqual(result.sections[0].questions[0].correct_answers, {'Antwoord 1'})
+
+    def test_when_ini_changes_expect_quiz_reloaded(self):
+        # ARRANGE
+        testdir = make_quiz_dir('test_cache_ini')
+        loader = CountingLoader()
+        cache = QuizCache(loader=loader)
+        quiz = cache.get(testdir)
+        (testdir / 'quiz.ini').write_text(textwrap.dedent("""\
+            [columns]
+            team_id = 1
+        """))
+
+        # ACT
+        result = cache.get(testdir)
+
+        # ASSERT
+        self.assertIsNot(result, quiz)
+        self.assertEqual(len(loader.loaded), 2)
+
+    def test_when_too_many_quizzes_expect_least_recently_used_evicted(self):
+        # ARRANGE
+        testdirs = [make_quiz_dir('test_cache_lru_{}'.format(i)) for i in range(3)]
+        cache = QuizCache(max_quizzes=2)
+        cache.get(testdirs[0])
+        cache.get(testdirs[1])
+        cache.get(testdirs[0])
+
+        # ACT
+        cache.get(testdirs[2])
+
+        # ASSERT
+        self.assertEqual(len(cache), 2)
+        self.assertIn(testdirs[0], cache)
+        self.assertNotIn(testdirs[1], cache)
+
+    def test_when_too_many_responses_expect_eviction(self):
+        # ARRANGE
+        testdirs = [make_quiz_dir('test_cache_budget_{}'.format(i)) for i in range(2)]
+        cache = QuizCache(max_quizzes=None, max_responses=1)
+        cache.get(testdirs[0])
+
+        # ACT
+        cache.get(testdirs[1])
+
+        # ASSERT
+        self.assertEqual(len(cache), 1)
+        self.assertIn(testdirs[1], cache)
+
+    def test_when_quiz_in_use_expect_update_waits(self):
+        # ARRANGE
+        testdir = make_quiz_dir('test_cache_in_use')
+        cache = QuizCache()
+        cache.get(testdir)
+        updated = threading.Event()
+        thread = threading.Thread(target=lambda: (cache.get(testdir), updated.set()))
+
+        # ACT
+        with cache.using(testdir) as quiz:
+            thread.start()
+            waited = not updated.wait(0.2)
+            responses = len(quiz.sections[0].responses)
+        thread.join()
+
+        # ASSERT
+        self.assertTrue(waited)
+        self.assertTrue(updated.is_set())
+        self.assertEqual(responses, 1)
+
+    def test_when_csv_removed_expect_section_removed_from_cached_quiz(self):
+        # ARRANGE
+        testdir = make_quiz_dir('test_cache_removed')
+        (testdir / 'round2.csv').write_text((testdir / 'round1.csv').read_text())
+        cache = QuizCache()
+        quiz = cache.get(testdir)
+        revision = quiz.revision
+        (testdir / 'round1.csv').unlink()
+
+        # ACT
+        result = cache.get(testdir)
+
+        # ASSERT
+        self.assertIs(result, quiz)
+        self.assertEqual([section.name for section in result.sections], ['round2'])
+        self.assertNotEqual(result.revision, revision)
+
+    def test_when_quiz_does_not_exist_expect_no_lock_created(self):
+        # ARRANGE
+        cache = QuizCache()
+        testdir = pathlib.Path(__file__).parent / 'testdata' / 'test_cache_no_such_quiz'
+
+        # ACT
+        with self.assertRaises(FileNotFoundError):
+            cache.get(testdir)
+
+        # ASSERT
+        self.assertEqual(cache._quiz_locks, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,11 @@
 import io
 import textwrap
 import unittest
+import warnings
+from unittest import mock
 
 from googleformspubquiz import Section, Question, Response, Answer, Quiz, Team
+from timestamps import parse_timestamp
 
 
 class TestInit(unittest.TestCase):
@@ -89,6 +92,22 @@ class TestReadLine(unittest.TestCase):
         self.assertEqual(result.team_name, 'Team name')
         self.assertEqual(result.fields, ['Answer1', 'Answer2', 'Answer3'])
 
+    def test_responses_and_correct_answers_with_quiz_columns(self):
+        quiz = Quiz(teamid_column=2, teamname_column=1)
+        section = Section(quiz=quiz)
+        section.set_header(['Date', 'Team name', 'Team id', 'Q1', 'Q2'])
+
+        # ACT
+        section.add_row(['Date', 'Correct answers', 'x', 'Answer1', 'Answer2'])
+        section.add_row(['Date', 'Team name', 'Team id', 'Answer1', 'Answer3'])
+
+        # ASSERT
+        self.assertEqual([q.name for q in section.questions], ['Q1', 'Q2'])
+        self.assertEqual(section.questions[1].correct_answers, {'Answer2'})
+        response = section.responses[0]
+        self.assertEqual((response.team.team_id, response.team.name), ('Team id', 'Team name'))
+        self.assertEqual([a.answer for a in response.answers], ['Answer1', 'Answer3'])
+
 
 class TestReadResponses(unittest.TestCase):
     def test_header(self):
@@ -311,6 +330,22 @@ class TestResponsesForTeam(unittest.TestCase):
         # ASSERT
         self.assertEqual(result, set())
 
+    def test_when_team_is_replaced_expect_responses_moved(self):
+        # ARRANGE
+        section = Section()
+        team1 = section.get_team('1', 'team 1')
+        team2 = section.get_team('2', 'team 2')
+        response = Response(team=team2)
+        section.add_response(response)
+
+        # ACT
+        section.replace_team(team2, team1)
+
+        # ASSERT
+        self.assertEqual(section.responses_for_team(team1), {response})
+        self.assertEqual(section.responses_for_team(team2), set())
+        self.assertEqual(section.teams(), {team1})
+
 
 class TestResponseForTeam(unittest.TestCase):
     def test_when_team_has_one_response_expect_one_response(self):
@@ -359,23 +394,261 @@ class TestScoring(unittest.TestCase):
     def test_when_team_has_multiple_responses_expect_only_score_of_first_response(self):
         section = Section()
         team = section.get_team('1', 'team1')
-        response1 = Response(team=team, timestamp='2020/11/01 20:00:00')
-        response1.score = lambda: 5
-        section.add_response(response1)
+        scores = {'2020/11/01 20:00:00': 5, '2020/11/01 19:00:00': 4, '2020/11/01 21:00:00': 3}
+        for timestamp in scores:
+            section.add_response(Response(team=team, timestamp=timestamp))
 
-        response2 = Response(team=team, timestamp='2020/11/01 19:00:00')
-        response2.score = lambda: 4
-        section.add_response(response2)
+        # ACT
+        with mock.patch.object(Response, 'score', lambda response: scores[response.timestamp]):
+            result = section.scores()
 
-        response3 = Response(team=team, timestamp='2020/11/01 21:00:00')
-        response3.score = lambda: 3
-        section.add_response(response3)
+        # ASSERT
+        self.assertEqual(result, {team: 4})
 
+
+class TestResponsePolicy(unittest.TestCase):
+    def setUp(self):
+        # team1 submitted at 3 PM and at 10 AM the next morning, which sorts before it as text
+        test_file = textwrap.dedent("""\
+            "Timestamp","Teamnaam","Vraag 1","Vraag 2"
+            "2020/10/30 3:08:44 PM GMT+1","Correct answers","Antwoord 1","Antwoord 2"
+            "2020/10/30 3:08:45 PM GMT+1","team1","Antwoord 1","Antwoord 3"
+            "2020/10/31 10:08:46 AM GMT+1","team1","Antwoord 1","Antwoord 2"
+            "2020/10/30 3:08:47 PM GMT+1","team2","Antwoord 3","Antwoord 3"
+        """)
+        self.quiz = Quiz()
+        self.section = Section.read_csv(io.StringIO(test_file), name='Ronde 1', quiz=self.quiz)
+        self.team1, self.team2 = self.quiz.teams
+        self.first, self.second = self.section.responses[:2]
+
+    def test_first_is_the_default(self):
         # ACT
-        result = section.scores()
+        result = self.section.response_for_team(self.team1)
 
         # ASSERT
-        self.assertEqual(result, {team: 4})
+        self.assertIs(result, self.first)
+        self.assertEqual(self.section.scores(), {self.team1: 1, self.team2: 0})
+
+    def test_last_policy_on_quiz(self):
+        # ARRANGE
+        self.quiz.scores()
+
+        # ACT
+        self.quiz.response_policy = 'last'
+
+        # ASSERT
+        self.assertIs(self.section.response_for_team(self.team1), self.second)
+        self.assertEqual(self.quiz.scores(), {self.team1: 2, self.team2: 0})
+
+    def test_section_policy_overrides_quiz_policy(self):
+        # ARRANGE
+        quiz = Quiz(response_policy='last', section_response_policies={'ronde 1': 'first'})
+
+        # ACT
+        section = Section(name='Ronde 1', quiz=quiz)
+
+        # ASSERT
+        self.assertEqual(section.response_policy, 'first')
+        self.assertEqual(Section(name='Ronde 2', quiz=quiz).response_policy, 'last')
+
+    def test_best_policy_follows_marking(self):
+        # ARRANGE
+        self.section.response_policy = 'best'
+        self.assertIs(self.section.response_for_team(self.team1), self.second)
+        self.quiz.scores()
+
+        # ACT
+        self.section.questions[1].add_correct_answer('Antwoord 3')
+
+        # ASSERT
+        self.assertIs(self.section.response_for_team(self.team1), self.first)
+        self.assertEqual(self.quiz.scores(), {self.team1: 2, self.team2: 1})
+
+    def test_new_response_replaces_chosen_response(self):
+        # ARRANGE
+        self.section.response_policy = 'last'
+        self.quiz.scores()
+
+        # ACT
+        self.section.add_response_from_line(['2020/10/31 11:00:00 AM GMT+1', 'team1', 'Antwoord 3', 'Antwoord 3'])
+
+        # ASSERT
+        self.assertIs(self.section.response_for_team(self.team1), self.section.responses[-1])
+        self.assertEqual(self.quiz.scores(), {self.team1: 0, self.team2: 0})
+
+    def test_unknown_policy(self):
+        # ACT
+        with self.assertRaises(ValueError):
+            self.section.response_policy = 'random'
+
+        # ASSERT
+        self.assertEqual(self.section.response_policy, 'first')
+
+
+class TestTimeWindow(unittest.TestCase):
+    def setUp(self):
+        test_file = textwrap.dedent("""\
+            "Timestamp","Teamnaam","Vraag 1","Vraag 2"
+            "2020/10/30 9:00:00 PM GMT+1","Correct answers","Antwoord 1","Antwoord 2"
+            "2020/10/30 9:20:00 PM GMT+1","team1","Antwoord 1","Antwoord 3"
+            "2020/10/30 9:40:00 PM GMT+1","team2","Antwoord 1","Antwoord 2"
+            "2020/10/30 9:10:00 PM GMT+1","team2","Antwoord 3","Antwoord 3"
+            "2020/10/30 9:50:00 PM GMT+1","team3","Antwoord 1","Antwoord 2"
+        """)
+        self.quiz = Quiz()
+        self.section = Section.read_csv(io.StringIO(test_file), name='Ronde 1', quiz=self.quiz)
+        self.team1, self.team2, self.team3 = self.quiz.teams
+
+    def test_responses_until_are_sorted_by_time(self):
+        # ACT
+        result = self.section.responses_until(parse_timestamp('2020/10/30 9:40:00 PM GMT+1'))
+
+        # ASSERT
+        self.assertEqual([response.team for response in result], [self.team2, self.team1, self.team2])
+
+    def test_scores_as_of(self):
+        # ACT
+        result = self.section.scores(as_of=parse_timestamp('2020/10/30 9:30:00 PM GMT+1'))
+
+        # ASSERT
+        self.assertEqual(result, {self.team1: 1, self.team2: 0})
+
+    def test_scores_as_of_with_last_policy(self):
+        # ARRANGE
+        self.section.response_policy = 'last'
+
+        # ACT
+        before = self.section.scores(as_of=parse_timestamp('2020/10/30 9:30:00 PM GMT+1'))
+        after = self.section.scores(as_of=parse_timestamp('2020/10/30 9:45:00 PM GMT+1'))
+
+        # ASSERT
+        self.assertEqual(before, {self.team1: 1, self.team2: 0})
+        self.assertEqual(after, {self.team1: 1, self.team2: 2})
+
+    def test_late_responses_do_not_count(self):
+        # ARRANGE
+        self.section.response_policy = 'last'
+        self.quiz.scores()
+
+        # ACT
+        self.section.deadline = parse_timestamp('2020/10/30 9:30:00 PM GMT+1')
+
+        # ASSERT
+        self.assertEqual(self.section.scores(), {self.team1: 1, self.team2: 0})
+        self.assertEqual(self.quiz.scores(), {self.team1: 1, self.team2: 0})
+        self.assertIsNone(self.section.response_for_team(self.team3))
+
+    def test_response_added_after_deadline_does_not_count(self):
+        # ARRANGE
+        self.section.deadline = parse_timestamp('2020/10/30 10:00:00 PM GMT+1')
+        self.quiz.scores()
+
+        # ACT
+        self.section.add_response_from_line(['2020/10/30 10:05:00 PM GMT+1', 'team4', 'Antwoord 1', 'Antwoord 2'])
+
+        # ASSERT
+        self.assertEqual(self.quiz.scores(), {self.team1: 1, self.team2: 0, self.team3: 2})
+
+    def test_responses_without_time_warn_when_there_is_a_deadline(self):
+        # ARRANGE
+        self.section.add_response_from_line(['yesterday', 'team4', 'Antwoord 1', 'Antwoord 2'])
+
+        # ACT
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.section.deadline = parse_timestamp('2020/10/30 10:00:00 PM GMT+1')
+            result = self.section.scores()
+
+        # ASSERT
+        self.assertEqual(len(caught), 1)
+        self.assertIn('Ronde 1: 1 response(s)', str(caught[0].message))
+        self.assertNotIn(self.quiz.teams[3], result)
+
+    def test_leaderboard_as_of(self):
+        # ACT
+        result = list(self.quiz.leaderboard(as_of=parse_timestamp('2020/10/30 9:30:00 PM GMT+1')))
+
+        # ASSERT
+        self.assertEqual(result, [['1', 'team1', '1'], ['2', 'team2', '0']])
+
+
+class TestRescoring(unittest.TestCase):
+    def setUp(self):
+        test_file = textwrap.dedent("""\
+            "Timestamp","Teamnaam","Vraag 1","Vraag 2"
+            "2020/10/30 3:08:44 PM GMT+1","Correct answers","Antwoord 1","Antwoord 2"
+            "2020/10/30 3:08:45 PM GMT+1","team1","Antwoord 1","Antwoord 3"
+            "2020/10/30 3:08:46 PM GMT+1","team2","Antwoord 4","Antwoord 3"
+            "2020/10/30 3:08:47 PM GMT+1","team3","Antwoord 1","Antwoord 2"
+        """)
+        self.quiz = Quiz()
+        self.section = Section.read_csv(io.StringIO(test_file), quiz=self.quiz)
+        self.team1, self.team2, self.team3 = self.quiz.teams
+
+    def test_when_answer_marked_correct_expect_scores_updated(self):
+        # ARRANGE
+        self.quiz.scores()
+
+        # ACT
+        self.section.questions[1].add_correct_answer('Antwoord 3')
+
+        # ASSERT
+        self.assertEqual(self.section.scores(), {self.team1: 2, self.team2: 1, self.team3: 2})
+        self.assertEqual(self.quiz.scores(), {self.team1: 2, self.team2: 1, self.team3: 2})
+
+    def test_when_answer_marked_incorrect_expect_scores_updated(self):
+        # ARRANGE
+        self.quiz.scores()
+
+        # ACT
+        self.section.questions[0].correct_answers = []
+
+        # ASSERT
+        self.assertEqual(self.quiz.scores(), {self.team1: 0, self.team2: 0, self.team3: 1})
+
+    def test_when_response_added_expect_scores_updated(self):
+        # ARRANGE
+        self.quiz.scores()
+
+        # ACT
+        self.section.add_response_from_line(["2020/10/30 3:08:48 PM GMT+1", "team4", "Antwoord 1", "Antwoord 2"])
+
+        # ASSERT
+        team4 = self.quiz.get_team('team4', 'team4')
+        self.assertEqual(self.quiz.scores()[team4], 2)
+
+
+class TestRevision(unittest.TestCase):
+    def setUp(self):
+        self.quiz = Quiz()
+        self.section = Section(quiz=self.quiz)
+        self.section.set_header(["Timestamp", "Teamnaam", "Vraag 1", "Vraag 2"])
+        self.question1, self.question2 = self.section.questions
+
+    def test_when_answer_marked_correct_expect_new_revisions(self):
+        # ARRANGE
+        revisions = (self.quiz.revision, self.section.revision, self.question1.revision, self.question2.revision)
+
+        # ACT
+        self.question1.add_correct_answer('Antwoord 1')
+
+        # ASSERT
+        self.assertNotEqual(self.quiz.revision, revisions[0])
+        self.assertNotEqual(self.section.revision, revisions[1])
+        self.assertNotEqual(self.question1.revision, revisions[2])
+        self.assertEqual(self.question2.revision, revisions[3])
+
+    def test_when_response_added_expect_new_revisions(self):
+        # ARRANGE
+        revisions = (self.quiz.revision, self.section.revision, self.question1.revision)
+
+        # ACT
+        self.section.add_response_from_line(["2020/10/30 3:08:48 PM GMT+1", "team4", "Antwoord 1", "Antwoord 2"])
+
+        # ASSERT
+        self.assertNotEqual(self.quiz.revision, revisions[0])
+        self.assertNotEqual(self.section.revision, revisions[1])
+        self.assertNotEqual(self.question1.revision, revisions[2])
 
 
 if __name__ == '__main__':
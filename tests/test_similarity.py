@@ -0,0 +1,52 @@
+import unittest
+
+import similarity
+from googleformspubquiz import Question, Answer
+
+
+class TestNormalize(unittest.TestCase):
+    def test_case_accents_and_punctuation_are_ignored(self):
+        # ARRANGE
+        answer = '  A. Schrödinger!'
+
+        # ACT
+        result = similarity.normalize(answer)
+
+        # ASSERT
+        self.assertEqual(result, 'a schrodinger')
+
+
+class TestAnswerIndex(unittest.TestCase):
+    def setUp(self):
+        self.question = Question()
+        for answer in ('Einstein', 'einstien', 'A. Einstein', 'Newton', 'Bohr'):
+            Answer(question=self.question, answer=answer)
+        self.index = similarity.AnswerIndex(self.question)
+
+    def test_similar(self):
+        # ACT
+        result = self.index.similar('Einstein')
+
+        # ASSERT
+        self.assertEqual(sorted(result), ['A. Einstein', 'Einstein', 'einstien'])
+
+    def test_when_answers_added_expect_them_indexed(self):
+        # ARRANGE
+        self.index.similar('Einstein')
+
+        # ACT
+        Answer(question=self.question, answer='Einstain')
+
+        # ASSERT
+        self.assertIn('Einstain', self.index.similar('Einstein'))
+
+    def test_cluster(self):
+        # ACT
+        result = self.index.cluster(['Newton', 'Einstein'])
+
+        # ASSERT
+        self.assertEqual(sorted(result), ['A. Einstein', 'Einstein', 'Newton', 'einstien'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import os
+import pathlib
+import textwrap
+import unittest
+from unittest import mock
+
+import snapshot
+from googleformspubquiz import Quiz
+from source import SectionSource
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.testdir = pathlib.Path(__file__).parent / 'testdata' / 'test_snapshot'
+        os.makedirs(self.testdir, exist_ok=True)
+        for file in self.testdir.iterdir():
+            file.unlink()
+
+        (self.testdir / 'round1.csv').write_text(textwrap.dedent("""\
+            "Timestamp","Team","Vraag 1","Vraag 2"
+            "2020/10/30 3:08:44 PM GMT+1","Correct answers","Antwoord 1","Antwoord 2"
+            "2020/10/30 3:08:45 PM GMT+1","team1","Antwoord 1","Antwoord 3"
+            "2020/10/30 3:08:46 PM GMT+1","team2","Antwoord 1","Antwoord 2"
+        """))
+        (self.testdir / 'round2.csv').write_text(textwrap.dedent("""\
+            "Timestamp","Team","Vraag 1"
+            "2020/10/30 3:18:45 PM GMT+1","team3","Antwoord 1"
+        """))
+        (self.testdir / 'round2.yaml').write_text(textwrap.dedent("""\
+            - - Antwoord 1
+        """))
+
+    def assert_same_quiz(self, quiz1, quiz2):
+        self.assertEqual([s.name for s in quiz1.sections], [s.name for s in quiz2.sections])
+        self.assertEqual([t.team_id for t in quiz1.teams], [t.team_id for t in quiz2.teams])
+        self.assertEqual({t.team_id: s for t, s in quiz1.scores().items()},
+                         {t.team_id: s for t, s in quiz2.scores().items()})
+        for section1, section2 in zip(quiz1.sections, quiz2.sections):
+            for question1, question2 in zip(section1.questions, section2.questions):
+                self.assertEqual(question1.answer_list(), question2.answer_list())
+                self.assertEqual(question1.correct_answers, question2.correct_answers)
+
+    def test_when_loading_expect_snapshot_written(self):
+        # ACT
+        Quiz.load_dir_with_ini(self.testdir, use_snapshot=True)
+
+        # ASSERT
+        self.assertTrue((self.testdir / snapshot.SNAPSHOT_NAME).exists())
+
+    def test_when_sources_unchanged_expect_quiz_restored_without_parsing(self):
+        # ARRANGE
+        expected = Quiz.load_dir_with_ini(self.testdir, use_snapshot=True)
+
+        # ACT
+        with mock.patch.object(SectionSource, '_load') as load:
+            result = Quiz.load_dir_with_ini(self.testdir, use_snapshot=True)
+
+        # ASSERT
+        load.assert_not_called()
+        self.assert_same_quiz(result, expected)
+
+    def test_when_one_source_changed_expect_only_that_section_parsed(self):
+        # ARRANGE
+        Quiz.load_dir_with_ini(self.testdir, use_snapshot=True)
+        (self.testdir / 'round2.yaml').write_text(textwrap.dedent("""\
+            - - Antwoord 2
+        """))
+
+        # ACT
+        result = Quiz.load_dir_with_ini(self.testdir, use_snapshot=True)
+
+        # ASSERT
+        self.assert_same_quiz(result, Quiz.load_dir_with_ini(self.testdir))
+        self.assertEqual(snapshot.read_snapshot(self.testdir)['sections']['round2']['correct_answers'],
+                         [['Antwoord 2']])
+
+    def test_when_restored_expect_new_rows_are_tailed(self):
+        # ARRANGE
+        Quiz.load_dir_with_ini(self.testdir, use_snapshot=True)
+        quiz = Quiz.load_dir_with_ini(self.testdir, use_snapshot=True)
+        with (self.testdir / 'round1.csv').open('a') as outfile:
+            outfile.write('"2020/10/30 3:09:44 PM GMT+1","team3","Antwoord 1","Antwoord 2"\n')
+
+        # ACT
+        quiz.update_from_dir(self.testdir)
+
+        # ASSERT
+        self.assert_same_quiz(quiz, Quiz.load_dir_with_ini(self.testdir))
+
+    def test_when_teams_merged_expect_merge_restored(self):
+        # ARRANGE
+        quiz = Quiz.load_dir_with_ini(self.testdir, use_snapshot=True)
+        quiz.merge_teams([quiz.get_team('team1', 'team1'), quiz.get_team('team3', 'team3')])
+        quiz.save_snapshot(self.testdir)
+
+        # ACT
+        result = Quiz.load_dir_with_ini(self.testdir, use_snapshot=True)
+
+        # ASSERT
+        self.assertEqual([t.team_id for t in result.teams], ['team1', 'team2'])
+        self.assertEqual(len(result.sections[1].responses_for_team(result.teams[0])), 1)
+
+    def test_when_snapshot_is_corrupt_expect_full_load(self):
+        # ARRANGE
+        (self.testdir / snapshot.SNAPSHOT_NAME).write_bytes(b'garbage')
+
+        # ACT
+        result = Quiz.load_dir_with_ini(self.testdir, use_snapshot=True)
+
+        # ASSERT
+        self.assert_same_quiz(result, Quiz.load_dir_with_ini(self.testdir))
+
+    def test_when_snapshot_is_edited_expect_it_is_ignored(self):
+        # ARRANGE
+        Quiz.load_dir_with_ini(self.testdir, use_snapshot=True)
+        path = self.testdir / snapshot.SNAPSHOT_NAME
+        path.write_bytes(path.read_bytes().replace(b'team1', b'team9'))
+
+        # ACT
+        result = snapshot.read_snapshot(self.testdir)
+
+        # ASSERT
+        self.assertIsNone(result)
+
+    def test_when_snapshot_is_read_expect_same_records(self):
+        # ARRANGE
+        quiz = Quiz.load_dir_with_ini(self.testdir, use_snapshot=True)
+
+        # ACT
+        result = snapshot.read_snapshot(self.testdir)
+
+        # ASSERT
+        self.assertEqual(result['sections']['round1']['check'], quiz._sources['round1'].record()['check'])
+        self.assertIsInstance(result['sections']['round2']['answers_fingerprint'], tuple)
+
+
+if __name__ == '__main__':
+    unittest.main()
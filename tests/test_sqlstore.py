@@ -0,0 +1,110 @@
+import os
+import pathlib
+import textwrap
+import unittest
+from unittest import mock
+
+import sqlstore
+from googleformspubquiz import Quiz
+from source import SectionSource
+
+
+class TestSQLiteStore(unittest.TestCase):
+    def setUp(self):
+        self.testdir = pathlib.Path(__file__).parent / 'testdata' / 'test_sqlstore'
+        os.makedirs(self.testdir, exist_ok=True)
+        for file in self.testdir.iterdir():
+            file.unlink()
+
+        (self.testdir / 'quiz.ini').write_text(textwrap.dedent("""\
+            [storage]
+            # backend: keep the quiz in a SQLite database in the quiz directory, shared by all processes
+            backend = sqlite
+
+            [responses]
+            round1 = last
+        """))
+        (self.testdir / 'round1.csv').write_text(textwrap.dedent("""\
+            "Timestamp","Team","Vraag 1","Vraag 2"
+            "2020/10/30 3:08:44 PM GMT+1","Correct answers","Antwoord 1","Antwoord 2"
+            "2020/10/30 3:08:45 PM GMT+1","team1","Antwoord 1","Antwoord 3"
+            "2020/10/30 3:08:46 PM GMT+1","team2","Antwoord 1","Antwoord 2"
+            "2020/10/30 3:09:46 PM GMT+1","team1","Antwoord 1","Antwoord 2"
+        """))
+        (self.testdir / 'round2.csv').write_text(textwrap.dedent("""\
+            "Timestamp","Team","Vraag 1"
+            "2020/10/30 3:18:45 PM GMT+1","team3","Antwoord 1"
+            "2020/10/30 3:18:46 PM GMT+1","team1","Antwoord 2"
+        """))
+        (self.testdir / 'round2.yaml').write_text(textwrap.dedent("""\
+            - - Antwoord 1
+        """))
+        self.quizzes = []
+
+    def tearDown(self):
+        for quiz in self.quizzes:
+            quiz.store.close()
+
+    def load(self):
+        quiz = Quiz.load_dir_with_ini(self.testdir)
+        self.quizzes.append(quiz)
+        return quiz
+
+    def test_when_loading_expect_store_written(self):
+        # ACT
+        quiz = self.load()
+
+        # ASSERT
+        self.assertTrue((self.testdir / sqlstore.STORE_NAME).exists())
+        self.assertEqual(sorted(quiz.store.records()), ['round1', 'round2'])
+
+    def test_when_sources_unchanged_expect_quiz_restored_without_parsing(self):
+        # ARRANGE
+        expected = self.load()
+
+        # ACT
+        with mock.patch.object(SectionSource, '_load') as load:
+            result = self.load()
+
+        # ASSERT
+        load.assert_not_called()
+        self.assertEqual({t.team_id: s for t, s in result.scores().items()},
+                         {t.team_id: s for t, s in expected.scores().items()})
+        self.assertEqual(result.sections[0].questions[1].answer_list(),
+                         expected.sections[0].questions[1].answer_list())
+
+    def test_restored_quiz_scores_as_parsed_quiz(self):
+        # ARRANGE
+        self.load()
+
+        # ACT
+        result = self.load()
+
+        # ASSERT
+        self.assertEqual({t.team_id: s for t, s in result.scores().items()}, {'team1': 2, 'team2': 2, 'team3': 1})
+
+    def test_when_teams_merged_expect_merge_restored_from_log(self):
+        # ARRANGE
+        quiz = self.load()
+        quiz.merge_teams([quiz.get_team('team2', None), quiz.get_team('team3', None)])
+
+        # ACT
+        result = self.load()
+
+        # ASSERT
+        self.assertEqual([t.team_id for t in result.teams], ['team1', 'team2'])
+        self.assertEqual({t.team_id: s for t, s in result.scores().items()}, {'team1': 2, 'team2': 3})
+
+    def test_when_answers_changed_expect_section_stored_again(self):
+        # ARRANGE
+        quiz = self.load()
+        (self.testdir / 'round2.yaml').write_text(textwrap.dedent("""\
+            - - Antwoord 2
+        """))
+
+        # ACT
+        quiz.update_from_dir(self.testdir)
+
+        # ASSERT
+        self.assertEqual(quiz.store.records()['round2']['correct_answers'], [['Antwoord 2']])
+        self.assertEqual({t.team_id: s for t, s in quiz.scores().items()}, {'team1': 3, 'team2': 2, 'team3': 0})
@@ -0,0 +1,101 @@
+import unittest
+
+from timestamps import DAY_FIRST, MONTH_FIRST, detect_date_order, parse_timestamp, parse_zone
+
+
+class TestParseTimestamp(unittest.TestCase):
+    def test_google_forms_timestamp(self):
+        # ACT
+        result = parse_timestamp('2020/10/30 3:08:44 PM GMT+1')
+
+        # ASSERT
+        self.assertEqual(result, 1604066924)
+
+    def test_morning_before_afternoon(self):
+        # ACT
+        morning = parse_timestamp('2020/10/30 10:08:44 AM GMT+1')
+        afternoon = parse_timestamp('2020/10/30 3:08:44 PM GMT+1')
+
+        # ASSERT
+        self.assertLess(morning, afternoon)
+
+    def test_midnight_and_noon(self):
+        # ACT
+        midnight = parse_timestamp('2020/10/30 12:00:00 AM')
+        noon = parse_timestamp('2020/10/30 12:00:00 PM')
+
+        # ASSERT
+        self.assertEqual(noon - midnight, 12 * 3600)
+
+    def test_time_zones(self):
+        # ACT
+        result = [parse_timestamp(timestamp) for timestamp in
+                  ['2020/10/30 14:08:44', '2020-10-30T15:08:44+01:00', '2020/10/30 9:38:44 AM GMT-4:30']]
+
+        # ASSERT
+        self.assertEqual(result, [1604066924] * 3)
+
+    def test_zone_applies_to_timestamps_without_zone(self):
+        # ACT
+        result = [parse_timestamp(timestamp, zone=3600) for timestamp in
+                  ['2020/10/30 15:08:44', '2020/10/30 3:08:44 PM GMT+1', '2020/10/30 14:08:44 UTC']]
+
+        # ASSERT
+        self.assertEqual(result, [1604066924] * 3)
+
+    def test_day_and_month_first(self):
+        # ACT
+        result = [parse_timestamp('30/10/2020 14:08:44'), parse_timestamp('30-10-2020 14:08:44'),
+                  parse_timestamp('10/30/2020 14:08:44', MONTH_FIRST)]
+
+        # ASSERT
+        self.assertEqual(result, [1604066924] * 3)
+
+    def test_date_order_is_not_guessed_per_timestamp(self):
+        # ACT
+        result = parse_timestamp('10/30/2020 14:08:44', DAY_FIRST)
+
+        # ASSERT
+        self.assertIsNone(result)
+
+
+class TestParseZone(unittest.TestCase):
+    def test_zones(self):
+        # ACT
+        result = [parse_zone(zone) for zone in ['GMT+1', '+02:00', 'UTC-4:30', 'Z', 'Europe/Brussels']]
+
+        # ASSERT
+        self.assertEqual(result, [3600, 7200, -16200, 0, None])
+
+
+class TestDetectDateOrder(unittest.TestCase):
+    def test_day_first(self):
+        # ACT
+        result = detect_date_order('"Timestamp","Team"\n"05/10/2020 20:00:00","a"\n"13/10/2020 20:00:00","b"\n')
+
+        # ASSERT
+        self.assertEqual(result, DAY_FIRST)
+
+    def test_month_first(self):
+        # ACT
+        result = detect_date_order('Timestamp,Team\n10/05/2020 20:00:00,a\n10/13/2020 20:00:00,b\n')
+
+        # ASSERT
+        self.assertEqual(result, MONTH_FIRST)
+
+    def test_undecided(self):
+        # ACT
+        result = [detect_date_order('"05/10/2020 20:00:00","a"\n'),
+                  detect_date_order('"2020/10/30 3:08:44 PM GMT+1","a"\n'),
+                  detect_date_order('"13/10/2020 20:00:00","a"\n"10/13/2020 20:00:00","b"\n')]
+
+        # ASSERT
+        self.assertEqual(result, [None, None, None])
+
+    def test_invalid_timestamps(self):
+        # ACT
+        result = [parse_timestamp(timestamp) for timestamp in
+                  [None, '', 'yesterday', '2020/13/01 10:00:00', '2020/02/30 10:00:00', '2020/10/30 13:00:00 PM']]
+
+        # ASSERT
+        self.assertEqual(result, [None] * 6)